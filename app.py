@@ -1,20 +1,36 @@
 import streamlit as st
 import os
-import shutil
 import time
 import uuid
 import zipfile
 
 # Helper Modules
-from src.graph.code_parser import CodeGraphParser
 from src.rag.vector_store import CodeVectorStore
-from src.agent.llm_client import LLMClient
-from src.utils.pdf_processor import extract_text_from_pdf
+from src.rag.traceability import TraceabilityMatrix, trace_path
+from src.pipeline.ingestion import is_valid_file, collect_files, copy_files_flat
+from src.pipeline.scanner import combine_stats
+from src.pipeline.checkpoint import CheckpointStore
+from src.pipeline.generation import COMPONENT_WISE, GLOBAL_CONSOLIDATION, project_name
+from src.jobs.runner import get_runner
+from src.jobs.store import ACTIVE_STATES, QUEUED, RUNNING, SUCCEEDED
+from src.jobs.tasks import ANALYSIS, GENERATION
+from src.utils.tracing import tracer
+from src.utils import warmup
+from src.utils.sessions import (QuotaExceeded, SessionQuota, collect_workspaces, embed_limiter, llm_limiter,
+                                remove_workspace, reset_workspace, valid_session_id)
+
+# Vector DB lifecycle limits (per-session collections are evicted by TTL / LRU quota)
+SESSION_TTL_SECONDS = float(os.getenv("QA_SESSION_TTL_HOURS", "24")) * 3600
+VECTOR_DB_MAX_BYTES = float(os.getenv("QA_VECTOR_DB_MAX_MB", "2048")) * 1e6
+# Defaults for the LLM session options next to "Generate Test Scenarios"
+LLM_SESSION_DEFAULT = os.getenv("QA_LLM_SESSION", "0").lower() in ("1", "true", "yes")
+LLM_REUSE_CONTEXT_DEFAULT = os.getenv("QA_LLM_REUSE_CONTEXT", "0").lower() in ("1", "true", "yes")
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="QA Expert AI", layout="wide")
 
 # --- SESSION STATE MANAGEMENT ---
+# The session id and active job ids are mirrored into the URL so a page reload reattaches to them.
 if 'analysis_complete' not in st.session_state:
     st.session_state.analysis_complete = False
 if 'file_summary' not in st.session_state:
@@ -23,33 +39,101 @@ if 'node_count' not in st.session_state:
     st.session_state.node_count = 0
 if 'edge_count' not in st.session_state:
     st.session_state.edge_count = 0
+def new_session_id():
+    return f"session_{uuid.uuid4().hex}"
+
 if 'session_id' not in st.session_state:
-    st.session_state.session_id = f"session_{int(time.time())}"
+    # The id names the collection, workspace and job owner: only well-formed ids are accepted from the URL
+    st.session_state.session_id = valid_session_id(st.query_params.get("session")) or new_session_id()
+if 'trace_id' not in st.session_state:
+    st.session_state.trace_id = None
+if 'tracing' not in st.session_state:
+    st.session_state.tracing = tracer.default_enabled
+if 'fingerprint' not in st.session_state:
+    st.session_state.fingerprint = None
+if 'scan_stats' not in st.session_state:
+    st.session_state.scan_stats = None
+if 'priorities' not in st.session_state:
+    st.session_state.priorities = None
+if 'duplicates' not in st.session_state:
+    st.session_state.duplicates = None
+if 'analysis_job' not in st.session_state:
+    st.session_state.analysis_job = st.query_params.get("analysis_job")
+if 'generation_job' not in st.session_state:
+    st.session_state.generation_job = st.query_params.get("generation_job")
+st.query_params["session"] = st.session_state.session_id
+
+job_runner = get_runner()
+
+def track_job(key, job_id):
+    st.session_state[key] = job_id
+    if job_id:
+        st.query_params[key] = job_id
+    elif key in st.query_params:
+        del st.query_params[key]
+
+def current_job(key):
+    job_id = st.session_state[key]
+    job = job_runner.status(job_id) if job_id else None
+    if job is not None and job["owner"] != st.session_state.session_id:
+        job = None  # job id from the URL belongs to another session
+    if job_id and job is None:
+        track_job(key, None)
+    return job
+
+def show_job_progress(job, label):
+    st.progress(job["progress"], text=f"{label}: {job['message'] or job['status']}")
+    if st.button("Cancel", key=f"cancel_{job['id']}"):
+        job_runner.cancel(job["id"])
+        st.rerun()
+
+# Walking data/vector_db is O(files); the page reruns every second while a job is running
+@st.cache_data(ttl=30, show_spinner=False)
+def vector_db_report():
+    return CodeVectorStore.storage_report()
 
 # --- SIDEBAR SETTINGS ---
 with st.sidebar:
     st.header("System Settings")
     
-    import requests
-    try:
-        response = requests.get("http://localhost:11434/api/tags")
-        if response.status_code == 200:
-            models_json = response.json()
-            available_models = [m['name'] for m in models_json['models']]
-        else:
-            available_models = ["gherkin-qa", "llama3"]
-    except:
-        available_models = ["gherkin-qa", "llama3"]
+    # Never blocks: the Ollama model list is fetched by the background warm-up thread
+    available_models = warmup.available_models(["gherkin-qa", "llama3"])
 
     model_name = st.selectbox("Select LLM Model", available_models, index=0)
     
     st.divider()
     st.markdown(f"**System Status:** :green[Active]")
     st.markdown(f"**Selected Model:** `{model_name}`")
+    warm = warmup.status()
+    if warm["error"]:
+        st.markdown(f"**Warm-up:** :red[failed] ({warm['error']})")
+    elif warm["started"]:
+        st.markdown(f"**Warm-up:** {':green[ready]' if warm['embedding_ready'] else ':orange[loading models...]'}")
+    db_report = vector_db_report()
+    st.markdown(f"**Vector DB:** {db_report['collections']} collections, {db_report['bytes'] / 1e6:.1f} MB")
+    running_jobs = job_runner.store.list(statuses=[RUNNING])
+    queued_jobs = job_runner.store.list(statuses=[QUEUED])
+    st.markdown(f"**Job Queue:** {len(running_jobs)} running, {len(queued_jobs)} queued")
+    embed_slots, llm_slots = embed_limiter.to_dict(), llm_limiter.to_dict()
+    st.markdown(f"**Shared Capacity:** embedding {embed_slots['active']}/{embed_slots['limit'] or '∞'}, "
+                f"LLM {llm_slots['active']}/{llm_slots['limit'] or '∞'} busy, "
+                f"{embed_slots['waiting'] + llm_slots['waiting']} waiting")
+    # Per session: the tracer singleton is shared by every session and by the job threads
+    st.checkbox("Enable pipeline tracing", key="tracing",
+                help="Records per-stage timings. Set QA_TRACE_FILE to export spans as JSON lines.")
+    tracer.set_enabled(st.session_state.tracing)
     st.divider()
     
     if st.button("Reset Session"):
-        st.session_state.session_id = f"session_{int(time.time())}"
+        for key in ("analysis_job", "generation_job"):
+            if st.session_state[key]:
+                job_runner.cancel(st.session_state[key])
+            track_job(key, None)
+        CodeVectorStore.delete_session(st.session_state.session_id)
+        vector_db_report.clear()
+        remove_workspace(st.session_state.session_id)
+        st.session_state.session_id = new_session_id()
+        st.query_params["session"] = st.session_state.session_id
         st.session_state.analysis_complete = False
         st.session_state.file_summary = []
         st.rerun()
@@ -65,13 +149,6 @@ tab1, tab2 = st.tabs(["Upload Files/ZIP", "Local Directory Path"])
 
 files_to_process = []
 
-def is_valid_file(file_name):
-    name_lower = file_name.lower()
-    if name_lower == "readme.md":
-        return False
-    valid_extensions = ('.py', '.pdf', '.txt', '.md', '.java', '.cpp', '.js', '.ts', '.c', '.cs', '.go')
-    return name_lower.endswith(valid_extensions)
-
 # --- INPUT METHOD 1: DRAG & DROP ---
 with tab1:
     uploaded_files = st.file_uploader(
@@ -85,71 +162,89 @@ with tab2:
     local_path_input = st.text_input("Enter the full local path of your project", "")
 
 # --- EXECUTION: ANALYSIS ---
-if st.button("Start Project Analysis"):
-    temp_dir = "data/temp_project"
-    if os.path.exists(temp_dir):
-        try: shutil.rmtree(temp_dir)
-        except: pass
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    parser = CodeGraphParser()
-    full_context_summary = []
+analysis_job = current_job("analysis_job")
+analysis_running = analysis_job is not None and analysis_job["status"] in ACTIVE_STATES
+
+if st.button("Start Project Analysis", disabled=analysis_running):
+    # Each session uploads into its own workspace, so one user's reset never deletes another user's files
+    temp_dir = reset_workspace(st.session_state.session_id)
+
+    # Evict stale session collections (and their workspaces) before creating a new one
+    evicted = CodeVectorStore.garbage_collect(
+        ttl_seconds=SESSION_TTL_SECONDS,
+        max_bytes=VECTOR_DB_MAX_BYTES,
+        protect=[st.session_state.session_id],
+    )
+    for name in evicted:
+        remove_workspace(name)
+    collect_workspaces(SESSION_TTL_SECONDS, protect=[st.session_state.session_id])
+    CheckpointStore().purge()
     
-    with st.status("Filtering and indexing files...", expanded=True) as status:
-        if uploaded_files:
-            for up_file in uploaded_files:
-                if up_file.name.endswith(".zip"):
-                    with zipfile.ZipFile(up_file, 'r') as zip_ref:
-                        zip_ref.extractall(temp_dir)
-                    for root, dirs, files in os.walk(temp_dir):
-                        for file in files:
-                            if is_valid_file(file) and "__MACOSX" not in root:
-                                files_to_process.append(os.path.join(root, file))
-                else:
-                    if is_valid_file(up_file.name):
-                        file_path = os.path.join(temp_dir, up_file.name)
-                        with open(file_path, "wb") as f:
-                            f.write(up_file.getbuffer())
-                        files_to_process.append(file_path)
-
-        elif local_path_input and os.path.isdir(local_path_input):
-            for root, dirs, files in os.walk(local_path_input):
-                for skip in ['venv', '.git', '__pycache__', 'node_modules', '.idea', 'dist', 'build']:
-                    if skip in dirs: dirs.remove(skip)
-                for file in files:
-                    if is_valid_file(file):
-                        src_path = os.path.join(root, file)
-                        dst_path = os.path.join(temp_dir, file)
-                        shutil.copy2(src_path, dst_path)
-                        files_to_process.append(dst_path)
-
-        total_files = len(files_to_process)
-        if total_files == 0:
-            st.error("No valid source or requirement files found!")
-            st.stop()
-            
-        for i, file_path in enumerate(files_to_process):
-            file_name = os.path.basename(file_path)
-            if not file_name.endswith((".pdf", ".txt", ".md")):
-                st.write(f"[{i+1}/{total_files}] Structural Code Analysis: {file_name}")
-                parser.parse_file(file_path)
-                full_context_summary.append(f"CODE: {file_name}")
-            else:
-                st.write(f"[{i+1}/{total_files}] Reading Documentation: {file_name}")
-                content = extract_text_from_pdf(file_path) if file_name.endswith(".pdf") else open(file_path, "r", encoding="utf-8", errors="ignore").read()
-                parser.graph.add_node(f"DOC:{file_name}", type="requirement_doc", content=content)
-                full_context_summary.append(f"DOC: {file_name}")
-
-        vector_store = CodeVectorStore(collection_name=st.session_state.session_id)
-        vector_store.add_graph_documents(parser.graph)
-        status.update(label="Analysis Complete!", state="complete", expanded=False)
-
-    st.session_state.analysis_complete = True
-    st.session_state.file_summary = full_context_summary
-    st.session_state.node_count = parser.graph.number_of_nodes()
-    st.session_state.edge_count = parser.graph.number_of_edges()
+    st.session_state.trace_id = tracer.start_run(enabled=st.session_state.tracing)
+    scans = []
+    quota = SessionQuota()
+    used = (0, 0)  # files, bytes written into the workspace so far
+
+    try:
+        with tracer.span("scan"):
+            if uploaded_files:
+                for up_file in uploaded_files:
+                    if up_file.name.endswith(".zip"):
+                        with zipfile.ZipFile(up_file, 'r') as zip_ref:
+                            used = quota.check_archive(zip_ref, *used)
+                            zip_ref.extractall(temp_dir)
+                        files_to_process.extend(collect_files(temp_dir, scan_stats=scans))
+                    else:
+                        if is_valid_file(up_file.name):
+                            used = (used[0] + 1, used[1] + up_file.size)
+                            quota.check_size(*used)
+                            file_path = os.path.join(temp_dir, up_file.name)
+                            with open(file_path, "wb") as f:
+                                f.write(up_file.getbuffer())
+                            files_to_process.append(file_path)
+
+            elif local_path_input and os.path.isdir(local_path_input):
+                found = collect_files(local_path_input, scan_stats=scans)
+                quota.check_paths(found)
+                files_to_process.extend(copy_files_flat(found, temp_dir))
+    except QuotaExceeded as e:
+        remove_workspace(st.session_state.session_id)
+        st.error(f"Session quota exceeded: {e}")
+        st.stop()
+    st.session_state.scan_stats = combine_stats(scans) if scans else None
+
+    if not files_to_process:
+        st.error("No valid source or requirement files found!")
+        st.stop()
+
+    # Parsing, embedding and indexing run in the background job pool
+    st.session_state.analysis_complete = False
+    track_job("generation_job", None)
+    track_job("analysis_job", job_runner.submit(ANALYSIS, {
+        "files": files_to_process,
+        "session_id": st.session_state.session_id,
+        "trace_id": st.session_state.trace_id,
+        "tracing": st.session_state.tracing,
+    }, owner=st.session_state.session_id))
     st.rerun()
 
+if analysis_job is not None:
+    if analysis_running:
+        show_job_progress(analysis_job, "Filtering and indexing files")
+    elif analysis_job["status"] == SUCCEEDED:
+        if not st.session_state.analysis_complete:
+            result = analysis_job["result"]
+            st.session_state.analysis_complete = True
+            st.session_state.file_summary = result["file_summary"]
+            st.session_state.node_count = result["node_count"]
+            st.session_state.edge_count = result["edge_count"]
+            st.session_state.fingerprint = result.get("fingerprint")
+            st.session_state.priorities = result.get("priorities")
+            st.session_state.duplicates = result.get("duplicates")
+            st.session_state.trace_id = analysis_job["params"].get("trace_id")
+    else:
+        st.error(f"Analysis {analysis_job['status']}: {analysis_job['error'] or ''}")
+
 # --- RESULTS DISPLAY ---
 if st.session_state.analysis_complete:
     st.divider()
@@ -171,6 +266,22 @@ if st.session_state.analysis_complete:
         else:
             st.success("Knowledge Base Ready")
 
+        scan = st.session_state.scan_stats
+        if scan and scan["skipped"]:
+            with st.expander(f"Scanner: {scan['files']} files kept, {sum(scan['skipped'].values())} skipped "
+                             f"({scan['elapsed_s']:.2f}s)"):
+                st.table([{"Reason": reason, "Count": count, "Examples": ", ".join(scan["examples"].get(reason, []))}
+                          for reason, count in sorted(scan["skipped"].items(), key=lambda kv: -kv[1])])
+
+        # Gereksinim -> kod baglantilari analiz sonunda hesaplanir; burada sadece diskten okunur
+        trace_file = trace_path(CodeVectorStore.default_db_path(), st.session_state.session_id)
+        if os.path.exists(trace_file):
+            trace_rows = TraceabilityMatrix.load(trace_file).to_rows()
+            if trace_rows:
+                with st.expander(f"Requirement Traceability ({len({r['requirement'] for r in trace_rows})} "
+                                 f"requirement docs, top matching code)"):
+                    st.dataframe(trace_rows, use_container_width=True)
+
     with col2:
         st.subheader("AI Agent Generation")
         
@@ -179,56 +290,103 @@ if st.session_state.analysis_complete:
         if total_f > 1:
             gen_mode = st.radio(
                 "Select Generation Strategy",
-                ["Global Consolidation (Recommended)", "Component-Wise (Individual Files)"],
+                [GLOBAL_CONSOLIDATION, COMPONENT_WISE],
                 help="Global mode de-duplicates scenarios, Component-Wise gives detailed results for every file."
             )
         else:
             # For a single file, default to individual analysis without showing the radio
-            gen_mode = "Component-Wise (Individual Files)"
+            gen_mode = COMPONENT_WISE
             st.caption("Single file detected. Generating specific test scenarios...")
         
-        if st.button("Generate Test Scenarios"):
-            vector_store = CodeVectorStore(collection_name=st.session_state.session_id)
-            llm = LLMClient(model_name=model_name)
-            
-            progress_bar = st.progress(0)
-            status_box = st.empty()
-            p_name = files[0].split(": ")[1].split(".")[0] if files else "Project"
-
-            # --- STRATEGY 1: COMPONENT-WISE ---
-            if gen_mode == "Component-Wise (Individual Files)":
-                final_report = f"Feature: Individual Component Tests for {p_name}\n\n"
-                for i, f in enumerate(files):
-                    fname = f.split(": ")[1]
-                    status_box.info(f"Processing: `{fname}` ({i+1}/{total_f})")
-                    query = f"Generate detailed Gherkin scenarios for the logic in {fname}."
-                    res = vector_store.search_similar(query, k=3)
-                    if res['documents']:
-                        context = "\n".join(res['documents'][0])
-                        out = llm.generate_response(context, str(res['metadatas'][0]), query)
-                        final_report += f"# --- Source: {fname} ---\n{out}\n\n"
-                    progress_bar.progress((i+1)/total_f)
-                status_box.success("Individual generation complete.")
-
-            # --- STRATEGY 2: GLOBAL CONSOLIDATION ---
+        generation_job = current_job("generation_job")
+        generation_running = generation_job is not None and generation_job["status"] in ACTIVE_STATES
+
+        # Completed per-file outputs are checkpointed; re-running resumes and only regenerates missing/failed units
+        fresh_run = st.checkbox("Regenerate from scratch (ignore checkpoints)", value=False)
+        # Ranked by call-graph centrality, requirement similarity and size during analysis
+        prioritize = st.checkbox("Generate the most important files first", value=False,
+                                 disabled=not st.session_state.priorities)
+        budget_minutes = st.number_input("Time budget (minutes, 0 = unlimited)", min_value=0.0, value=0.0, step=1.0,
+                                         help="Generation stops cleanly when the budget is spent; "
+                                              "the most important files are generated first.")
+        llm_session = st.checkbox("Keep the model loaded between files (LLM session mode)", value=LLM_SESSION_DEFAULT,
+                                  help="Uses keep_alive and a stable prompt prefix so Ollama's prefix cache is reused.")
+        # Only the global consolidation call is a follow-up of the per-file calls
+        reuse_context = st.checkbox("Continue the consolidation from the previous response's context",
+                                    value=LLM_REUSE_CONTEXT_DEFAULT,
+                                    disabled=not llm_session or gen_mode != GLOBAL_CONSOLIDATION)
+
+        generate_clicked = st.button("Generate Test Scenarios", disabled=generation_running)
+        if generate_clicked:
+            try:
+                # The same session may be open in several tabs; in-flight generations are capped per session
+                SessionQuota().check_generations(job_runner.store, st.session_state.session_id)
+            except QuotaExceeded as e:
+                st.warning(f"Session quota exceeded: {e}")
+                generate_clicked = False
+        if generate_clicked:
+            track_job("generation_job", job_runner.submit(GENERATION, {
+                "files": files,
+                "mode": gen_mode,
+                "model_name": model_name,
+                "session_id": st.session_state.session_id,
+                "trace_id": st.session_state.trace_id,
+                "tracing": st.session_state.tracing,
+                "fingerprint": st.session_state.fingerprint,
+                "fresh": fresh_run,
+                "priorities": st.session_state.priorities if (prioritize or budget_minutes) else None,
+                "budget_seconds": budget_minutes * 60 or None,
+                "duplicates": st.session_state.duplicates,
+                "llm_session": llm_session,
+                "reuse_context": llm_session and reuse_context,
+            }, owner=st.session_state.session_id))
+            st.rerun()
+
+        if generation_job is not None:
+            if generation_running:
+                show_job_progress(generation_job, "Generating scenarios")
+            elif generation_job["status"] == SUCCEEDED:
+                result = generation_job["result"]
+                final_report = result["report"]
+                if result.get("resumed"):
+                    st.info(f"Resumed {result['resumed']} unit(s) from checkpoint.")
+                if result.get("shared"):
+                    st.info(f"{result['shared']} near-duplicate file(s) share the scenarios of their representative.")
+                coverage = result.get("coverage")
+                if coverage and coverage["skipped"]:
+                    st.info(f"Budget spent: generated {coverage['generated']}/{coverage['units']} files, covering "
+                            f"{coverage['score_coverage']:.0%} of the priority score. "
+                            f"Next in line: {', '.join(coverage['top_skipped'][:5])}.")
+                if result["failed"]:
+                    st.warning(f"Generation finished with {len(result['failed'])} failed unit(s): {', '.join(result['failed'])}. "
+                               "Run it again to retry only the failed units.")
+                elif generation_job["params"]["mode"] == COMPONENT_WISE:
+                    st.success("Individual generation complete.")
+                else:
+                    st.success("Global Consolidation Complete!")
+
+                st.markdown("###  Generated Feature Set")
+                st.code(final_report, language="gherkin")
+                st.download_button("Download .feature File", final_report, f"{project_name(files)}_tests.feature")
             else:
-                raw_knowledge_accumulator = ""
-                for i, f in enumerate(files):
-                    fname = f.split(": ")[1]
-                    status_box.info(f"Extracting Knowledge: `{fname}` ({i+1}/{total_f})")
-                    query = f"Create highly detailed Gherkin scenarios for the core logic in {fname}."
-                    res = vector_store.search_similar(query, k=3)
-                    if res['documents']:
-                        out = llm.generate_response("\n".join(res['documents'][0]), str(res['metadatas'][0]), query)
-                        raw_knowledge_accumulator += f"\n# RAW SOURCE {fname}:\n{out}\n"
-                    progress_bar.progress((i+1)/total_f * 0.6)
-
-                status_box.warning("Refining Master Suite...")
-                master_prompt = f"SYSTEM ROLE: Senior QA Architect. Merge these scenarios into ONE .feature file. REMOVE EXACT DUPLICATES.\n\nINPUT:\n{raw_knowledge_accumulator}"
-                final_report = llm.generate_response(master_prompt, "Project Global Context", "Generate Final Master Feature")
-                progress_bar.progress(100)
-                status_box.success("Global Consolidation Complete!")
-
-            st.markdown("###  Generated Feature Set")
-            st.code(final_report, language="gherkin")
-            st.download_button("Download .feature File", final_report, f"{p_name}_tests.feature")
\ No newline at end of file
+                st.error(f"Generation {generation_job['status']}: {generation_job['error'] or ''}")
+
+    # --- PIPELINE TRACE ---
+    if st.session_state.tracing and st.session_state.trace_id:
+        with st.expander("Pipeline Trace (per-stage breakdown)"):
+            trace_rows = tracer.summary(st.session_state.trace_id)
+            if trace_rows:
+                st.dataframe(trace_rows, use_container_width=True)
+            else:
+                st.caption("No spans recorded for this run yet.")
+
+# --- BACKGROUND WARM-UP ---
+# Heavy imports (tree-sitter, chromadb, torch) and the embedding model load after the first render.
+warmup.start_background_warmup()
+
+# --- JOB POLLING ---
+# While a job is active the page re-renders itself to pick up progress from the job store.
+active_jobs = [job_runner.status(st.session_state[k]) for k in ("analysis_job", "generation_job") if st.session_state[k]]
+if any(job and job["status"] in ACTIVE_STATES for job in active_jobs):
+    time.sleep(1.0)
+    st.rerun()
@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_repo import generate_repo
+from benchmarks.run_benchmark import RESULTS_DIR, SCALES, RssSampler, _git_commit
+
+
+def build_corpus(config, workdir, seed=42):
+    """Sentetik repoyu parse edip embedding'e giden metinleri (dugum icerikleri) ve sorgulari dondurur."""
+    from src.graph.code_parser import CodeGraphParser
+
+    files = generate_repo(os.path.join(workdir, "repo"), config["files"], config["functions_per_file"],
+                          config["call_density"], 0, seed=seed)
+    parser = CodeGraphParser()
+    for path in files:
+        parser.parse_file(path)
+    documents = [d.get("content") or d.get("code") for _, d in parser.graph.nodes(data=True)]
+    documents = [d for d in documents if d]
+    queries = [f"Generate detailed Gherkin scenarios for the logic in {os.path.basename(p)}." for p in files]
+    return documents, queries
+
+
+def measure(backend, documents, queries, repeats=1):
+    """Belge kodlama throughput'u, tek sorgu gecikmesi ve tepe RSS."""
+    backend.encode(documents[:8])  # isinma (lazy init, bellek havuzlari)
+    with RssSampler() as sampler:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            doc_vectors = backend.encode(documents)
+        wall = (time.perf_counter() - start) / repeats
+    latencies = []
+    query_vectors = []
+    for q in queries:
+        t0 = time.perf_counter()
+        query_vectors.append(backend.encode(q))
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    return {
+        "backend": backend.version,
+        "documents": len(documents),
+        "docs_per_s": round(len(documents) / wall, 1) if wall > 0 else 0.0,
+        "query_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "peak_rss_mb": round(sampler.peak / 1e6, 1),
+    }, np.asarray(doc_vectors, dtype=np.float32), np.asarray(query_vectors, dtype=np.float32)
+
+
+def agreement(reference, candidate, k=3):
+    """
+    Referans (torch) ve aday backend arasinda retrieval uyumu:
+    ayni belgenin vektorleri arasi kosinus ve sorgu basina top-k ortusmesi (recall@k).
+    """
+    ref_docs, ref_queries = reference
+    cand_docs, cand_queries = candidate
+    if ref_docs.shape != cand_docs.shape:
+        # Farkli model/boyut: vektorler ayni uzayda degil, karsilastirma anlamsiz
+        return {"dimension_mismatch": [int(ref_docs.shape[1]), int(cand_docs.shape[1])]}
+    cosines = np.sum(ref_docs * cand_docs, axis=1) / (
+        np.linalg.norm(ref_docs, axis=1) * np.linalg.norm(cand_docs, axis=1))
+    k = min(k, len(ref_docs))
+    ref_top = np.argsort(-(ref_queries @ ref_docs.T), axis=1)[:, :k]
+    cand_top = np.argsort(-(cand_queries @ cand_docs.T), axis=1)[:, :k]
+    overlap = [len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)]
+    return {
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "min_cosine": round(float(cosines.min()), 5),
+        f"recall_at_{k}": round(float(np.mean(overlap)), 4),
+        "top1_agreement": round(float(np.mean(ref_top[:, 0] == cand_top[:, 0])), 4),
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compare embedding backends (throughput + retrieval agreement).")
+    arg_parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    arg_parser.add_argument("--model-dir", default=os.environ.get("QA_EMBED_MODEL_DIR"),
+                            help="Local ONNX model directory (model.onnx + tokenizer.json).")
+    arg_parser.add_argument("--threads", type=int, default=0, help="ONNX intra-op threads (0 = runtime default).")
+    arg_parser.add_argument("--inter-threads", type=int, default=0)
+    arg_parser.add_argument("--repeats", type=int, default=1)
+    arg_parser.add_argument("-k", type=int, default=3)
+    arg_parser.add_argument("--no-torch", action="store_true", help="Skip the PyTorch reference backend.")
+    args = arg_parser.parse_args(argv)
+
+    from src.rag.embeddings import get_backend
+
+    variants = []
+    if not args.no_torch:
+        variants.append(("torch", {}))
+    if args.model_dir:
+        onnx_opts = {"model_dir": args.model_dir, "intra_op_threads": args.threads,
+                     "inter_op_threads": args.inter_threads}
+        variants.append(("onnx", dict(onnx_opts, quantize=False)))
+        variants.append(("onnx", dict(onnx_opts, quantize=True)))
+    if not variants:
+        arg_parser.error("nothing to compare: pass --model-dir and/or drop --no-torch")
+
+    with tempfile.TemporaryDirectory(prefix="qa_embed_bench_") as workdir:
+        documents, queries = build_corpus(SCALES[args.scale], workdir)
+
+    print(f"Corpus: {len(documents)} documents, {len(queries)} queries (scale={args.scale})")
+    results, vectors = [], []
+    for name, options in variants:
+        try:
+            backend = get_backend(name, **options)
+        except ImportError as e:
+            print(f"  {name} skipped: {e}")
+            continue
+        stats, doc_vectors, query_vectors = measure(backend, documents, queries, args.repeats)
+        results.append(stats)
+        vectors.append((doc_vectors, query_vectors))
+        print(f"  {stats['backend']:<32} {stats['docs_per_s']:>9} docs/s  "
+              f"query p50={stats['query_p50_ms']}ms  rss={stats['peak_rss_mb']}MB")
+
+    # Ilk basarili backend referanstir (normalde torch)
+    for stats, vecs in zip(results[1:], vectors[1:]):
+        stats["agreement_vs"] = results[0]["backend"]
+        stats.update(agreement(vectors[0], vecs, k=args.k))
+        stats["speedup"] = round(stats["docs_per_s"] / results[0]["docs_per_s"], 2)
+        if "dimension_mismatch" in stats:
+            print(f"  {stats['backend']} vs {results[0]['backend']}: dimension mismatch {stats['dimension_mismatch']}")
+            continue
+        print(f"  {stats['backend']} vs {results[0]['backend']}: speedup x{stats['speedup']}, "
+              f"mean cos={stats['mean_cosine']}, recall@{args.k}={stats[f'recall_at_{args.k}']}, "
+              f"top1={stats['top1_agreement']}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"{_git_commit()}_embeddings_{args.scale}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"scale": args.scale, "documents": len(documents), "queries": len(queries),
+                   "threads": args.threads, "inter_threads": args.inter_threads, "results": results}, f, indent=2)
+    print(f"Results written to {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
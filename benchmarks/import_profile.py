@@ -0,0 +1,116 @@
+import os
+import ast
+import sys
+import time
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+
+
+def _is_local_module(module):
+    path = os.path.join(REPO_ROOT, *module.split("."))
+    return os.path.exists(path + ".py") or os.path.isdir(path)
+
+
+def app_imports(path=APP_PATH):
+    """
+    app.py'nin ilk cizimde ice aktardigi moduller, kaynak sirasiyla (elle tutulan liste eskimesin diye ast ile).
+    Fonksiyon govdelerindeki tembel import'lar sayilmaz; 'from paket import modul' alt modulu ekler.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+
+    def visit(nodes):
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+                continue
+            if isinstance(node, ast.Import):
+                modules.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                submodules = [f"{node.module}.{alias.name}" for alias in node.names
+                              if _is_local_module(f"{node.module}.{alias.name}")]
+                modules.extend(submodules or [node.module])
+            else:
+                visit(ast.iter_child_nodes(node))
+
+    visit(tree.body)
+    return list(dict.fromkeys(modules))
+
+
+# app.py'nin ilk cizimde ice aktardigi moduller
+APP_IMPORTS = app_imports()
+
+
+def profile_imports(modules, python=sys.executable):
+    """
+    'python -X importtime' ile modullerin ice aktarma maliyetini olcer.
+    Donus: (toplam_ms, [(kumulatif_ms, self_ms, modul), ...] en pahalidan ucuza)
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us) / 1000.0, int(self_us) / 1000.0, name.rstrip()))
+    # Satirdaki ad " " + girinti ile baslar; en ust seviye modullerin kumulatif toplami gercek toplam suredir
+    total_ms = sum(cum for cum, _, name in rows if not name.startswith("  "))
+    rows.sort(reverse=True)
+    return total_ms, [(cum, slf, name.strip()) for cum, slf, name in rows]
+
+
+def first_render_seconds(python=sys.executable):
+    """app.py'nin ilk cizimine kadar gecen sureyi Streamlit AppTest ile yeni bir surecte olcer."""
+    code = (
+        "import time; t = time.perf_counter();"
+        "from streamlit.testing.v1 import AppTest;"
+        "at = AppTest.from_file('app.py', default_timeout=120); at.run();"
+        "print(time.perf_counter() - t)"
+    )
+    proc = subprocess.run([python, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "first render failed")
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Import-time profile of the UI cold start (-X importtime).")
+    arg_parser.add_argument("modules", nargs="*", default=APP_IMPORTS)
+    arg_parser.add_argument("--top", type=int, default=15)
+    arg_parser.add_argument("--first-render", action="store_true", help="Also time app.py's first render via AppTest.")
+    arg_parser.add_argument("--budget-ms", type=float, default=1000.0, help="Exit non-zero if imports exceed this.")
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    total_ms, rows = profile_imports(args.modules)
+    wall_ms = (time.perf_counter() - start) * 1000.0
+
+    print(f"Import time for {len(args.modules)} module(s): {total_ms:.0f} ms (process wall {wall_ms:.0f} ms)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cum, slf, name in rows[: args.top]:
+        print(f"{cum:>14.1f} {slf:>9.1f}  {name}")
+
+    heavy = [m for m in ("torch", "sentence_transformers", "chromadb", "tree_sitter", "networkx", "pypdf")
+             if any(name == m for _, _, name in rows)]
+    if heavy:
+        print(f"Warning: heavy dependencies imported eagerly: {', '.join(heavy)}")
+
+    if args.first_render:
+        print(f"First render of app.py: {first_render_seconds():.2f} s")
+
+    return 0 if total_ms <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_FEATURE = """Feature: Synthetic Rule Validation
+
+  Scenario: Amount below threshold is rejected
+    Given the amount is below the minimum
+    When the rule is evaluated
+    Then an error should be returned
+"""
+
+
+class MockOllamaServer:
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=50.0, tokens_per_second=200.0, output_tokens=120,
+                 models=("gherkin-qa",), prompt_tokens_per_second=None, load_ms=0.0):
+        """
+        Yerel /api/generate taklidi. Gercek model olmadan uretim asamasini olcmek icin.
+        Ayrica OpenAI uyumlu /v1/completions ve /v1/models (llama.cpp sunucusu gibi) sunar.
+        latency_ms: ilk token oncesi sabit gecikme, tokens_per_second: uretim hizi.
+        prompt_tokens_per_second verilirse prompt degerlendirmesi de simule edilir ve Ollama gibi
+        bir onceki istekle ortak onek (prefix cache) ve gonderilen 'context' yeniden degerlendirilmez.
+        load_ms: model bellekte degilse (ilk istek veya keep_alive=0 sonrasi) yukleme suresi.
+        """
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.models = list(models)
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.load_ms = load_ms
+        self.requests_served = 0
+        self._cache = {}  # model -> son istegin token dizisi (prefix cache)
+        self._loaded = set()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def generate_url(self):
+        return f"{self.base_url}/api/generate"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": m} for m in server.models]})
+                elif self.path == "/v1/models":
+                    self._send_json(200, {"object": "list", "data": [{"id": m, "object": "model"} for m in server.models]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/generate":
+                    self._send_json(200, server._generate(payload))
+                elif self.path == "/v1/completions":
+                    self._send_json(200, server._completion(payload))
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+        return Handler
+
+    def _generate(self, payload):
+        prompt = payload.get("prompt", "")
+        model = payload.get("model")
+        # Kaba token tahmini: ~4 karakter = 1 token
+        prompt_tokens = max(1, len(prompt) // 4)
+        eval_seconds = self.output_tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+        evaluated = prompt_tokens
+        prompt_seconds = self.latency_ms / 1000.0
+        load_seconds = 0.0
+        context = []
+        if self.prompt_tokens_per_second:
+            # 4 karakterlik parcalar token yerine gecer; 'context' onceki token'larin devamidir
+            tokens = list(payload.get("context") or []) + [hash(prompt[i:i + 4]) & 0xFFFF for i in range(0, len(prompt), 4)]
+            with self._lock:
+                previous = self._cache.get(model, [])
+                common = 0
+                while common < min(len(previous), len(tokens)) and previous[common] == tokens[common]:
+                    common += 1
+                self._cache[model] = tokens
+                if model not in self._loaded:
+                    load_seconds = self.load_ms / 1000.0
+                    self._loaded.add(model)
+                if payload.get("keep_alive") in (0, "0", "0s"):
+                    self._loaded.discard(model)
+                    self._cache.pop(model, None)
+            evaluated = max(1, len(tokens) - common)
+            prompt_seconds = evaluated / self.prompt_tokens_per_second
+            context = tokens + [0] * self.output_tokens
+
+        time.sleep(load_seconds + prompt_seconds + eval_seconds)
+        with self._lock:
+            self.requests_served += 1
+        result = {
+            "model": model,
+            "response": CANNED_FEATURE,
+            "done": True,
+            "total_duration": int((load_seconds + prompt_seconds + eval_seconds) * 1e9),
+            "load_duration": int(load_seconds * 1e9),
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": int(prompt_seconds * 1e9),
+            "eval_count": self.output_tokens,
+            "eval_duration": int(eval_seconds * 1e9),
+        }
+        if context:
+            result["context"] = context
+        return result
+
+    def _completion(self, payload):
+        """OpenAI /v1/completions yaniti (llama.cpp'nin 'timings' alaniyla)."""
+        result = self._generate({"model": payload.get("model"), "prompt": payload.get("prompt", "")})
+        return {
+            "object": "text_completion",
+            "model": result["model"],
+            "choices": [{"index": 0, "text": result["response"], "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": result["prompt_eval_count"], "completion_tokens": result["eval_count"],
+                      "total_tokens": result["prompt_eval_count"] + result["eval_count"]},
+            "timings": {"prompt_ms": result["prompt_eval_duration"] / 1e6,
+                        "predicted_ms": result["eval_duration"] / 1e6},
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run a local Ollama stand-in for benchmarks.")
+    arg_parser.add_argument("--port", type=int, default=11434)
+    arg_parser.add_argument("--latency-ms", type=float, default=50.0)
+    arg_parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    arg_parser.add_argument("--output-tokens", type=int, default=120)
+    args = arg_parser.parse_args(argv)
+    server = MockOllamaServer(port=args.port, latency_ms=args.latency_ms,
+                              tokens_per_second=args.tokens_per_second, output_tokens=args.output_tokens)
+    print(f"Mock Ollama listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
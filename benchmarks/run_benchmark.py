@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_repo import generate_repo
+from benchmarks.mock_ollama import MockOllamaServer
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+SCALES = {
+    "small": {"files": 10, "functions_per_file": 5, "call_density": 0.2, "pdfs": 1},
+    "medium": {"files": 100, "functions_per_file": 10, "call_density": 0.3, "pdfs": 5},
+    "large": {"files": 500, "functions_per_file": 20, "call_density": 0.4, "pdfs": 20},
+}
+
+
+def _current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        # ru_maxrss Linux'ta KB, macOS'ta byte
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    def __init__(self, interval=0.01):
+        """Asama suresince RSS'i ornekleyip tepe degeri tutar."""
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.peak = _current_rss_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss_bytes())
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss_bytes())
+        return False
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def run_stage(name, items, func):
+    """Her oge icin func'u calistirir; gecikme, throughput ve tepe RSS dondurur."""
+    latencies = []
+    with RssSampler() as sampler:
+        start = time.perf_counter()
+        for item in items:
+            t0 = time.perf_counter()
+            func(item)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+        wall = time.perf_counter() - start
+    result = {
+        "stage": name,
+        "items": len(latencies),
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "peak_rss_mb": round(sampler.peak / 1e6, 1),
+    }
+    print(f"  {name:<12} items={result['items']:<6} {result['throughput_per_s']:>9}/s  "
+          f"p50={result['p50_ms']:>9}ms  p95={result['p95_ms']:>9}ms  rss={result['peak_rss_mb']}MB")
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(config, workdir, skip=()):
+    """Sentetik repo uzerinde ingestion, embedding, retrieval ve generation asamalarini olcer."""
+    repo_dir = os.path.join(workdir, "repo")
+    files = generate_repo(repo_dir, config["files"], config["functions_per_file"],
+                          config["call_density"], config["pdfs"], seed=config["seed"])
+    py_files = [f for f in files if f.endswith(".py")]
+    pdf_files = [f for f in files if f.endswith(".pdf")]
+    stages = []
+
+    from src.graph.code_parser import CodeGraphParser
+    from src.utils.pdf_processor import extract_text_from_pdf
+    from src.agent.llm_client import LLMClient
+
+    parser = CodeGraphParser()
+    stages.append(run_stage("parse", py_files, parser.parse_file))
+
+    pdf_texts = {}
+    stages.append(run_stage("pdf", pdf_files, lambda p: pdf_texts.__setitem__(p, extract_text_from_pdf(p))))
+    for path, text in pdf_texts.items():
+        parser.graph.add_node(f"DOC:{os.path.basename(path)}", type="requirement_doc", content=text)
+
+    queries = [f"Generate detailed Gherkin scenarios for the logic in {os.path.basename(p)}." for p in py_files]
+    contexts = {}
+
+    if "embed" not in skip:
+        try:
+            from src.rag.vector_store import CodeVectorStore
+        except ImportError as e:
+            print(f"  embed/retrieval skipped: {e}")
+            skip = set(skip) | {"embed", "retrieval"}
+    if "embed" not in skip:
+        store = CodeVectorStore(collection_name="benchmark_run")
+        stages.append(run_stage("embed", [parser.graph], store.add_graph_documents))
+        stages[-1]["documents"] = store.collection.count()
+        if "retrieval" not in skip:
+            def _retrieve(q):
+                res = store.search_similar(q, k=3)
+                contexts[q] = "\n".join(res["documents"][0]) if res["documents"] else ""
+            stages.append(run_stage("retrieval", queries, _retrieve))
+
+    if "generation" not in skip:
+        gen_queries = queries[: config["generation_limit"]]
+        with MockOllamaServer(latency_ms=config["mock_latency_ms"], tokens_per_second=config["mock_tokens_per_second"]) as mock:
+            llm = LLMClient(model_name="gherkin-qa", api_url=mock.generate_url)
+            stages.append(run_stage("generation", gen_queries,
+                                    lambda q: llm.generate_response(contexts.get(q, q), "{}", q)))
+
+    return stages
+
+
+def compare(baseline_path, candidate_path):
+    """Iki sonuc dosyasini asama bazinda karsilastirir."""
+    with open(baseline_path) as f:
+        base = json.load(f)
+    with open(candidate_path) as f:
+        cand = json.load(f)
+    if base["config_hash"] != cand["config_hash"]:
+        print("Warning: benchmark configs differ; results are not directly comparable.")
+    print(f"{'stage':<12} {'metric':<18} {base['commit']:>12} {cand['commit']:>12} {'delta':>9}")
+    base_stages = {s["stage"]: s for s in base["stages"]}
+    for stage in cand["stages"]:
+        old = base_stages.get(stage["stage"])
+        if not old:
+            continue
+        for metric in ("throughput_per_s", "p50_ms", "p95_ms", "peak_rss_mb"):
+            a, b = old[metric], stage[metric]
+            delta = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+            print(f"{stage['stage']:<12} {metric:<18} {a:>12} {b:>12} {delta:>9}")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="QA Expert AI pipeline benchmark.")
+    sub = arg_parser.add_subparsers(dest="command")
+
+    run_p = sub.add_parser("run", help="Run the benchmark suite.")
+    run_p.add_argument("--scale", choices=sorted(SCALES), default="small")
+    run_p.add_argument("--files", type=int)
+    run_p.add_argument("--functions-per-file", type=int)
+    run_p.add_argument("--call-density", type=float)
+    run_p.add_argument("--pdfs", type=int)
+    run_p.add_argument("--seed", type=int, default=42)
+    run_p.add_argument("--generation-limit", type=int, default=20, help="Max files sent to the mock LLM.")
+    run_p.add_argument("--mock-latency-ms", type=float, default=50.0)
+    run_p.add_argument("--mock-tokens-per-second", type=float, default=200.0)
+    run_p.add_argument("--skip", nargs="*", default=[], choices=["embed", "retrieval", "generation"])
+    run_p.add_argument("--output", help="Result JSON path (default: benchmarks/results/<commit>_<scale>.json)")
+
+    cmp_p = sub.add_parser("compare", help="Compare two result files.")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("candidate")
+
+    args = arg_parser.parse_args(argv)
+    if args.command == "compare":
+        compare(args.baseline, args.candidate)
+        return 0
+    if args.command is None:
+        args = arg_parser.parse_args(["run"] + list(argv or sys.argv[1:]))
+
+    config = dict(SCALES[args.scale])
+    for key in ("files", "functions_per_file", "call_density", "pdfs"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    config.update(seed=args.seed, generation_limit=args.generation_limit,
+                  mock_latency_ms=args.mock_latency_ms, mock_tokens_per_second=args.mock_tokens_per_second)
+    config_hash = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+    commit = _git_commit()
+
+    print(f"Benchmark @ {commit} | scale={args.scale} | config={config_hash}")
+    workdir = tempfile.mkdtemp(prefix="qa_bench_")
+    cwd = os.getcwd()
+    try:
+        # Vector DB gecici klasorde olussun, projenin data/ klasorunu kirletmesin
+        os.chdir(workdir)
+        stages = run_benchmark(config, workdir, skip=set(args.skip))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": args.scale,
+        "config": config,
+        "config_hash": config_hash,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "stages": stages,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}_{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import os
+import random
+import argparse
+
+# Sentetik gereksinim metinleri icin kelime havuzu
+WORDS = [
+    "payment", "user", "account", "limit", "discount", "invoice", "currency", "balance",
+    "must", "should", "reject", "accept", "minimum", "maximum", "amount", "status",
+    "order", "cart", "session", "token", "retry", "timeout", "report", "audit",
+]
+
+
+def _function_source(name, callees, rng):
+    """Tek bir sentetik fonksiyonun kaynak kodunu uretir."""
+    threshold = rng.randint(1, 1000)
+    lines = [
+        f"def {name}(amount, status):",
+        f'    """Business rule {name}: threshold {threshold}."""',
+        f"    if amount < {threshold}:",
+        f'        return {{"error": "Min amount {threshold}"}}',
+        '    if status == "VIP":',
+        f"        amount = amount * {rng.choice(['0.95', '0.9', '0.85'])}",
+    ]
+    for callee in callees:
+        lines.append(f"    amount = {callee}(amount, status)")
+    lines.append("    return amount")
+    return "\n".join(lines) + "\n"
+
+
+def _pdf_bytes(lines):
+    """Bagimliliksiz minimal tek sayfalik PDF (Helvetica, duz metin)."""
+    text_ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+    for line in lines:
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        text_ops.append(f"({escaped}) Tj T*")
+    text_ops.append("ET")
+    stream = "\n".join(text_ops).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_pos = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def generate_repo(out_dir, files=20, functions_per_file=10, call_density=0.2, pdfs=2, lines_per_pdf=40, seed=42):
+    """
+    Olceklenebilir sentetik Python reposu ve gereksinim PDF'leri uretir.
+    call_density: her fonksiyonun daha once tanimlanmis bir fonksiyonu cagirma olasiligi (0-1).
+    Ayni seed ile her zaman ayni icerik uretilir (commit'ler arasi karsilastirma icin).
+    """
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    all_functions = []
+    written = []
+
+    for f_idx in range(files):
+        chunks = []
+        for fn_idx in range(functions_per_file):
+            name = f"rule_{f_idx}_{fn_idx}"
+            callees = []
+            # Cagri yogunluguna gore onceki fonksiyonlara kenar ekle
+            while all_functions and rng.random() < call_density and len(callees) < 4:
+                callees.append(rng.choice(all_functions))
+            chunks.append(_function_source(name, callees, rng))
+            all_functions.append(name)
+        path = os.path.join(out_dir, f"module_{f_idx}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(chunks))
+        written.append(path)
+
+    for p_idx in range(pdfs):
+        lines = [f"REQ-{p_idx}-{i}: The " + " ".join(rng.choice(WORDS) for _ in range(8)) for i in range(lines_per_pdf)]
+        path = os.path.join(out_dir, f"requirements_{p_idx}.pdf")
+        with open(path, "wb") as f:
+            f.write(_pdf_bytes(lines))
+        written.append(path)
+
+    return written
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Generate a synthetic Python repo + requirement PDFs for benchmarking.")
+    arg_parser.add_argument("out_dir")
+    arg_parser.add_argument("--files", type=int, default=20)
+    arg_parser.add_argument("--functions-per-file", type=int, default=10)
+    arg_parser.add_argument("--call-density", type=float, default=0.2)
+    arg_parser.add_argument("--pdfs", type=int, default=2)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args(argv)
+    written = generate_repo(args.out_dir, args.files, args.functions_per_file, args.call_density, args.pdfs, seed=args.seed)
+    print(f"Generated {len(written)} files in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
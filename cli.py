@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.agent.llm_client import DEFAULT_API_URL, LLMClient
+from src.agent.endpoint_pool import get_pool
+from src.pipeline.ingestion import (is_archive, extract_archive, collect_files, ingest_files, build_index,
+                                    repo_slug)
+from src.pipeline.generation import COMPONENT_WISE, GLOBAL_CONSOLIDATION, generate
+from src.pipeline.checkpoint import CheckpointStore, graph_fingerprint, make_run_id
+from src.pipeline.impact import (SECTION_RE, ImpactAnalyzer, changed_files, git_diff, parse_diff,
+                                 regenerate_impacted)
+from src.pipeline.priority import Budget, coverage_report, rank_units
+from src.rag.compact_index import STORAGE_MODES
+from src.rag.traceability import load_traceability
+from src.graph.dedup import DEDUP_ENABLED, collapse_duplicates, file_duplicates
+from src.utils.tracing import tracer
+
+# Exit codes
+EXIT_OK = 0                # every repository produced a feature file
+EXIT_PARTIAL = 1           # some repositories (or units inside them) failed
+EXIT_USAGE = 2             # bad arguments (argparse also uses 2)
+EXIT_FAILED = 3            # every repository failed
+EXIT_LLM_UNAVAILABLE = 4   # LLM endpoint unreachable before starting
+
+MODES = {"global": GLOBAL_CONSOLIDATION, "component": COMPONENT_WISE}
+
+
+def check_llm(api_url, model_name, timeout=5):
+    """
+    Baslamadan once en az bir LLM endpoint'ine erisilebildigini ve modelin yuklu oldugunu dogrular.
+    api_url virgulle ayrilmis birden fazla endpoint olabilir (Ollama veya OpenAI uyumlu).
+    """
+    pool = get_pool(api_url)
+    errors = []
+    for endpoint in pool.endpoints:
+        if not pool.check(endpoint):
+            errors.append(f"{endpoint.base_url}: {endpoint.last_error}")
+        elif endpoint.serves(model_name):
+            return True, ""
+        else:
+            errors.append(f"{endpoint.base_url}: model '{model_name}' not available "
+                          f"(found: {', '.join(sorted(endpoint.models))})")
+    return False, "No usable LLM endpoint: " + "; ".join(errors)
+
+
+def impact_changes(root, args):
+    """Etki analizi istendiyse degisiklik sozlugunu dondurur, aksi halde None."""
+    changes = {}
+    if args.changed:
+        changes.update(changed_files(args.changed))
+    if args.diff_file:
+        with open(args.diff_file, "r", encoding="utf-8", errors="ignore") as f:
+            changes.update(parse_diff(f.read()))
+    if args.diff_base:
+        changes.update(parse_diff(git_diff(root, args.diff_base)))
+    if not (args.changed or args.diff_file or args.diff_base):
+        return None
+    return changes
+
+
+def analyze_repo(repo_path, args):
+    """Tek bir depo icin ingestion -> index -> generation akisini calistirir."""
+    slug = repo_slug(repo_path)
+    started = time.time()
+    record = {"repo": repo_path, "name": slug, "status": "ok", "feature_file": None, "error": None}
+    workdir = None
+    collection_name = f"cli_{slug}"
+    indexed = False
+    try:
+        if os.path.isfile(repo_path) and is_archive(repo_path):
+            workdir = tempfile.mkdtemp(prefix="qa_cli_")
+            root = extract_archive(repo_path, workdir)
+        elif os.path.isdir(repo_path):
+            root = repo_path
+        else:
+            raise FileNotFoundError(f"Not a directory or supported archive: {repo_path}")
+
+        scans = []
+        files = collect_files(root, scan_stats=scans)
+        record["scan"] = scans[0].to_dict()
+        if not files:
+            raise ValueError("No valid source or requirement files found")
+        record["files"] = len(files)
+
+        parser, summary = ingest_files(files)
+        record["nodes"] = parser.graph.number_of_nodes()
+        record["edges"] = parser.graph.number_of_edges()
+        duplicates = None
+        if args.dedup:
+            groups = collapse_duplicates(parser.graph)
+            duplicates = file_duplicates(parser.graph, summary)
+            record["dedup"] = {"groups": len(groups), "collapsed": sum(len(m) for m in groups.values()),
+                               "shared_files": len(duplicates)}
+        indexed = True
+        vector_store = build_index(parser, collection_name, storage=args.vector_storage)
+        traceability = load_traceability(vector_store)
+        if traceability is not None and traceability.by_doc:
+            record["traceability"] = traceability.stats()
+
+        llm = LLMClient(model_name=args.model, api_url=args.api_url, session=args.llm_session or None,
+                        reuse_context=args.reuse_context)
+        mode = MODES[args.mode] if len(summary) > 1 else COMPONENT_WISE
+
+        feature_path = os.path.join(args.out_dir, f"{slug}.feature")
+        changes = impact_changes(root, args)
+        previous = None
+        if changes is not None and os.path.exists(feature_path):
+            with open(feature_path, "r", encoding="utf-8") as f:
+                previous = f.read()
+            if not SECTION_RE.search(previous):
+                # Global modun tek parca ciktisinda dosya bolumleri yok; tam uretime donulur
+                record["impact"] = {"fallback": "previous output has no per-file sections"}
+                previous = None
+
+        if previous is not None:
+            impact = ImpactAnalyzer(parser.graph).analyze(changes, depth=args.impact_depth)
+            record["impact"] = impact.to_dict()
+            result = regenerate_impacted(previous, summary, impact, vector_store, llm)
+        else:
+            checkpoint = CheckpointStore(args.checkpoint_db)
+            run_id = make_run_id(repo=os.path.abspath(repo_path), mode=mode, model=args.model,
+                                 files=summary, fingerprint=graph_fingerprint(parser.graph))
+            if args.no_resume:
+                checkpoint.reset_run(run_id)
+            ranking = None
+            ordered = summary
+            if args.prioritize or args.budget.limited:
+                ranking = rank_units(parser.graph, summary, vector_store)
+                ordered = [item for item, _ in ranking]
+            result = generate(mode, ordered, vector_store, llm, checkpoint=checkpoint, run_id=run_id,
+                              budget=args.budget if args.budget.limited else None, duplicates=duplicates)
+            if ranking is not None:
+                record["coverage"] = coverage_report(ranking, result, parser.graph)
+
+        with open(feature_path, "w", encoding="utf-8") as f:
+            f.write(result.report)
+        record["feature_file"] = feature_path
+        record["units"] = result.units
+        record["resumed_units"] = result.resumed
+        record["failed_units"] = result.failed
+        if result.shared:
+            record["shared_units"] = result.shared
+        if llm.session:
+            record["llm_session"] = llm.session_stats()
+        if result.failed:
+            record["status"] = "partial" if len(result.failed) < result.units else "failed"
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if indexed and not args.keep_index:
+            from src.rag.vector_store import CodeVectorStore
+            CodeVectorStore.delete_session(collection_name)
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        record["duration_s"] = round(time.time() - started, 2)
+    print(f"[{record['status'].upper()}] {repo_path} ({record['duration_s']}s)" + (f" - {record['error']}" if record["error"] else ""))
+    return record
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        description="Headless QA Expert AI: analyze repositories and write Gherkin .feature files."
+    )
+    arg_parser.add_argument("repos", nargs="+", help="Repository directories or .zip/.tar.gz archives.")
+    arg_parser.add_argument("-o", "--out-dir", default="features", help="Output directory for .feature files.")
+    arg_parser.add_argument("-m", "--model", default="gherkin-qa")
+    arg_parser.add_argument("--mode", choices=sorted(MODES), default="global")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=2, help="Repositories processed in parallel.")
+    arg_parser.add_argument("--api-url", default=os.environ.get("QA_LLM_ENDPOINTS", DEFAULT_API_URL),
+                            help="LLM endpoint(s), comma-separated for a load-balanced pool. "
+                                 "Use a '/v1' URL for OpenAI-compatible servers (llama.cpp).")
+    arg_parser.add_argument("--summary", help="Run summary JSON path (default: <out-dir>/run_summary.json).")
+    arg_parser.add_argument("--keep-index", action="store_true", help="Keep per-repo Chroma collections.")
+    arg_parser.add_argument("--vector-storage", choices=STORAGE_MODES, default=None,
+                            help="Search index precision (env QA_VECTOR_STORAGE, default float32). float16/int8 only "
+                                 "cut the RAM and time of the similarity scan: Chroma keeps its float32 vectors for "
+                                 "re-scoring, so the extra index adds about 50%%/25%% of their size on disk.")
+    arg_parser.add_argument("--skip-llm-check", action="store_true")
+    arg_parser.add_argument("--no-resume", action="store_true", help="Ignore checkpoints from previous runs.")
+    arg_parser.add_argument("--checkpoint-db", default=os.path.join("data", "checkpoints.db"))
+    arg_parser.add_argument("--trace", action="store_true", help="Record pipeline spans into the summary.")
+    arg_parser.add_argument("--llm-session", action="store_true",
+                            help="Keep the model loaded (keep_alive) and order prompts for Ollama's prefix cache.")
+    arg_parser.add_argument("--reuse-context", action="store_true",
+                            help="In session mode, continue the consolidation call from the previous 'context'.")
+    arg_parser.add_argument("--no-dedup", dest="dedup", action="store_false",
+                            default=DEDUP_ENABLED,
+                            help="Do not collapse near-duplicate files/functions (env QA_DEDUP=0).")
+    budget_group = arg_parser.add_argument_group(
+        "budget", "Generate the most important units first (graph centrality, requirement similarity, size) "
+                  "and stop cleanly when the budget is spent. The budget is shared by all repositories.")
+    budget_group.add_argument("--prioritize", action="store_true", help="Order units by priority (implied by a budget).")
+    budget_group.add_argument("--budget-seconds", type=float, help="Wall-clock budget for the whole run.")
+    budget_group.add_argument("--budget-tokens", type=int, help="LLM token budget (prompt + completion).")
+    impact_group = arg_parser.add_argument_group(
+        "change impact", "Regenerate only scenarios affected by a change and update the previous "
+                         "<out-dir>/<repo>.feature in place (requires component-wise output).")
+    impact_group.add_argument("--changed", nargs="+", metavar="FILE", help="Changed files.")
+    impact_group.add_argument("--diff-base", metavar="REV", help="Use 'git diff REV' in the repository.")
+    impact_group.add_argument("--diff-file", metavar="PATCH", help="Use a unified diff file.")
+    impact_group.add_argument("--impact-depth", type=int, default=2, help="Reverse call graph depth (default 2).")
+    args = arg_parser.parse_args(argv)
+
+    if args.jobs < 1:
+        arg_parser.error("--jobs must be >= 1")
+
+    if not args.skip_llm_check:
+        ok, reason = check_llm(args.api_url, args.model)
+        if not ok:
+            print(f"Error: {reason}", file=sys.stderr)
+            return EXIT_LLM_UNAVAILABLE
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    tracer.enabled = tracer.enabled or args.trace
+    run_started = time.time()
+    # Sure butcesi calismanin basindan itibaren sayilir (CI zaman dilimi); ingestion da butceye dahildir
+    args.budget = Budget(seconds=args.budget_seconds, tokens=args.budget_tokens).start()
+
+    # Embedding modeli ve HTTP havuzu surec genelinde paylasilir; tum depolar ayni ornegi kullanir.
+    records = []
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(analyze_repo, repo, args): repo for repo in args.repos}
+        for future in as_completed(futures):
+            records.append(future.result())
+    records.sort(key=lambda r: args.repos.index(r["repo"]))
+
+    statuses = [r["status"] for r in records]
+    if all(s == "ok" for s in statuses):
+        exit_code = EXIT_OK
+    elif all(s == "failed" for s in statuses):
+        exit_code = EXIT_FAILED
+    else:
+        exit_code = EXIT_PARTIAL
+
+    summary = {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(run_started)),
+        "duration_s": round(time.time() - run_started, 2),
+        "model": args.model,
+        "mode": args.mode,
+        "jobs": args.jobs,
+        "exit_code": exit_code,
+        "counts": {s: statuses.count(s) for s in ("ok", "partial", "failed")},
+        "repos": records,
+    }
+    if args.budget.limited:
+        summary["budget"] = args.budget.to_dict()
+    if tracer.enabled:
+        summary["trace"] = tracer.summary()
+    summary_path = args.summary or os.path.join(args.out_dir, "run_summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Summary: {summary['counts']} -> {summary_path}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
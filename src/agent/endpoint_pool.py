@@ -0,0 +1,205 @@
+import os
+import time
+import threading
+
+import requests
+
+OLLAMA = "ollama"
+OPENAI = "openai"
+
+DEFAULT_HEALTH_INTERVAL = float(os.environ.get("QA_LLM_HEALTH_INTERVAL", "30"))
+HEALTH_TIMEOUT = 3
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class Endpoint:
+    def __init__(self, url):
+        """
+        Tek bir LLM sunucusu. Kabul edilen bicimler:
+          http://host:11434, http://host:11434/api/generate  -> Ollama (/api/generate, /api/tags)
+          http://host:8080/v1, http://host:8080/v1/completions, openai+http://host:8080
+                                                              -> OpenAI uyumlu (/v1/completions, /v1/models; llama.cpp)
+        """
+        kind = OLLAMA
+        if url.startswith("openai+"):
+            kind, url = OPENAI, url[len("openai+"):]
+        url = url.rstrip("/")
+        for suffix, suffix_kind in (("/api/generate", OLLAMA), ("/v1/completions", OPENAI), ("/v1", OPENAI)):
+            if url.endswith(suffix):
+                url, kind = url[: -len(suffix)], suffix_kind
+                break
+        self.base_url = url
+        self.kind = kind
+        self.outstanding = 0
+        self.healthy = True
+        self.models = None  # None: henuz bilinmiyor (her model kabul edilir)
+        self.last_error = None
+        self.last_check = 0.0
+
+    @property
+    def generate_url(self):
+        return f"{self.base_url}/api/generate" if self.kind == OLLAMA else f"{self.base_url}/v1/completions"
+
+    def serves(self, model):
+        return self.models is None or model in self.models or f"{model}:latest" in self.models
+
+    def to_dict(self):
+        return {"url": self.base_url, "kind": self.kind, "healthy": self.healthy, "outstanding": self.outstanding,
+                "models": sorted(self.models) if self.models is not None else None, "last_error": self.last_error}
+
+
+def parse_endpoints(spec):
+    """Virgulle ayrilmis adres listesi veya liste -> Endpoint listesi."""
+    urls = spec.split(",") if isinstance(spec, str) else list(spec)
+    return [Endpoint(u.strip()) for u in urls if u.strip()]
+
+
+class NoEndpointAvailable(requests.exceptions.ConnectionError):
+    """Saglikli ve modeli sunan endpoint yok (ConnectionError gibi ele alinir)."""
+
+
+class EndpointPool:
+    def __init__(self, endpoints, health_interval=DEFAULT_HEALTH_INTERVAL, http=None):
+        """
+        LLM endpoint havuzu.
+        - Yonlendirme: modeli sunan saglikli endpoint'ler arasinda en az bekleyen istege sahip olan
+          (esitlikte sirayla).
+        - Saglik kontrolu: /api/tags (Ollama) veya /v1/models (OpenAI uyumlu); ayni zamanda
+          endpoint basina model listesini gunceller. Birden fazla endpoint varsa arka planda periyodik calisir.
+        - Baglanti hatasinda endpoint sagliksiz isaretlenir ve istek bir sonrakine aktarilir.
+        """
+        self.endpoints = endpoints
+        self.health_interval = health_interval
+        self.http = http or requests
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self._checker = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+
+    # --- Saglik kontrolu ---
+
+    def check(self, endpoint):
+        url = f"{endpoint.base_url}/api/tags" if endpoint.kind == OLLAMA else f"{endpoint.base_url}/v1/models"
+        try:
+            response = self.http.get(url, timeout=HEALTH_TIMEOUT)
+            response.raise_for_status()
+            body = response.json()
+            if endpoint.kind == OLLAMA:
+                models = {m["name"] for m in body.get("models", [])}
+            else:
+                models = {m["id"] for m in body.get("data", [])}
+            with self._lock:
+                endpoint.healthy = True
+                # Bos liste: sunucu model bildirmiyor (orn. tek modelli llama.cpp) -> her model kabul
+                endpoint.models = models or None
+                endpoint.last_error = None
+        except (requests.RequestException, ValueError) as e:
+            with self._lock:
+                endpoint.healthy = False
+                endpoint.last_error = f"{type(e).__name__}: {e}"
+        endpoint.last_check = time.time()
+        return endpoint.healthy
+
+    def check_all(self):
+        for endpoint in self.endpoints:
+            self.check(endpoint)
+        return [e.to_dict() for e in self.endpoints]
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.check_all()
+
+    def _ensure_checker(self):
+        # Tek endpoint'te davranis eskisi gibi: kontrol yok, hata istekte ortaya cikar
+        if len(self.endpoints) < 2 or self._ready.is_set():
+            return
+        with self._lock:
+            first = self._checker is None
+            if first:
+                self._checker = threading.Thread(target=self._health_loop, name="qa-llm-health", daemon=True)
+        if not first:
+            # Ilk kontrol bitmeden model listeleri bilinmez; yonlendirme icin beklenir
+            self._ready.wait()
+            return
+        try:
+            self.check_all()
+        finally:
+            self._ready.set()
+        self._checker.start()
+
+    def close(self):
+        self._stop.set()
+
+    # --- Yonlendirme ---
+
+    def pick(self, model, exclude=(), prefer=None):
+        """Modeli sunan saglikli endpoint'lerden en az yuklu olanini secer ve rezerve eder."""
+        self._ensure_checker()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude and e.healthy and e.serves(model)]
+            if not candidates:
+                # Hepsi sagliksiz gorunuyorsa yine de dene (saglik bilgisi eski olabilir)
+                candidates = [e for e in self.endpoints if e not in exclude and e.serves(model)]
+            if not candidates:
+                raise NoEndpointAvailable(f"No endpoint serves model '{model}'")
+            if prefer in candidates and prefer.healthy:
+                chosen = prefer
+            else:
+                n = len(self.endpoints)
+                order = {e: (self.endpoints.index(e) - self._cursor) % n for e in candidates}
+                chosen = min(candidates, key=lambda e: (e.outstanding, order[e]))
+                self._cursor = (self.endpoints.index(chosen) + 1) % n
+            chosen.outstanding += 1
+            return chosen
+
+    def release(self, endpoint, failed=False, error=None):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.healthy = False
+                endpoint.last_error = error
+
+    def status(self):
+        with self._lock:
+            return [e.to_dict() for e in self.endpoints]
+
+
+def get_pool(spec):
+    """Ayni endpoint listesi icin surec genelinde tek havuz (bekleyen istek sayaclari paylasilir)."""
+    endpoints = parse_endpoints(spec)
+    key = tuple((e.kind, e.base_url) for e in endpoints)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = EndpointPool(endpoints)
+            _POOLS[key] = pool
+        return pool
+
+
+def to_openai_request(payload):
+    """Ollama /api/generate govdesini /v1/completions govdesine cevirir."""
+    options = payload.get("options", {})
+    body = {"model": payload["model"], "prompt": payload["prompt"], "stream": False,
+            "temperature": options.get("temperature", 0.1)}
+    if "num_predict" in options:
+        body["max_tokens"] = options["num_predict"]
+    return body
+
+
+def from_openai_response(body):
+    """
+    /v1/completions yanitini Ollama bicimine cevirir. llama.cpp'nin 'timings' alani varsa
+    prompt/eval sureleri Ollama zamanlama alanlarina (ns) aktarilir.
+    """
+    usage = body.get("usage") or {}
+    result = {"response": body["choices"][0].get("text", ""),
+              "prompt_eval_count": usage.get("prompt_tokens", 0),
+              "eval_count": usage.get("completion_tokens", 0)}
+    timings = body.get("timings")
+    if timings:
+        result["prompt_eval_duration"] = int(timings.get("prompt_ms", 0) * 1e6)
+        result["eval_duration"] = int(timings.get("predicted_ms", 0) * 1e6)
+    return result
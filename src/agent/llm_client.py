@@ -1,26 +1,91 @@
+import os
 import requests
 import json
+import threading
+from requests.adapters import HTTPAdapter
+
+from src.utils.tracing import traced, current_span
+from src.utils.sessions import llm_limiter
+from src.agent.endpoint_pool import OPENAI, get_pool, to_openai_request, from_openai_response
+
+# Ollama yanitindaki zamanlama/sayac alanlari (sureler nanosaniye)
+OLLAMA_TIMING_FIELDS = (
+    "total_duration", "load_duration",
+    "prompt_eval_count", "prompt_eval_duration",
+    "eval_count", "eval_duration",
+)
+
+# Tum LLMClient orneklerinin paylastigi HTTP baglanti havuzu (keep-alive)
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+# Oturum modunda her istegin basinda sabit kalan talimat blogu (prefix cache icin degismemeli)
+SESSION_INSTRUCTIONS = (
+    "You are generating Gherkin .feature content for one project. "
+    "Each request below provides source code or requirement text, its graph dependencies and a specific request."
+)
+DEFAULT_KEEP_ALIVE = os.environ.get("QA_LLM_KEEP_ALIVE", "30m")
+DEFAULT_API_URL = "http://localhost:11434/api/generate"
+# (baglanti, okuma) zaman asimi (saniye); okuma sinirini model yukleme + uzun uretim belirler
+LLM_TIMEOUT = (float(os.environ.get("QA_LLM_CONNECT_TIMEOUT", "5")),
+               float(os.environ.get("QA_LLM_READ_TIMEOUT", "600")))
+# Prefix cache kazanc tahmini: load_duration bu sureyi asan cagrida model yeni yuklenmistir (cache bos, olcum kesin).
+# Boyle bir cagri gorulene kadar varsayilan token/karakter orani (~4 karakter = 1 token) kullanilir.
+COLD_LOAD_MS = float(os.environ.get("QA_LLM_COLD_LOAD_MS", "250"))
+DEFAULT_TOKENS_PER_CHAR = 0.25
+
 
 class LLMClient:
-    def __init__(self, model_name="qa-expert"):
+    def __init__(self, model_name="qa-expert", api_url=None,
+                 session=None, keep_alive=DEFAULT_KEEP_ALIVE, reuse_context=None):
         """
         Ollama API Client.
         Modelfile ile ozellestirilmis 'QA Expert' modeli ile konusur.
+        session=True (veya QA_LLM_SESSION=1) ise oturum modu:
+          - model 'keep_alive' ile bellekte tutulur (dosyalar arasinda yeniden yuklenmez),
+          - prompt sabit kisimlarla (talimatlar + proje ozeti) baslar, boylece Ollama'nin prefix cache'i isabet eder,
+          - reuse_context=True (veya QA_LLM_REUSE_CONTEXT=1) ise son yanitin 'context'i takip (follow_up) cagrilarina eklenir.
+        api_url virgulle ayrilmis birden fazla endpoint olabilir (veya QA_LLM_ENDPOINTS); istekler
+        EndpointPool ile en az yuklu saglikli endpoint'e yonlendirilir, baglanti hatasinda digerine aktarilir.
+        OpenAI uyumlu sunucular (llama.cpp) icin '/v1' veya 'openai+' onekli adres kullanilir.
         """
-        self.api_url = "http://localhost:11434/api/generate"
+        if api_url is None:
+            api_url = os.environ.get("QA_LLM_ENDPOINTS", DEFAULT_API_URL)
+        self.pool = get_pool(api_url)
+        self.api_url = self.pool.endpoints[0].generate_url
         # Senin olusturdugun ozel modelin adi (ollama create ile verdigin isim)
         self.model = model_name
+        # Son cagri basarisiz olduysa hata mesaji (batch modunda basarisiz birimleri saymak icin)
+        self.last_error = None
 
-    def generate_response(self, context_data, metadata, user_query):
-        """
-        RAG'dan gelen veriyi (Gereksinim veya Kod) modele iletir.
-        Model zaten 'System Prompt' icerdigi icin burada tekrar rol tanimlamiyoruz.
-        """
-        
-        # 1. Girdiyi Hazirla (Data Formatting)
-        # Modelfile'daki {{ .Prompt }} kismina denk gelecek yapi.
-        # Hem kod hem metin gereksinimleri icin evrensel format.
-        prompt_payload = f"""
+        if session is None:
+            session = os.environ.get("QA_LLM_SESSION", "0").lower() in ("1", "true", "yes")
+        self.session = session
+        self.keep_alive = keep_alive
+        if reuse_context is None:
+            reuse_context = os.environ.get("QA_LLM_REUSE_CONTEXT", "0").lower() in ("1", "true", "yes")
+        self.reuse_context = reuse_context
+        self.project_summary = ""
+        self.context = None
+        # 'context' (KV cache) endpoint'e ozeldir; takip cagrilari ayni endpoint'e gider
+        self._context_endpoint = None
+        # Prefix cache kazancini tahmin etmek icin: token/karakter orani ve degerlendirilen token basina sure
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "prompt_eval_ms": 0.0, "prompt_eval_saved_ms": 0.0,
+                      "cached_tokens": 0, "load_ms": 0.0}
+        self._tokens_per_char = DEFAULT_TOKENS_PER_CHAR
+        self._calibrated = False
+        self._evaluated_tokens = 0
+        self._evaluated_ns = 0
+        # Token butcesi icin toplam (prompt + uretilen) token; sunucu saymiyorsa ~4 karakter = 1 token
+        self.tokens_used = 0
+
+    def _build_prompt(self, context_data, metadata, user_query):
+        if not self.session:
+            # Modelfile'daki {{ .Prompt }} kismina denk gelecek yapi.
+            # Hem kod hem metin gereksinimleri icin evrensel format.
+            return f"""
         CONTEXT / INPUT DATA:
         {context_data}
         
@@ -30,6 +95,96 @@ class LLMClient:
         USER SPECIFIC REQUEST:
         {user_query}
         """
+        # Sabit onek (tum cagrilarda ayni) once, degisen kisimlar sonra
+        return (
+            f"{SESSION_INSTRUCTIONS}\n\n"
+            f"PROJECT SUMMARY:\n{self.project_summary}\n\n"
+            f"USER SPECIFIC REQUEST:\n{user_query}\n\n"
+            f"STRUCTURAL DEPENDENCIES (Graph/Metadata):\n{metadata}\n\n"
+            f"CONTEXT / INPUT DATA:\n{context_data}\n"
+        )
+
+    def _account(self, result, prompt_chars, context_tokens):
+        """
+        Ollama zamanlama alanlarindan prefix cache kazancini tahmin eder.
+        prompt_eval_count sadece yeniden degerlendirilen token'lari sayar; beklenen token sayisi token/karakter
+        oraniyla hesaplanir. keep_alive ile model ve prefix cache'i onceki calismalardan sicak kalabilir, bu yuzden
+        ilk cagri soguk kabul edilmez: oran sadece modelin yuklendigi (load_duration >= QA_LLM_COLD_LOAD_MS)
+        cagridan kesin olarak alinir. O zamana kadar varsayilan oran ile cagrilarda gorulen en yuksek oran
+        (cache isabetinde olculen oran gercek oranin alt siniridir) kullanilir.
+        Token basina sure tum cagrilarin prompt_eval_duration / prompt_eval_count toplamindan hesaplanir.
+        """
+        evaluated = result.get("prompt_eval_count", 0)
+        eval_ns = result.get("prompt_eval_duration", 0)
+        with self._stats_lock:
+            if evaluated and prompt_chars and not context_tokens:
+                ratio = evaluated / prompt_chars
+                if result.get("load_duration", 0) >= COLD_LOAD_MS * 1e6:
+                    self._tokens_per_char = ratio
+                    self._calibrated = True
+                elif not self._calibrated:
+                    self._tokens_per_char = max(self._tokens_per_char, ratio)
+            if evaluated and eval_ns:
+                self._evaluated_tokens += evaluated
+                self._evaluated_ns += eval_ns
+            ns_per_token = self._evaluated_ns / self._evaluated_tokens if self._evaluated_tokens else 0
+            expected = int(prompt_chars * self._tokens_per_char) + context_tokens
+            cached = max(0, expected - evaluated)
+            saved_ms = cached * ns_per_token / 1e6
+            self.stats["calls"] += 1
+            self.stats["prompt_eval_ms"] += eval_ns / 1e6
+            self.stats["prompt_eval_saved_ms"] += saved_ms
+            self.stats["cached_tokens"] += cached
+            self.stats["load_ms"] += result.get("load_duration", 0) / 1e6
+        return cached, saved_ms
+
+    def session_stats(self):
+        with self._stats_lock:
+            return {k: round(v, 1) if isinstance(v, float) else v for k, v in self.stats.items()}
+
+    def _post(self, payload, follow_up=False):
+        """
+        Istegi havuzdan secilen endpoint'e gonderir. Baglanti hatasi veya zaman asiminda endpoint sagliksiz isaretlenir
+        ve istek kalan endpoint'lere aktarilir; hepsi basarisizsa son hata yukari iletilir.
+        """
+        tried = []
+        prefer = self._context_endpoint if follow_up else None
+        while True:
+            endpoint = self.pool.pick(self.model, exclude=tried, prefer=prefer)
+            failed = None
+            try:
+                if endpoint.kind == OPENAI:
+                    response = _SESSION.post(endpoint.generate_url, json=to_openai_request(payload),
+                                             timeout=LLM_TIMEOUT)
+                    response.raise_for_status()
+                    return endpoint, from_openai_response(response.json())
+                response = _SESSION.post(endpoint.generate_url, json=payload, timeout=LLM_TIMEOUT)
+                response.raise_for_status()
+                return endpoint, response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # ConnectTimeout her iki sinifin da alt sinifidir; ReadTimeout sadece Timeout
+                failed = "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection_error"
+                tried.append(endpoint)
+                if len(tried) >= len(self.pool.endpoints):
+                    raise
+                print(f"Warning: LLM endpoint {endpoint.base_url} {'timed out' if failed == 'timeout' else 'unreachable'}; "
+                      f"failing over.")
+                # Baska endpoint'te onceki 'context' gecersizdir
+                payload.pop("context", None)
+                prefer = None
+            finally:
+                self.pool.release(endpoint, failed=failed is not None, error=failed)
+
+    @traced("generate_response")
+    def generate_response(self, context_data, metadata, user_query, follow_up=False):
+        """
+        RAG'dan gelen veriyi (Gereksinim veya Kod) modele iletir.
+        Model zaten 'System Prompt' icerdigi icin burada tekrar rol tanimlamiyoruz.
+        follow_up=True: oturum modunda ve reuse_context acikken onceki yanitin 'context'i ile devam eder.
+        """
+        
+        # 1. Girdiyi Hazirla (Data Formatting)
+        prompt_payload = self._build_prompt(context_data, metadata, user_query)
 
         # 2. Ollama'ya Istek Gonder
         # System prompt'u gondermiyoruz, cunku Modelfile icinde zaten gomulu!
@@ -44,16 +199,46 @@ class LLMClient:
                 "num_ctx": 4096
             }
         }
+        if self.session:
+            payload["keep_alive"] = self.keep_alive
+            if follow_up and self.reuse_context and self.context:
+                payload["context"] = self.context
 
         try:
             print(f"Sending request to Custom Model ({self.model})...")
-            response = requests.post(self.api_url, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
+            self.last_error = None
+            # Surec genelinde ayni anda en fazla QA_MAX_CONCURRENT_LLM istek (tum oturumlar/isler icin)
+            with llm_limiter.slot():
+                endpoint, result = self._post(payload, follow_up=follow_up)
+            with self._stats_lock:
+                self.tokens_used += (result.get("prompt_eval_count") or len(prompt_payload) // 4) + \
+                    (result.get("eval_count") or len(result.get("response", "")) // 4)
+            span = current_span()
+            span.set(
+                model=self.model,
+                endpoint=endpoint.base_url,
+                bytes=len(prompt_payload),
+                **{k: result[k] for k in OLLAMA_TIMING_FIELDS if k in result}
+            )
+            if self.session:
+                # Failover sonrasi 'context' dusurulmus olabilir
+                context_tokens = len(payload.get("context") or ())
+                cached, saved_ms = self._account(result, len(prompt_payload), context_tokens)
+                span.set(session=True, cached_tokens=cached, prompt_eval_saved_ms=round(saved_ms, 2))
+                if result.get("context"):
+                    self.context = result["context"]
+                    self._context_endpoint = endpoint
             return result['response']
             
+        except requests.exceptions.Timeout:
+            current_span().set(error="timeout")
+            self.last_error = "timeout"
+            return f"Hata: Ollama yaniti {LLM_TIMEOUT[1]:g} saniyede gelmedi (QA_LLM_READ_TIMEOUT)."
         except requests.exceptions.ConnectionError:
+            current_span().set(error="connection_error")
+            self.last_error = "connection_error"
             return "Hata: Ollama baglantisi kurulamadi. 'ollama serve' calisiyor mu?"
         except Exception as e:
+            current_span().set(error=type(e).__name__)
+            self.last_error = str(e)
             return f"Model uretim hatasi: {str(e)}"
\ No newline at end of file
@@ -3,11 +3,35 @@ import networkx as nx
 from tree_sitter import Language, Parser
 import tree_sitter_python
 
+from src.utils.tracing import traced, current_span
+
+DEFINITION_TYPES = ("function", "class")
+
+
+def _diff_range(old_bytes, new_bytes):
+    """Iki surum arasindaki tek degisiklik blogu: (baslangic, eski_bitis, yeni_bitis) bayt offsetleri."""
+    limit = min(len(old_bytes), len(new_bytes))
+    start = 0
+    while start < limit and old_bytes[start] == new_bytes[start]:
+        start += 1
+    suffix = 0
+    while suffix < limit - start and old_bytes[-1 - suffix] == new_bytes[-1 - suffix]:
+        suffix += 1
+    return start, len(old_bytes) - suffix, len(new_bytes) - suffix
+
+
+def _point(code_bytes, offset):
+    """Bayt offsetini tree-sitter (satir, sutun) noktasina cevirir."""
+    row = code_bytes.count(b"\n", 0, offset)
+    return (row, offset - (code_bytes.rfind(b"\n", 0, offset) + 1))
+
+
 class CodeGraphParser:
-    def __init__(self):
+    def __init__(self, keep_trees=False):
         """
         Neuro-Symbolic Graph Parser.
         Kodu metin olarak degil, AST (Abstract Syntax Tree) olarak analiz eder.
+        keep_trees=True ise her dosyanin son Tree'si saklanir ve reparse_file artimli calisir (izleme modu).
         """
         try:
             # HATA DUZELTME:
@@ -31,7 +55,10 @@ class CodeGraphParser:
                 raise e
             
         self.graph = nx.DiGraph()  # Yonlu Grafik (Directed Graph)
+        self.keep_trees = keep_trees
+        self.trees = {}  # mutlak yol -> (code_bytes, Tree)
 
+    @traced("parse_file")
     def parse_file(self, file_path):
         """Bir dosyadaki tum Class, Fonksiyon ve Cagrilari grafige ekler."""
         if not os.path.exists(file_path):
@@ -42,49 +69,54 @@ class CodeGraphParser:
             code = f.read()
 
         # Kodun byte formatina cevrilmesi
-        tree = self.parser.parse(bytes(code, "utf8"))
+        code_bytes = code.encode("utf8")
+        tree = self.parser.parse(code_bytes)
+        if self.keep_trees:
+            self.trees[os.path.abspath(file_path)] = (code_bytes, tree)
         root_node = tree.root_node
+        nodes_before = self.graph.number_of_nodes()
         
         # Dosya dugumu ekle
         file_node_id = f"FILE:{os.path.basename(file_path)}"
         self.graph.add_node(file_node_id, type="file", content=code)
 
         # 1. Tanimlari Bul (Definition Extraction)
-        self._extract_definitions(root_node, file_node_id, code.encode("utf8"))
+        self._current_file = os.path.basename(file_path)
+        self._extract_definitions(root_node, file_node_id, code_bytes)
         
         # 2. Cagrilari Bul (Call Graph Construction)
-        self._extract_calls(root_node, file_node_id, code.encode("utf8"))
+        self._extract_calls(root_node, file_node_id, code_bytes)
+
+        current_span().set(file=os.path.basename(file_path), bytes=len(code_bytes),
+                           nodes_added=self.graph.number_of_nodes() - nodes_before)
 
         print(f"Parsed: {os.path.basename(file_path)} | Nodes: {self.graph.number_of_nodes()} | Edges: {self.graph.number_of_edges()}")
 
     def _extract_definitions(self, node, parent_id, code_bytes):
         """Fonksiyon ve Class tanimlarini bulur."""
+        for node_id, node_type, child, def_parent in self._iter_definitions(node, parent_id, code_bytes):
+            # Grafige ekle
+            code_snippet = self._get_code_snippet(child, code_bytes)
+            self.graph.add_node(node_id, type=node_type, code=code_snippet, **self._location(child))
+            self.graph.add_edge(def_parent, node_id, relation="defines")
+
+    def _iter_definitions(self, node, parent_id, code_bytes):
+        """(dugum_id, tip, AST dugumu, ust_dugum_id) dortlulerini uretir."""
         # Recursive (Ozyinelemeli) arama
         for child in node.children:
             if child.type == "function_definition":
-                func_name = self._get_node_name(child, code_bytes)
-                node_id = f"FUNC:{func_name}"
-                
-                # Grafige ekle
-                code_snippet = self._get_code_snippet(child, code_bytes)
-                self.graph.add_node(node_id, type="function", code=code_snippet)
-                self.graph.add_edge(parent_id, node_id, relation="defines")
-                
+                node_id = f"FUNC:{self._get_node_name(child, code_bytes)}"
+                yield node_id, "function", child, parent_id
                 # Icindeki tanimlari da ara (Nested functions)
-                self._extract_definitions(child, node_id, code_bytes)
+                yield from self._iter_definitions(child, node_id, code_bytes)
 
             elif child.type == "class_definition":
-                class_name = self._get_node_name(child, code_bytes)
-                node_id = f"CLASS:{class_name}"
-                
-                code_snippet = self._get_code_snippet(child, code_bytes)
-                self.graph.add_node(node_id, type="class", code=code_snippet)
-                self.graph.add_edge(parent_id, node_id, relation="defines")
-                
-                self._extract_definitions(child, node_id, code_bytes)
-            
+                node_id = f"CLASS:{self._get_node_name(child, code_bytes)}"
+                yield node_id, "class", child, parent_id
+                yield from self._iter_definitions(child, node_id, code_bytes)
+
             else:
-                self._extract_definitions(child, parent_id, code_bytes)
+                yield from self._iter_definitions(child, parent_id, code_bytes)
 
     def _extract_calls(self, node, scope_id, code_bytes):
         """Kod icindeki fonksiyon cagrilarini (Calls) yakalar."""
@@ -101,6 +133,119 @@ class CodeGraphParser:
             
             self._extract_calls(child, scope_id, code_bytes)
 
+    def definitions_of(self, file_name):
+        return [n for n, d in self.graph.nodes(data=True)
+                if d.get("file") == file_name and d.get("type") in DEFINITION_TYPES]
+
+    def _drop_definition(self, node_id):
+        """
+        Tanimi grafikten kaldirir. Baska dosyalardan cagrilan dugumler, parser'in cozumlenmemis
+        cagri hedefleri gibi (ozniteliksiz) kalir; boylece gelen 'calls' kenarlari kaybolmaz.
+        """
+        incoming_calls = any(r == "calls" for _, _, r in self.graph.in_edges(node_id, data="relation"))
+        if not incoming_calls:
+            self.graph.remove_node(node_id)
+            return
+        self.graph.remove_edges_from([(u, v) for u, v, r in self.graph.in_edges(node_id, data="relation") if r == "defines"])
+        self.graph.remove_edges_from(list(self.graph.out_edges(node_id)))
+        self.graph.nodes[node_id].clear()
+
+    def _prune_placeholders(self, node_ids):
+        """Hic kenari kalmayan ozniteliksiz dugumleri (eski cagri hedefleri, birakilan tanimlar) siler."""
+        self.graph.remove_nodes_from([n for n in node_ids
+                                      if n in self.graph and not self.graph.nodes[n] and self.graph.degree(n) == 0])
+
+    @traced("reparse_file")
+    def reparse_file(self, file_path):
+        """
+        Degisen dosyayi artimli olarak yeniden parse eder: onceki Tree'ye tree.edit() uygulanir ve
+        parser.parse(..., old_tree) ile sadece degisen alt agaclar yeniden kurulur.
+        Sadece bayt araligi degisen (veya yeni) tanimlarin dugumleri guncellenir; digerlerinin
+        yalnizca satir numaralari kaydirilir.
+        Donus: {"changed": [...], "removed": [...]} grafik dugum id'leri.
+        """
+        key = os.path.abspath(file_path)
+        file_name = os.path.basename(file_path)
+        file_node_id = f"FILE:{file_name}"
+        previous = self.trees.get(key)
+        if previous is None or file_node_id not in self.graph:
+            before = set(self.definitions_of(file_name))
+            self.parse_file(file_path)
+            after = set(self.definitions_of(file_name))
+            return {"changed": sorted(after) + [file_node_id], "removed": sorted(before - after)}
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            code = f.read()
+        code_bytes = code.encode("utf8")
+        old_bytes, old_tree = previous
+        if code_bytes == old_bytes:
+            return {"changed": [], "removed": []}
+
+        start, old_end, new_end = _diff_range(old_bytes, code_bytes)
+        old_tree.edit(
+            start_byte=start, old_end_byte=old_end, new_end_byte=new_end,
+            start_point=_point(old_bytes, start), old_end_point=_point(old_bytes, old_end),
+            new_end_point=_point(code_bytes, new_end),
+        )
+        tree = self.parser.parse(code_bytes, old_tree)
+        self.trees[key] = (code_bytes, tree)
+
+        # Duzenlenen aralik + yapisi degisen araliklar (yeni agactaki offsetlerle)
+        dirty = [(start, new_end)] + [(r.start_byte, r.end_byte) for r in old_tree.changed_ranges(tree)]
+        self._current_file = file_name
+        old_definitions = set(self.definitions_of(file_name))
+        seen = set()
+        changed = []
+        for node_id, node_type, child, parent_id in self._iter_definitions(tree.root_node, file_node_id, code_bytes):
+            seen.add(node_id)
+            location = self._location(child)
+            data = self.graph.nodes[node_id] if node_id in self.graph else {}
+            touched = any(child.start_byte <= end and begin <= child.end_byte for begin, end in dirty)
+            if touched or data.get("file") != file_name or data.get("type") != node_type:
+                self.graph.add_node(node_id, type=node_type, code=self._get_code_snippet(child, code_bytes), **location)
+                changed.append(node_id)
+            else:
+                data.update(location)
+            if not self.graph.has_edge(parent_id, node_id):
+                # Tanim baska bir kapsama tasindiysa eski 'defines' kenari kaldirilir
+                self.graph.remove_edges_from([(u, v) for u, v, r in self.graph.in_edges(node_id, data="relation")
+                                              if r == "defines"])
+                self.graph.add_edge(parent_id, node_id, relation="defines")
+
+        removed = sorted(old_definitions - seen)
+        for node_id in removed:
+            self._drop_definition(node_id)
+
+        # Cagri kenarlari dosya kapsamindan cizildigi icin dosyanin tum 'calls' kenarlari yeniden kurulur
+        old_calls = [(u, v) for u, v, r in self.graph.out_edges(file_node_id, data="relation") if r == "calls"]
+        self.graph.remove_edges_from(old_calls)
+        self._extract_calls(tree.root_node, file_node_id, code_bytes)
+        self._prune_placeholders([v for _, v in old_calls] + removed)
+        self.graph.nodes[file_node_id]["content"] = code
+
+        current_span().set(file=file_name, edit_bytes=max(old_end, new_end) - start, changed=len(changed),
+                           removed=len(removed))
+        return {"changed": changed + [file_node_id], "removed": removed}
+
+    def remove_file(self, file_path):
+        """Silinen dosyanin dugumlerini grafikten kaldirir; kaldirilan id'leri dondurur."""
+        file_name = os.path.basename(file_path)
+        file_node_id = f"FILE:{file_name}"
+        self.trees.pop(os.path.abspath(file_path), None)
+        removed = self.definitions_of(file_name)
+        for node_id in removed:
+            self._drop_definition(node_id)
+        if file_node_id in self.graph:
+            call_targets = list(self.graph.successors(file_node_id))
+            self.graph.remove_node(file_node_id)
+            self._prune_placeholders(call_targets + removed)
+            removed.append(file_node_id)
+        return removed
+
+    def _location(self, node):
+        """Tanimin dosyasi ve satir araligi (1 tabanli, degisiklik etki analizi icin)."""
+        return {"file": self._current_file, "start_line": node.start_point[0] + 1, "end_line": node.end_point[0] + 1}
+
     def _get_node_name(self, node, code_bytes):
         """AST dugumunun ismini (identifier) ceker."""
         name_node = node.child_by_field_name("name")
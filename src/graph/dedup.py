@@ -0,0 +1,192 @@
+import os
+import re
+import zlib
+
+import numpy as np
+
+from src.utils.tracing import tracer
+
+DEDUP_TYPES = ("function", "class", "file")
+DEDUP_ENABLED = os.environ.get("QA_DEDUP", "1") != "0"
+DEFAULT_THRESHOLD = float(os.environ.get("QA_DEDUP_THRESHOLD", "0.85"))
+NUM_PERM = 64
+BANDS = 16  # 16 bant x 4 satir: ~0.5 benzerlikten itibaren aday olur, esik dogrulamada uygulanir
+SHINGLE_SIZE = 4
+MIN_TOKENS = 30  # kisa govdeler (getter, tek satirlik yardimcilar) birlestirilmez
+
+# Docstring/string, yorum, sayi, isim ve tek karakterli operatorler
+TOKEN_RE = re.compile(
+    r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+    r"|#[^\n]*|//[^\n]*|\b\d+(?:\.\d+)?\b|\w+|[^\s\w]"
+)
+
+_rng = np.random.default_rng(0x5EED)
+_MASKS = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+_MULTIPLIERS = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+
+
+def normalize_tokens(code):
+    """Yorumlar atilir, string ve sayilar yer tutucuya cevrilir; isimler ve yapi korunur."""
+    tokens = []
+    for token in TOKEN_RE.findall(code):
+        first = token[0]
+        if first == "#" or token.startswith("//"):
+            continue
+        if first in "\"'":
+            tokens.append("<S>")
+        elif first.isdigit():
+            tokens.append("<N>")
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def shingle_hashes(tokens, size=SHINGLE_SIZE):
+    """Ardisik 'size' token'lik parcalarin 32 bitlik (surecler arasi kararli) ozetleri."""
+    if len(tokens) < size:
+        return np.zeros(0, dtype=np.uint64)
+    grams = {"\x1f".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(hashes):
+    """NUM_PERM permutasyonlu MinHash imzasi (carpimsal hash ailesi, uint64 tasmasi bilerek kullanilir)."""
+    return ((hashes[:, None] ^ _MASKS) * _MULTIPLIERS).min(axis=0)
+
+
+def _node_text(data):
+    return data.get("code") or data.get("content") or ""
+
+
+def find_duplicates(graph, threshold=DEFAULT_THRESHOLD, types=DEDUP_TYPES, min_tokens=MIN_TOKENS):
+    """
+    Ayni tipteki (fonksiyon, sinif, dosya) neredeyse ayni dugumleri bulur.
+    MinHash imzalari LSH bantlarina dagitilir; ayni kovaya dusen adaylar imza uyumu
+    (tahmini Jaccard) >= threshold ise ayni gruba (union-find) alinir.
+    Donus: {temsilci: [uyeler]} (temsilci: dosya ve satira gore ilk dugum; kararli).
+    """
+    rows = NUM_PERM // BANDS
+    nodes, signatures = [], []
+    for node_id, data in graph.nodes(data=True):
+        if data.get("type") not in types:
+            continue
+        tokens = normalize_tokens(_node_text(data))
+        if len(tokens) < min_tokens:
+            continue
+        nodes.append(node_id)
+        signatures.append(minhash(shingle_hashes(tokens)))
+    if len(nodes) < 2:
+        return {}
+    signatures = np.vstack(signatures)
+
+    parent = list(range(len(nodes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets = {}
+    for i, node_id in enumerate(nodes):
+        node_type = graph.nodes[node_id]["type"]
+        for band in range(BANDS):
+            key = (node_type, band, signatures[i, band * rows:(band + 1) * rows].tobytes())
+            anchor = buckets.setdefault(key, i)
+            # Kovadaki ilk dugumle karsilastirmak yeterli: gruplar union-find ile birlesir
+            if anchor != i and find(anchor) != find(i):
+                if np.mean(signatures[anchor] == signatures[i]) >= threshold:
+                    parent[find(i)] = find(anchor)
+
+    groups = {}
+    for i in range(len(nodes)):
+        groups.setdefault(find(i), []).append(nodes[i])
+
+    def position(node_id):
+        data = graph.nodes[node_id]
+        return (data.get("file") or node_id, data.get("start_line", 0), node_id)
+
+    result = {}
+    for members in groups.values():
+        if len(members) > 1:
+            members.sort(key=position)
+            result[members[0]] = members[1:]
+    return result
+
+
+def collapse_duplicates(graph, threshold=DEFAULT_THRESHOLD):
+    """
+    Neredeyse ayni dugumleri grafikte isaretler:
+      uye: duplicate_of=<temsilci> ve uye -> temsilci 'duplicate_of' kenari
+      temsilci: duplicates=[uyeler]
+    Sadece temsilciler embed edilir ve uretime gider; sonuclar uyelere dagitilir.
+    Donus: {temsilci: [uyeler]}
+    """
+    with tracer.span("dedup", nodes=graph.number_of_nodes(), threshold=threshold) as span:
+        clear_duplicates(graph)
+        groups = find_duplicates(graph, threshold)
+        for representative, members in groups.items():
+            graph.nodes[representative]["duplicates"] = list(members)
+            for member in members:
+                graph.nodes[member]["duplicate_of"] = representative
+                graph.add_edge(member, representative, relation="duplicate_of")
+        span.set(groups=len(groups), collapsed=sum(len(m) for m in groups.values()))
+    return groups
+
+
+def clear_duplicates(graph, node_ids=None):
+    """
+    Isaretleri kaldirir. node_ids verilirse (orn. izleme modunda degisen dugumler) sadece o dugumlerin
+    ve temsilcisi oldugu uyelerin isaretleri kalkar. Donus: vektor kaydi yeniden yazilmasi gereken dugumler
+    (serbest kalan, artik kendisi embed edilecek uyeler ve uye listesi kisalan temsilciler).
+    """
+    released = []
+
+    def unlist(representative, member):
+        # Temsilcinin 'duplicates' listesi vektor metadata'sina yazilir; eskimis uye kalmamali
+        data = graph.nodes[representative] if representative in graph else {}
+        if member in (data.get("duplicates") or ()):
+            data["duplicates"] = [m for m in data["duplicates"] if m != member]
+            if not data["duplicates"]:
+                del data["duplicates"]
+            if representative not in released:
+                released.append(representative)
+
+    for node_id in list(graph.nodes()) if node_ids is None else [n for n in node_ids if n in graph]:
+        data = graph.nodes[node_id]
+        representative = data.pop("duplicate_of", None)
+        if representative is not None and graph.has_edge(node_id, representative):
+            graph.remove_edge(node_id, representative)
+        for member in data.pop("duplicates", None) or []:
+            if member in graph and graph.nodes[member].get("duplicate_of") == node_id:
+                del graph.nodes[member]["duplicate_of"]
+                if graph.has_edge(member, node_id):
+                    graph.remove_edge(member, node_id)
+                released.append(member)
+        if representative is not None and node_ids is not None:
+            unlist(representative, node_id)
+    gone = set(node_ids or ()) - set(graph.nodes())
+    if gone:
+        for node_id, data in list(graph.nodes(data=True)):
+            if data.get("duplicate_of") in gone:
+                # Temsilcisi grafikten silinmis uyeler
+                del data["duplicate_of"]
+                released.append(node_id)
+            for member in gone.intersection(data.get("duplicates") or ()):
+                # Grafikten silinmis uyeler
+                unlist(node_id, member)
+    return released
+
+
+def file_duplicates(graph, files):
+    """
+    Uretim birimleri icin dagitim tablosu: {uye dosya adi: temsilci dosya adi}.
+    Sadece temsilcisi de uretim listesinde olan kod dosyalari dahil edilir.
+    """
+    names = {item.split(": ", 1)[1] for item in files if item.startswith("CODE: ")}
+    mapping = {}
+    for name in names:
+        representative = graph.nodes.get(f"FILE:{name}", {}).get("duplicate_of")
+        if representative and representative[len("FILE:"):] in names:
+            mapping[name] = representative[len("FILE:"):]
+    return mapping
@@ -0,0 +1,154 @@
+import os
+import time
+import uuid
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from src.jobs.store import (JobStore, DEFAULT_JOBS_DB, HEARTBEAT_INTERVAL, RETENTION_SECONDS,
+                            SUCCEEDED, FAILED, CANCELLED)
+
+# Bitmis islerin temizlenme araligi (saniye)
+PURGE_INTERVAL = 3600
+
+
+class JobCancelled(Exception):
+    """Kullanici isi iptal ettiginde handler icinden firlatilir."""
+
+
+class JobContext:
+    def __init__(self, store, job_id):
+        """Handler'a verilen baglam: ilerleme bildirimi ve iptal kontrolu."""
+        self.store = store
+        self.job_id = job_id
+
+    def cancelled(self):
+        return self.store.is_cancel_requested(self.job_id)
+
+    def check_cancelled(self):
+        if self.cancelled():
+            raise JobCancelled()
+
+    def progress(self, fraction, message=None):
+        """Ilerlemeyi kaydeder; iptal istenmisse JobCancelled firlatir (isbirlikci iptal)."""
+        self.store.update_progress(self.job_id, max(0.0, min(1.0, fraction)), message)
+        self.check_cancelled()
+
+
+class JobRunner:
+    def __init__(self, store=None, max_workers=2, heartbeat_interval=HEARTBEAT_INTERVAL,
+                 retention_seconds=RETENTION_SECONDS):
+        """
+        Yerel is havuzu. Analiz ve uretim Streamlit betik calismasi disinda,
+        arka plan thread'lerinde calisir; durum JobStore'da tutulur.
+        Ayni veritabanini paylasan surecler worker_id ve heartbeat ile ayrilir (bkz. JobStore.recover);
+        bitmis isler retention_seconds sonra silinir.
+        """
+        self.store = store or JobStore()
+        self.handlers = {}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.heartbeat_interval = heartbeat_interval
+        self.retention_seconds = retention_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qa-job")
+        self._recovered = False
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def register(self, kind, handler):
+        """handler(params, ctx) -> JSON'a cevrilebilir sonuc"""
+        self.handlers[kind] = handler
+
+    def recover(self):
+        """
+        Baslangicta: durmus sureclerden kalan isleri devralir, eski bitmis isleri siler ve
+        heartbeat thread'ini baslatir (canli kalan diger sureclerin isleri devralinmaz).
+        """
+        if self._recovered:
+            return
+        self._recovered = True
+        self._take_over()
+        self.purge()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="qa-job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _take_over(self):
+        for job_id in self.store.recover(self.worker_id, stale_after=6 * self.heartbeat_interval):
+            job = self.store.get(job_id)
+            if job["kind"] in self.handlers:
+                self._pool.submit(self._run, job_id)
+
+    def purge(self):
+        """Saklama suresi dolmus bitmis isleri (parametre ve sonuclariyla) siler."""
+        if self.retention_seconds and self.retention_seconds > 0:
+            return self.store.purge(self.retention_seconds)
+        return 0
+
+    def _heartbeat_loop(self):
+        last_purge = time.monotonic()
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self.store.heartbeat(self.worker_id)
+                # Calisirken duran baska bir surecin isleri de devralinir
+                self._take_over()
+                if time.monotonic() - last_purge >= PURGE_INTERVAL:
+                    last_purge = time.monotonic()
+                    self.purge()
+            except Exception as e:
+                print(f"Warning: Job heartbeat failed: {type(e).__name__}: {e}")
+
+    def submit(self, kind, params, owner=None):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = self.store.create(kind, params, owner=owner, worker=self.worker_id)
+        self._pool.submit(self._run, job_id)
+        return job_id
+
+    def status(self, job_id):
+        return self.store.get(job_id)
+
+    def cancel(self, job_id):
+        self.store.request_cancel(job_id)
+
+    def result(self, job_id):
+        job = self.store.get(job_id)
+        return job["result"] if job and job["status"] == SUCCEEDED else None
+
+    def _run(self, job_id):
+        job = self.store.get(job_id)
+        if job is None:
+            return
+        ctx = JobContext(self.store, job_id)
+        if job["cancel_requested"]:
+            self.store.finish(job_id, CANCELLED)
+            return
+        if not self.store.mark_running(job_id, self.worker_id):
+            return  # baska bir surec devraldi veya is artik kuyrukta degil
+        try:
+            result = self.handlers[job["kind"]](job["params"], ctx)
+            self.store.finish(job_id, SUCCEEDED, result=result)
+        except JobCancelled:
+            self.store.finish(job_id, CANCELLED)
+        except Exception as e:
+            traceback.print_exc()
+            self.store.finish(job_id, FAILED, error=f"{type(e).__name__}: {e}")
+
+    def shutdown(self, wait=True):
+        self._stop.set()
+        self._pool.shutdown(wait=wait)
+
+
+_RUNNER = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_runner(db_path=DEFAULT_JOBS_DB):
+    """Surec genelinde tek JobRunner. Tum Streamlit oturumlari ayni kuyrugu paylasir."""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            from src.jobs.tasks import register_default_tasks
+            _RUNNER = JobRunner(JobStore(db_path), max_workers=int(os.getenv("QA_JOB_WORKERS", "2")))
+            register_default_tasks(_RUNNER)
+            _RUNNER.recover()
+        return _RUNNER
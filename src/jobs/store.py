@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+DEFAULT_JOBS_DB = os.path.join(os.getcwd(), "data", "jobs.db")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED, INTERRUPTED)
+
+# Ayni jobs.db'yi birden fazla surec (orn. iki Streamlit sunucusu) paylasabilir: her surec kendi aktif
+# islerine periyodik heartbeat yazar; sadece heartbeat'i STALE_AFTER saniyedir guncellenmeyen isler devralinir.
+HEARTBEAT_INTERVAL = float(os.environ.get("QA_JOB_HEARTBEAT_SECONDS", "10"))
+STALE_AFTER = 6 * HEARTBEAT_INTERVAL
+# Bitmis islerin (parametre ve sonuclariyla) saklanma suresi
+RETENTION_SECONDS = float(os.environ.get("QA_JOB_RETENTION_HOURS", "24")) * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    owner TEXT,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    worker TEXT,
+    heartbeat REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs(owner);
+"""
+
+
+class JobStore:
+    def __init__(self, db_path=DEFAULT_JOBS_DB):
+        """
+        Kalici is durumu (SQLite).
+        Sayfa yenilense veya Streamlit yeniden baslasa bile islerin durumu ve sonuclari korunur.
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            # Eski surumle olusturulmus veritabanlari
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, sql_type in (("worker", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {sql_type}")
+            self._conn.commit()
+
+    def _execute(self, sql, args=()):
+        with self._lock:
+            cur = self._conn.execute(sql, args)
+            self._conn.commit()
+            return cur
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"]) if job["params"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, kind, params, owner=None, worker=None):
+        """worker: isi calistiracak surecin kimligi (JobRunner.worker_id)."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, kind, owner, status, params, created, worker, heartbeat) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, owner, QUEUED, json.dumps(params), now, worker, now),
+        )
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def list(self, owner=None, statuses=None, limit=50):
+        sql = "SELECT * FROM jobs"
+        clauses, args = [], []
+        if owner is not None:
+            clauses.append("owner = ?")
+            args.append(owner)
+        if statuses:
+            clauses.append(f"status IN ({','.join('?' * len(statuses))})")
+            args.extend(statuses)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def mark_running(self, job_id, worker=None):
+        """Kuyruktaki isi sahiplenir; baska bir surec once aldiysa (veya is artik kuyrukta degilse) False."""
+        now = time.time()
+        cur = self._execute(
+            "UPDATE jobs SET status = ?, started = ?, heartbeat = ?, worker = COALESCE(?, worker) "
+            "WHERE id = ? AND status = ? AND (? IS NULL OR worker IS NULL OR worker = ?)",
+            (RUNNING, now, now, worker, job_id, QUEUED, worker, worker))
+        return cur.rowcount == 1
+
+    def heartbeat(self, worker):
+        """Surecin kuyruktaki ve calisan islerinin canli oldugunu kaydeder."""
+        self._execute(
+            f"UPDATE jobs SET heartbeat = ? WHERE worker = ? AND status IN ({','.join('?' * len(ACTIVE_STATES))})",
+            (time.time(), worker, *ACTIVE_STATES))
+
+    def update_progress(self, job_id, progress, message=None):
+        self._execute("UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?",
+                      (float(progress), message, job_id))
+
+    def finish(self, job_id, status, result=None, error=None):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, progress = CASE WHEN ? = ? THEN 1 ELSE progress END WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), status, SUCCEEDED, job_id),
+        )
+
+    def request_cancel(self, job_id):
+        self._execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+
+    def is_cancel_requested(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def recover(self, worker=None, stale_after=STALE_AFTER):
+        """
+        Sahibi olan surec durmus (heartbeat'i stale_after saniyedir guncellenmemis) isleri devralir:
+        yarida kalan 'running' isler 'interrupted' yapilir, kuyrukta bekleyenler 'worker'a atanir ve
+        kimlikleri yeniden calistirilmak uzere dondurulur. Canli bir surecin isleri degistirilmez.
+        """
+        now = time.time()
+        stale = "(worker IS NULL OR worker != ?) AND (heartbeat IS NULL OR heartbeat < ?)"
+        cutoff = now - stale_after
+        self._execute(f"UPDATE jobs SET status = ?, finished = ?, error = ? WHERE status = ? AND {stale}",
+                      (INTERRUPTED, now, "Process restarted while the job was running", RUNNING, worker or "", cutoff))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id FROM jobs WHERE status = ? AND {stale} ORDER BY created",
+                                      (QUEUED, worker or "", cutoff)).fetchall()
+        claimed = []
+        for (job_id,) in rows:
+            # Ayni anda devralmaya calisan baska bir surecle yarisir; satir basina kosullu guncelleme
+            cur = self._execute(f"UPDATE jobs SET worker = ?, heartbeat = ? WHERE id = ? AND status = ? AND {stale}",
+                                (worker, now, job_id, QUEUED, worker or "", cutoff))
+            if cur.rowcount == 1:
+                claimed.append(job_id)
+        return claimed
+
+    def purge(self, older_than_seconds):
+        """Bitmis eski is kayitlarini siler."""
+        cutoff = time.time() - older_than_seconds
+        cur = self._execute(
+            f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINAL_STATES))}) AND finished < ?",
+            (*FINAL_STATES, cutoff),
+        )
+        return cur.rowcount
@@ -0,0 +1,99 @@
+from src.utils.tracing import tracer
+
+ANALYSIS = "analysis"
+GENERATION = "generation"
+
+
+def _resume_trace(params):
+    # Tracing bayragi isi gonderen oturumundur; worker thread'i onceki isin ayarini tasimaz
+    if params.get("trace_id"):
+        tracer.resume_run(params["trace_id"], enabled=params.get("tracing"))
+    else:
+        tracer.start_run(enabled=params.get("tracing"))
+
+
+def run_analysis(params, ctx):
+    """Dosyalari grafige isler ve oturum koleksiyonuna yazar."""
+    from src.pipeline.ingestion import ingest_files, build_index
+    from src.pipeline.checkpoint import graph_fingerprint
+    from src.pipeline.priority import rank_units
+    from src.rag.traceability import load_traceability
+    from src.graph.dedup import DEDUP_ENABLED, collapse_duplicates, file_duplicates
+
+    _resume_trace(params)
+    files = params["files"]
+
+    def on_progress(i, total, msg):
+        # Indexleme icin son %10 ayrilir
+        ctx.progress(0.9 * i / total if total else 0, f"[{i+1}/{total}] {msg}")
+
+    with tracer.span("analysis", files=len(files)):
+        parser, summary = ingest_files(files, on_progress=on_progress)
+        # Neredeyse ayni dosya/fonksiyonlarin sadece temsilcisi embed edilir ve uretilir
+        duplicates = {}
+        if params.get("dedup", DEDUP_ENABLED):
+            collapse_duplicates(parser.graph)
+            duplicates = file_duplicates(parser.graph, summary)
+        ctx.progress(0.9, "Embedding and indexing knowledge graph...")
+        vector_store = build_index(parser, params["session_id"])
+        # Grafik sadece bu isde bellekte; butceli/oncelikli uretim icin siralama simdi hesaplanir
+        priorities = rank_units(parser.graph, summary, vector_store)
+        traceability = load_traceability(vector_store)
+
+    tracer.export(trace_id=params.get("trace_id"))
+    return {
+        "file_summary": summary,
+        "node_count": parser.graph.number_of_nodes(),
+        "edge_count": parser.graph.number_of_edges(),
+        "fingerprint": graph_fingerprint(parser.graph),
+        "priorities": priorities,
+        "duplicates": duplicates,
+        "traceability": traceability.stats() if traceability is not None else None,
+    }
+
+
+def run_generation(params, ctx):
+    """Oturum koleksiyonundan Gherkin senaryolari uretir."""
+    from src.rag.vector_store import CodeVectorStore
+    from src.agent.llm_client import LLMClient
+    from src.pipeline.generation import COMPONENT_WISE, generate
+    from src.pipeline.checkpoint import CheckpointStore, make_run_id
+    from src.pipeline.priority import Budget, coverage_report
+
+    _resume_trace(params)
+    mode = params["mode"]
+    # Global modda son %40 konsolidasyon icin ayrilir
+    scale = 1.0 if mode == COMPONENT_WISE else 0.6
+
+    def on_progress(i, total, msg):
+        ctx.progress(min(1.0, i / total * scale) if total else 0, msg)
+
+    with tracer.span("vector_store.init"):
+        vector_store = CodeVectorStore(collection_name=params["session_id"])
+    # Eski kayitlarda bu anahtarlar yoktur: None -> QA_LLM_SESSION / QA_LLM_REUSE_CONTEXT
+    llm = LLMClient(model_name=params["model_name"], session=params.get("llm_session"),
+                    reuse_context=params.get("reuse_context"))
+
+    # Ayni koleksiyon + mod + model + icerik icin run_id sabittir; tekrar gonderim kaldigi yerden devam eder
+    checkpoint = CheckpointStore()
+    run_id = make_run_id(collection=params["session_id"], mode=mode, model=params["model_name"],
+                         files=params["files"], fingerprint=params.get("fingerprint"))
+    if params.get("fresh"):
+        checkpoint.reset_run(run_id)
+    # priorities: analiz isinin rank_units ciktisi; verildiyse dosyalar bu sirayla islenir
+    ranking = [tuple(pair) for pair in params["priorities"]] if params.get("priorities") else None
+    files = [item for item, _ in ranking] if ranking else params["files"]
+    budget = Budget(seconds=params.get("budget_seconds"), tokens=params.get("budget_tokens"))
+    result = generate(mode, files, vector_store, llm, on_progress=on_progress,
+                      checkpoint=checkpoint, run_id=run_id, budget=budget if budget.limited else None,
+                      duplicates=params.get("duplicates"))
+
+    tracer.export(trace_id=params.get("trace_id"))
+    return {"report": result.report, "units": result.units, "failed": result.failed,
+            "resumed": result.resumed, "shared": result.shared, "run_id": run_id,
+            "coverage": coverage_report(ranking, result) if ranking else None}
+
+
+def register_default_tasks(runner):
+    runner.register(ANALYSIS, run_analysis)
+    runner.register(GENERATION, run_generation)
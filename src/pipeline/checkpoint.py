@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+DEFAULT_CHECKPOINT_DB = os.path.join(os.getcwd(), "data", "checkpoints.db")
+
+# Bu sureden uzun suredir dokunulmamis calismalar silinir (calisma bitince ve GC sirasinda)
+RETENTION_SECONDS = float(os.environ.get("QA_CHECKPOINT_RETENTION_HOURS", "168")) * 3600
+
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    meta TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS units (
+    run_id TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    input_hash TEXT,
+    status TEXT NOT NULL,
+    output TEXT,
+    error TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (run_id, unit)
+);
+"""
+
+
+def graph_fingerprint(graph):
+    """Grafik iceriginin ozeti. Kod degisirse eski checkpoint'ler yeniden kullanilmaz."""
+    digest = hashlib.sha1()
+    for node_id in sorted(graph.nodes()):
+        data = graph.nodes[node_id]
+        content = data.get("content") or data.get("code") or ""
+        digest.update(node_id.encode("utf-8", "ignore"))
+        digest.update(hashlib.sha1(content.encode("utf-8", "ignore")).digest())
+    return digest.hexdigest()[:16]
+
+
+def make_run_id(**meta):
+    """Ayni girdilerle (koleksiyon, mod, model, dosyalar, parmak izi) her zaman ayni run_id uretilir."""
+    return hashlib.sha1(json.dumps(meta, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+
+
+def hash_text(text):
+    return hashlib.sha1(text.encode("utf-8", "ignore")).hexdigest()[:16]
+
+
+class CheckpointStore:
+    def __init__(self, db_path=DEFAULT_CHECKPOINT_DB):
+        """
+        Uretim calismalari icin checkpoint deposu.
+        Her dosya ciktisi ve konsolidasyon adimi tamamlandiginda kaydedilir;
+        yarida kalan bir calisma devam ettirildiginde sadece eksik/basarisiz birimler yeniden uretilir.
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def _execute(self, sql, args=()):
+        with self._lock:
+            cur = self._conn.execute(sql, args)
+            self._conn.commit()
+            return cur
+
+    def start_run(self, run_id, meta=None):
+        now = time.time()
+        self._execute(
+            "INSERT INTO runs (run_id, meta, created, updated) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(run_id) DO UPDATE SET updated = excluded.updated, finished = NULL",
+            (run_id, json.dumps(meta or {}), now, now),
+        )
+
+    def finish_run(self, run_id):
+        now = time.time()
+        self._execute("UPDATE runs SET finished = ?, updated = ? WHERE run_id = ?", (now, now, run_id))
+
+    def reset_run(self, run_id):
+        """Calismanin tum checkpoint'lerini siler (bastan uretim)."""
+        self._execute("DELETE FROM units WHERE run_id = ?", (run_id,))
+        self._execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def get(self, run_id, unit, input_hash=None):
+        """Tamamlanmis birimin ciktisini dondurur; yoksa veya girdi degistiyse None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, output, input_hash FROM units WHERE run_id = ? AND unit = ?", (run_id, unit)
+            ).fetchone()
+        if row is None or row[0] != DONE:
+            return None
+        if input_hash is not None and row[2] != input_hash:
+            return None
+        return row[1]
+
+    def record(self, run_id, unit, output, input_hash=None):
+        self._execute(
+            "INSERT OR REPLACE INTO units (run_id, unit, input_hash, status, output, error, updated) VALUES (?, ?, ?, ?, ?, NULL, ?)",
+            (run_id, unit, input_hash, DONE, output, time.time()),
+        )
+
+    def record_failure(self, run_id, unit, error, input_hash=None):
+        self._execute(
+            "INSERT OR REPLACE INTO units (run_id, unit, input_hash, status, output, error, updated) VALUES (?, ?, ?, ?, NULL, ?, ?)",
+            (run_id, unit, input_hash, FAILED, str(error), time.time()),
+        )
+
+    def progress(self, run_id):
+        """{'done': n, 'failed': m} sayaclari."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM units WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        counts = {DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def purge(self, older_than_seconds=RETENTION_SECONDS):
+        """Uzun suredir dokunulmamis calismalari siler."""
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            stale = [r[0] for r in self._conn.execute("SELECT run_id FROM runs WHERE updated < ?", (cutoff,))]
+        for run_id in stale:
+            self.reset_run(run_id)
+        return len(stale)
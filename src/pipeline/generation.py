@@ -0,0 +1,229 @@
+import time
+
+from src.utils.tracing import tracer
+from src.pipeline.checkpoint import RETENTION_SECONDS, hash_text
+from src.rag.traceability import trace_context
+
+COMPONENT_WISE = "Component-Wise (Individual Files)"
+GLOBAL_CONSOLIDATION = "Global Consolidation (Recommended)"
+
+
+class GenerationResult:
+    def __init__(self, report, units=0, failed=None, resumed=0, skipped=None, budget=None, shared=0):
+        """
+        Uretim ciktisi: .feature metni ve birim (dosya) bazinda basari sayaclari.
+        resumed: checkpoint'ten yeniden kullanilan (LLM'e gonderilmeyen) birim sayisi.
+        skipped: butce bittigi icin uretilmeyen dosyalar, budget: Budget.to_dict() (butceli calismada).
+        shared: neredeyse ayni oldugu icin temsilcisinin ciktisini alan (LLM'e gonderilmeyen) dosya sayisi.
+        """
+        self.report = report
+        self.units = units
+        self.failed = failed or []
+        self.resumed = resumed
+        self.skipped = skipped or []
+        self.budget = budget
+        self.shared = shared
+
+    @property
+    def ok(self):
+        return not self.failed
+
+
+def file_name_of(summary_item):
+    """'CODE: x.py' -> 'x.py'"""
+    return summary_item.split(": ")[1]
+
+
+def project_name(files):
+    return file_name_of(files[0]).split(".")[0] if files else "Project"
+
+
+def project_overview(files, max_chars=2000):
+    """LLM oturumunun sabit onekinde kullanilan kisa proje ozeti (tum cagrilarda ayni kalir)."""
+    code = [file_name_of(f) for f in files if f.startswith("CODE: ")]
+    docs = [file_name_of(f) for f in files if f.startswith("DOC: ")]
+    overview = (f"Project: {project_name(files)}\n"
+                f"Source files ({len(code)}): {', '.join(code)}\n"
+                f"Requirement documents ({len(docs)}): {', '.join(docs) or '-'}")
+    return overview[:max_chars]
+
+
+class Checkpointer:
+    def __init__(self, store=None, run_id=None):
+        """Uretim birimlerinin checkpoint baglantisi; depo veya run_id yoksa her sey no-op olur."""
+        self.store = store if run_id else None
+        self.run_id = run_id
+        self.resumed = 0
+
+    def cached(self, unit, input_hash=None):
+        if self.store is None:
+            return None
+        output = self.store.get(self.run_id, unit, input_hash)
+        if output is not None:
+            self.resumed += 1
+        return output
+
+    def save(self, unit, output, llm, input_hash=None):
+        if self.store is None:
+            return
+        if llm.last_error:
+            self.store.record_failure(self.run_id, unit, llm.last_error, input_hash)
+        else:
+            self.store.record(self.run_id, unit, output, input_hash)
+
+
+def generate_file(fname, query, vector_store, llm, ckpt=None, budget=None):
+    """
+    Tek dosya birimi: checkpoint varsa onu kullanir, yoksa retrieval + LLM.
+    Donus: (cikti veya None, basarisiz mi). ckpt: Checkpointer (None ise checkpoint kullanilmaz).
+    """
+    ckpt = ckpt or Checkpointer()
+    unit = f"file:{fname}"
+    out = ckpt.cached(unit)
+    if out is not None:
+        return out, False
+    res = vector_store.search_similar(query, k=3)
+    if not res['documents']:
+        return None, False
+    context = "\n".join(res['documents'][0])
+    # Gereksinim <-> kod baglantilari onceden hesaplanmistir (src/rag/traceability.py); ek sorgu yapilmaz
+    trace = trace_context(vector_store, fname)
+    if trace:
+        context += "\n\n" + trace
+    started, tokens_before = time.monotonic(), getattr(llm, "tokens_used", 0)
+    out = llm.generate_response(context, str(res['metadatas'][0]), query)
+    if budget is not None:
+        budget.record(time.monotonic() - started, getattr(llm, "tokens_used", 0) - tokens_before)
+    ckpt.save(unit, out, llm)
+    return out, bool(llm.last_error)
+
+
+def _out_of_budget(budget, files, i, reserve_units=0):
+    """Butce bir sonraki birime yetmiyorsa kalan dosya adlarini dondurur (yoksa None)."""
+    if budget is None or budget.allows(reserve_units):
+        return None
+    skipped = [file_name_of(f) for f in files[i:]]
+    print(f"Budget exhausted ({budget.stopped_by}); skipping {len(skipped)} remaining unit(s).")
+    return skipped
+
+
+def _representatives(files, duplicates):
+    """Uretime gidecek birimler ve {temsilci: [uye dosyalar]} (duplicates: {uye: temsilci})."""
+    members_of = {}
+    for member, representative in sorted((duplicates or {}).items()):
+        members_of.setdefault(representative, []).append(member)
+    return [f for f in files if file_name_of(f) not in (duplicates or {})], members_of
+
+
+def generate_component_wise(files, vector_store, llm, on_progress=None, checkpoint=None, run_id=None, budget=None,
+                            duplicates=None):
+    """
+    Her dosya icin ayri Gherkin senaryolari uretir.
+    duplicates ({uye: temsilci}) verilirse sadece temsilciler uretilir; ciktilari uyelerin bolumlerine kopyalanir.
+    """
+    units, members_of = _representatives(files, duplicates)
+    total = len(units)
+    failed = []
+    skipped = []
+    shared = 0
+    ckpt = Checkpointer(checkpoint, run_id)
+    report = f"Feature: Individual Component Tests for {project_name(files)}\n\n"
+    with tracer.span("generation", mode="component", files=total) as span:
+        for i, f in enumerate(units):
+            fname = file_name_of(f)
+            skipped = _out_of_budget(budget, units, i) or []
+            if skipped:
+                break
+            if on_progress:
+                on_progress(i, total, f"Processing: `{fname}` ({i+1}/{total})")
+            query = f"Generate detailed Gherkin scenarios for the logic in {fname}."
+            out, unit_failed = generate_file(fname, query, vector_store, llm, ckpt, budget)
+            if out is not None:
+                if unit_failed:
+                    failed.extend([fname] + members_of.get(fname, []))
+                report += f"# --- Source: {fname} ---\n{out}\n\n"
+                for member in members_of.get(fname, []):
+                    report += f"# --- Source: {member} ---\n# Near-duplicate of {fname}; scenarios shared.\n{out}\n\n"
+                    shared += 1
+        skipped += [m for name in skipped for m in members_of.get(name, [])]
+        span.set(skipped=len(skipped), shared=shared)
+    return GenerationResult(report, units=len(files), failed=failed, resumed=ckpt.resumed, skipped=skipped,
+                            budget=budget.to_dict() if budget is not None else None, shared=shared)
+
+
+def generate_global(files, vector_store, llm, on_progress=None, checkpoint=None, run_id=None, budget=None,
+                    duplicates=None):
+    """
+    Dosya bazli ciktilari toplayip tek bir master .feature dosyasinda birlestirir.
+    Butceli calismada konsolidasyon icin bir birimlik pay ayrilir; butce biterse toplanan ciktilar birlestirilir.
+    Neredeyse ayni dosyalarin (duplicates) sadece temsilcisi uretilir; senaryolari konsolidasyonda ortaktir.
+    """
+    units, members_of = _representatives(files, duplicates)
+    total = len(units)
+    failed = []
+    skipped = []
+    ckpt = Checkpointer(checkpoint, run_id)
+    raw_knowledge_accumulator = ""
+    with tracer.span("generation", mode="global", files=total) as span:
+        for i, f in enumerate(units):
+            fname = file_name_of(f)
+            skipped = _out_of_budget(budget, units, i, reserve_units=1) or []
+            if skipped:
+                break
+            if on_progress:
+                on_progress(i, total, f"Extracting Knowledge: `{fname}` ({i+1}/{total})")
+            query = f"Create highly detailed Gherkin scenarios for the core logic in {fname}."
+            out, unit_failed = generate_file(fname, query, vector_store, llm, ckpt, budget)
+            if unit_failed:
+                failed.append(fname)
+                continue
+            if out is not None:
+                raw_knowledge_accumulator += f"\n# RAW SOURCE {fname}:\n{out}\n"
+
+        if on_progress:
+            on_progress(total, total, "Refining Master Suite...")
+        # Konsolidasyon girdisi degismediyse (tum dosyalar checkpoint'ten geldiyse) sonucu da yeniden kullan
+        master_hash = hash_text(raw_knowledge_accumulator)
+        report = ckpt.cached("consolidation", master_hash)
+        if report is None:
+            master_prompt = f"SYSTEM ROLE: Senior QA Architect. Merge these scenarios into ONE .feature file. REMOVE EXACT DUPLICATES.\n\nINPUT:\n{raw_knowledge_accumulator}"
+            started, tokens_before = time.monotonic(), getattr(llm, "tokens_used", 0)
+            report = llm.generate_response(master_prompt, "Project Global Context", "Generate Final Master Feature",
+                                           follow_up=True)
+            if budget is not None:
+                budget.record(time.monotonic() - started, getattr(llm, "tokens_used", 0) - tokens_before)
+            ckpt.save("consolidation", report, llm, master_hash)
+            if llm.last_error:
+                failed.append("<consolidation>")
+        skipped += [m for name in skipped for m in members_of.get(name, [])]
+        shared = sum(len(m) for name, m in members_of.items() if name not in skipped)
+        span.set(skipped=len(skipped), shared=shared)
+    return GenerationResult(report, units=total + 1, failed=failed, resumed=ckpt.resumed, skipped=skipped,
+                            budget=budget.to_dict() if budget is not None else None, shared=shared)
+
+
+def generate(mode, files, vector_store, llm, on_progress=None, checkpoint=None, run_id=None, budget=None,
+             duplicates=None):
+    """
+    Secilen stratejiyle uretim yapar.
+    checkpoint + run_id verilirse tamamlanan birimler kaydedilir ve devam ettirmede atlanir.
+    budget (src.pipeline.priority.Budget) verilirse dosyalar verilen sirayla, butce bitene kadar islenir;
+    onemli birimlerin once gelmesi icin files once priority.rank_units ile siralanmalidir.
+    duplicates: {uye dosya: temsilci dosya} (src.graph.dedup.file_duplicates); uyeler LLM'e gonderilmez.
+    """
+    if checkpoint is not None and run_id:
+        checkpoint.start_run(run_id, {"mode": mode, "files": len(files)})
+    if getattr(llm, "session", False):
+        llm.project_summary = project_overview(files)
+    if budget is not None:
+        budget.start()
+    if mode == COMPONENT_WISE:
+        result = generate_component_wise(files, vector_store, llm, on_progress, checkpoint, run_id, budget, duplicates)
+    else:
+        result = generate_global(files, vector_store, llm, on_progress, checkpoint, run_id, budget, duplicates)
+    if checkpoint is not None and run_id and not result.failed and not result.skipped:
+        checkpoint.finish_run(run_id)
+    if checkpoint is not None:
+        # Bu calisma az once guncellendi; sadece baska, eski calismalar silinir
+        checkpoint.purge(RETENTION_SECONDS)
+    return result
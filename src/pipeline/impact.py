@@ -0,0 +1,274 @@
+import os
+import re
+import subprocess
+
+from src.utils.tracing import tracer
+from src.pipeline.generation import GenerationResult, file_name_of, generate_file, project_overview
+
+DEFAULT_DEPTH = 2
+DEFINITION_TYPES = ("function", "class")
+SECTION_RE = re.compile(r"^# --- Source: (.+?) ---$", re.MULTILINE)
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
+
+
+# --- Degisiklik girdileri ---
+
+def _diff_name(path):
+    """Diff basligindaki yolu ('a/src/x.py', sekme ile zaman damgasi olabilir) basename'e cevirir."""
+    return os.path.basename(re.sub(r"^[ab]/", "", path.split("\t")[0].strip()))
+
+
+def parse_diff(diff_text):
+    """
+    Unified diff'i {dosya_adi: degisen satirlar (yeni dosyada)} sozlugune cevirir.
+    Silinen dosyalar None ile isaretlenir (tum dosya etkilenmis sayilir).
+    Yeniden adlandirmada eski ad silinmis, yeni ad tamamen degismis sayilir
+    (icerik degismeyen 'rename from/to' bloklarinda ---/+++ satiri yoktur).
+    Grafik dugumleri dosya adiyla (basename) tutuldugu icin anahtarlar da basename'dir.
+    """
+    changes = {}
+    current = None
+    old_path = None
+    renamed_from = None
+    for line in diff_text.splitlines():
+        if line.startswith("diff --git "):
+            old_path = renamed_from = None
+        elif line.startswith("rename from "):
+            renamed_from = _diff_name(line[len("rename from "):])
+        elif line.startswith("rename to ") and renamed_from is not None:
+            renamed_to = _diff_name(line[len("rename to "):])
+            if renamed_to != renamed_from:
+                changes[renamed_from] = None
+                changes[renamed_to] = None
+        elif line.startswith("--- "):
+            old_path = line[4:].strip()
+        elif line.startswith("+++ "):
+            new_path = line[4:].strip()
+            deleted = new_path == "/dev/null"
+            current = _diff_name(old_path if deleted else new_path)
+            if not deleted and old_path not in (None, "/dev/null") and _diff_name(old_path) != current:
+                changes[_diff_name(old_path)] = None
+                changes[current] = None
+            elif deleted or (current in changes and changes[current] is None):
+                changes[current] = None
+            else:
+                changes[current] = changes.get(current) or set()
+        elif line.startswith("@@") and current is not None and changes[current] is not None:
+            match = HUNK_RE.match(line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                # Sadece silme iceren hunk (count=0): silinen satirlarin komsulari degismis sayilir
+                changes[current].update(range(start, start + count) if count else (start, start + 1))
+    return changes
+
+
+def git_diff(repo_dir, base="HEAD"):
+    """Depodaki calisma agaci ile 'base' arasindaki farki (-U0) dondurur."""
+    result = subprocess.run(["git", "diff", "-U0", "--no-color", base, "--"], cwd=repo_dir,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git diff failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def changed_files(paths):
+    """Degisen dosya listesini (tum dosya etkilenmis) degisiklik sozlugune cevirir."""
+    return {os.path.basename(p): None for p in paths}
+
+
+# --- Etki analizi ---
+
+class ImpactReport:
+    def __init__(self, seeds, distances, files, removed):
+        """
+        seeds: degisiklikle dogrudan eslesen dugumler
+        distances: {dugum: ters cagri grafigindeki uzaklik} (seed'ler 0)
+        files: yeniden uretilecek dosya/dokuman adlari
+        removed: artik grafikte olmayan (silinmis) dosyalar
+        """
+        self.seeds = seeds
+        self.distances = distances
+        self.files = files
+        self.removed = removed
+
+    def to_dict(self):
+        return {
+            "seeds": sorted(self.seeds),
+            "impacted_nodes": len(self.distances),
+            "files": sorted(self.files),
+            "removed": sorted(self.removed),
+        }
+
+
+class ImpactAnalyzer:
+    def __init__(self, graph):
+        """
+        Degisiklikleri grafik dugumlerine esler ve ters kenarlar boyunca etkilenenleri bulur.
+        Parser cagri kenarlarini dosya dugumunden cizer ve 'self.x()' gibi cagrilari 'FUNC:self.x'
+        hedefi olarak tutar; bu nedenle cagri hedefleri son isim parcasiyla tanima eslenir.
+        """
+        self.graph = graph
+        self._targets_by_name = {}
+        for node_id in graph.nodes():
+            if node_id.startswith("FUNC:"):
+                short = node_id[len("FUNC:"):].rsplit(".", 1)[-1]
+                self._targets_by_name.setdefault(short, []).append(node_id)
+
+    def _definitions_in(self, file_name):
+        return [n for n, d in self.graph.nodes(data=True)
+                if d.get("file") == file_name and d.get("type") in DEFINITION_TYPES]
+
+    def seeds_for(self, changes):
+        """Degisiklik sozlugunu ({dosya: satirlar veya None}) grafik dugumlerine cevirir."""
+        seeds = set()
+        for file_name, lines in changes.items():
+            file_node = f"FILE:{file_name}"
+            doc_node = f"DOC:{file_name}"
+            if doc_node in self.graph:
+                seeds.add(doc_node)
+                continue
+            if file_node not in self.graph:
+                continue
+            definitions = self._definitions_in(file_name)
+            if lines is None:
+                seeds.add(file_node)
+                seeds.update(definitions)
+                continue
+            touched = [n for n in definitions
+                       if any(self.graph.nodes[n]["start_line"] <= line <= self.graph.nodes[n]["end_line"] for line in lines)]
+            # Tanim disindaki (modul seviyesi) degisiklikler dosyanin tamamini etkiler
+            seeds.update(touched or [file_node])
+        return seeds
+
+    def callers(self, node_id):
+        """Dugumu cagiran kapsamlar. Dosya dugumu icin: icindeki tanimlari cagiranlar."""
+        data = self.graph.nodes[node_id]
+        if data.get("type") == "file":
+            found = set()
+            for definition in self._definitions_in(node_id[len("FILE:"):]):
+                found.update(self.callers(definition))
+            return found
+        name = node_id.split(":", 1)[1]
+        found = set()
+        for target in self._targets_by_name.get(name, []):
+            for source, _, relation in self.graph.in_edges(target, data="relation"):
+                if relation == "calls":
+                    found.add(source)
+        return found
+
+    def impacted(self, seeds, depth=DEFAULT_DEPTH):
+        """Ters cagri grafiginde seed'lerden en fazla 'depth' adim uzaktaki dugumler (BFS)."""
+        distances = {n: 0 for n in seeds if n in self.graph}
+        frontier = list(distances)
+        for level in range(1, depth + 1):
+            next_frontier = []
+            for node_id in frontier:
+                if node_id.startswith("DOC:"):
+                    continue
+                for caller in self.callers(node_id):
+                    if caller not in distances:
+                        distances[caller] = level
+                        next_frontier.append(caller)
+            frontier = next_frontier
+        self._add_documents(distances, depth)
+        return distances
+
+    def _add_documents(self, distances, depth):
+        """Etkilenen tanimlarin adini geciren gereksinim dokumanlari (bir adim daha uzakta)."""
+        names = {}
+        for node_id, distance in distances.items():
+            if self.graph.nodes[node_id].get("type") in DEFINITION_TYPES and distance < depth:
+                name = node_id.split(":", 1)[1]
+                if len(name) >= 3:
+                    names[name] = min(distance, names.get(name, depth))
+        if not names:
+            return
+        pattern = re.compile(r"\b(" + "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True)) + r")\b")
+        for node_id, data in self.graph.nodes(data=True):
+            if data.get("type") != "requirement_doc" or node_id in distances:
+                continue
+            mentioned = set(pattern.findall(data.get("content") or ""))
+            if mentioned:
+                distances[node_id] = min(names[n] for n in mentioned) + 1
+
+    def analyze(self, changes, depth=DEFAULT_DEPTH):
+        with tracer.span("impact.analyze", changes=len(changes), depth=depth) as span:
+            seeds = self.seeds_for(changes)
+            distances = self.impacted(seeds, depth)
+            files = set()
+            for node_id in distances:
+                data = self.graph.nodes[node_id]
+                if node_id.startswith(("FILE:", "DOC:")):
+                    files.add(node_id.split(":", 1)[1])
+                elif data.get("file"):
+                    files.add(data["file"])
+            removed = {name for name, lines in changes.items()
+                       if lines is None and f"FILE:{name}" not in self.graph and f"DOC:{name}" not in self.graph}
+            span.set(seeds=len(seeds), impacted=len(distances), files=len(files))
+        return ImpactReport(seeds, distances, files, removed)
+
+
+# --- Onceki .feature ciktisini guncelleme ---
+
+def split_sections(report):
+    """'Component-Wise' ciktisini (baslik, [(dosya, bolum_metni), ...]) olarak ayirir."""
+    matches = list(SECTION_RE.finditer(report))
+    if not matches:
+        return report, []
+    header = report[:matches[0].start()]
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(report)
+        sections.append((match.group(1), report[match.start():end]))
+    return header, sections
+
+
+def replace_sections(previous_report, new_outputs, removed=()):
+    """
+    Onceki ciktida sadece verilen dosyalarin bolumlerini degistirir; sira korunur,
+    yeni dosyalar sona eklenir, silinen dosyalarin bolumleri cikarilir.
+    """
+    header, sections = split_sections(previous_report)
+    if not sections:
+        raise ValueError("Previous output has no '# --- Source: ... ---' sections (component-wise output required)")
+    pending = dict(new_outputs)
+    parts = [header]
+    for fname, text in sections:
+        if fname in removed:
+            continue
+        if fname in pending:
+            text = f"# --- Source: {fname} ---\n{pending.pop(fname)}\n\n"
+        parts.append(text)
+    for fname, out in pending.items():
+        parts.append(f"# --- Source: {fname} ---\n{out}\n\n")
+    return "".join(parts)
+
+
+def regenerate_impacted(previous_report, files, impact, vector_store, llm, on_progress=None):
+    """
+    Sadece etkilenen dosya/dokumanlar icin senaryo uretir ve onceki ciktidaki bolumlerini degistirir.
+    files: guncel ozet listesi ("CODE: x.py", ...); sirasi korunur.
+    """
+    targets = [f for f in files if file_name_of(f) in impact.files]
+    total = len(targets)
+    outputs = {}
+    failed = []
+    if getattr(llm, "session", False):
+        llm.project_summary = project_overview(files)
+    with tracer.span("generation", mode="impact", files=total):
+        for i, f in enumerate(targets):
+            fname = file_name_of(f)
+            if on_progress:
+                on_progress(i, total, f"Regenerating impacted: `{fname}` ({i+1}/{total})")
+            query = f"Generate detailed Gherkin scenarios for the logic in {fname}."
+            out, unit_failed = generate_file(fname, query, vector_store, llm)
+            if out is None:
+                continue
+            if unit_failed:
+                # Basarisiz uretim onceki (gecerli) bolumun uzerine yazilmaz
+                failed.append(fname)
+                continue
+            outputs[fname] = out
+    report = replace_sections(previous_report, outputs, removed=impact.removed)
+    return GenerationResult(report, units=total, failed=failed)
@@ -0,0 +1,128 @@
+import os
+import re
+import shutil
+import hashlib
+import tarfile
+import zipfile
+
+from src.utils.tracing import tracer
+
+# tree_sitter/networkx (code_parser) ve pypdf sadece ilgili asamada yuklenir.
+
+VALID_EXTENSIONS = ('.py', '.pdf', '.txt', '.md', '.java', '.cpp', '.js', '.ts', '.c', '.cs', '.go')
+DOC_EXTENSIONS = (".pdf", ".txt", ".md")
+SKIP_DIRS = ['venv', '.git', '__pycache__', 'node_modules', '.idea', 'dist', 'build']
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+
+
+def is_valid_file(file_name):
+    name_lower = file_name.lower()
+    if name_lower == "readme.md":
+        return False
+    return name_lower.endswith(VALID_EXTENSIONS)
+
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def repo_slug(path):
+    """Depo yolundan kararli ve Chroma uyumlu bir isim uretir (en fazla 57 karakter)."""
+    base = os.path.basename(os.path.normpath(path))
+    for ext in (".tar.gz", ".tgz", ".tar", ".zip"):
+        if base.lower().endswith(ext):
+            base = base[: -len(ext)]
+    base = re.sub(r"[^a-zA-Z0-9._-]", "_", base).strip("._-") or "repo"
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return f"{base[:48]}_{digest}"
+
+
+def extract_archive(archive_path, dest_dir):
+    """ZIP veya TAR arsivini hedef klasore acar."""
+    os.makedirs(dest_dir, exist_ok=True)
+    if archive_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+            zip_ref.extractall(dest_dir)
+    else:
+        with tarfile.open(archive_path) as tar_ref:
+            try:
+                tar_ref.extractall(dest_dir, filter="data")
+            except TypeError:
+                # 'filter' parametresi olmayan eski Python surumleri
+                tar_ref.extractall(dest_dir)
+    return dest_dir
+
+
+def collect_files(root_dir, scan_stats=None):
+    """
+    Klasoru tarar, gecerli kaynak kod ve gereksinim dosyalarinin yollarini dondurur.
+    Tarama src.pipeline.scanner ile yapilir (.gitignore/.qaignore, boyut, uretilmis ve ikili dosya filtreleri).
+    scan_stats (liste) verilirse ScanResult eklenir.
+    """
+    from src.pipeline.scanner import scan_project
+    result = scan_project(root_dir)
+    if scan_stats is not None:
+        scan_stats.append(result)
+    return result.files
+
+
+def copy_files_flat(files, dest_dir):
+    """Dosyalari tek bir calisma klasorune kopyalar (UI'daki yerel klasor akisi)."""
+    os.makedirs(dest_dir, exist_ok=True)
+    copied = []
+    for src_path in files:
+        dst_path = os.path.join(dest_dir, os.path.basename(src_path))
+        shutil.copy2(src_path, dst_path)
+        copied.append(dst_path)
+    return copied
+
+
+def read_document(file_path):
+    """PDF veya duz metin gereksinim dokumaninin icerigini okur."""
+    if file_path.lower().endswith(".pdf"):
+        from src.utils.pdf_processor import extract_text_from_pdf
+        return extract_text_from_pdf(file_path)
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def ingest_files(files, parser=None, on_progress=None):
+    """
+    Dosyalari bilgi grafigine isler.
+    Kod dosyalari AST ile, dokumanlar 'requirement_doc' dugumu olarak eklenir.
+    Donus: (parser, ozet listesi ["CODE: x.py", "DOC: y.pdf", ...])
+    """
+    if parser is None:
+        from src.graph.code_parser import CodeGraphParser
+        parser = CodeGraphParser()
+    summary = []
+    total = len(files)
+    for i, file_path in enumerate(files):
+        file_name = os.path.basename(file_path)
+        if not file_name.lower().endswith(DOC_EXTENSIONS):
+            if on_progress:
+                on_progress(i, total, f"Structural Code Analysis: {file_name}")
+            parser.parse_file(file_path)
+            summary.append(f"CODE: {file_name}")
+        else:
+            if on_progress:
+                on_progress(i, total, f"Reading Documentation: {file_name}")
+            content = read_document(file_path)
+            parser.graph.add_node(f"DOC:{file_name}", type="requirement_doc", content=content)
+            summary.append(f"DOC: {file_name}")
+    return parser, summary
+
+
+def build_index(parser, collection_name, storage=None):
+    """
+    Grafigi vektor veritabanina yazar ve magazayi dondurur.
+    Ardindan gereksinim <-> kod izlenebilirlik matrisi saklanan embedding'lerden hesaplanir.
+    storage: arama indeksi modu (bkz. CodeVectorStore); None ise QA_VECTOR_STORAGE.
+    """
+    from src.rag.vector_store import CodeVectorStore
+    from src.rag.traceability import build_traceability
+    with tracer.span("vector_store.init"):
+        vector_store = CodeVectorStore(collection_name=collection_name, storage=storage)
+    vector_store.add_graph_documents(parser.graph)
+    build_traceability(vector_store, parser.graph)
+    return vector_store
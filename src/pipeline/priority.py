@@ -0,0 +1,265 @@
+import math
+import time
+import threading
+
+import numpy as np
+
+from src.utils.tracing import tracer
+from src.pipeline.generation import file_name_of
+from src.rag.traceability import load_traceability
+
+DEFINITION_TYPES = ("function", "class")
+# Skor = agirlikli toplam (her metrik [0, 1] araligina normalize edilir)
+DEFAULT_WEIGHTS = {"pagerank": 0.35, "in_degree": 0.2, "requirements": 0.3, "size": 0.15}
+PAGERANK_DAMPING = 0.85
+PAGERANK_ITERATIONS = 50
+PAGERANK_TOLERANCE = 1e-8
+
+
+# --- Grafik metrikleri ---
+
+def call_edges(graph):
+    """
+    'calls' kenarlarini tanim dugumlerine cozer: (cagiran, cagrilan) listesi.
+    Parser cagrilari dosya dugumunden 'FUNC:self.x' gibi hedeflere cizer; hedefler son isim
+    parcasiyla projedeki fonksiyon/sinif tanimlarina eslenir (ImpactAnalyzer ile ayni kural).
+    """
+    by_name = {}
+    for node_id, data in graph.nodes(data=True):
+        if data.get("type") in DEFINITION_TYPES:
+            by_name.setdefault(node_id.split(":", 1)[1], []).append(node_id)
+    edges = []
+    for source, target, relation in graph.edges(data="relation"):
+        if relation != "calls":
+            continue
+        short = target.split(":", 1)[1].rsplit(".", 1)[-1]
+        for definition in by_name.get(short, []):
+            edges.append((source, definition))
+    return edges
+
+
+def pagerank(nodes, edges, damping=PAGERANK_DAMPING, iterations=PAGERANK_ITERATIONS, tol=PAGERANK_TOLERANCE):
+    """Kenar dizileri uzerinde NumPy guc iterasyonu (scipy gerektirmez). Donus: {dugum: skor}."""
+    n = len(nodes)
+    if n == 0:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = [(s, d) for s, d in edges if s in index and d in index]
+    src = np.fromiter((index[s] for s, _ in edges), dtype=np.int64, count=len(edges))
+    dst = np.fromiter((index[d] for _, d in edges), dtype=np.int64, count=len(edges))
+    out_degree = np.bincount(src, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    rank = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        share = np.divide(rank, out_degree, out=np.zeros(n), where=~dangling)
+        new = np.bincount(dst, weights=share[src], minlength=n)
+        new = damping * (new + rank[dangling].sum() / n) + (1.0 - damping) / n
+        delta = np.abs(new - rank).sum()
+        rank = new
+        if delta < tol:
+            break
+    return {node: float(rank[i]) for node, i in index.items()}
+
+
+def _size_of(data):
+    if "start_line" in data and "end_line" in data:
+        return data["end_line"] - data["start_line"] + 1
+    text = data.get("content") or data.get("code") or ""
+    return text.count("\n") + 1 if text else 0
+
+
+def _normalize(values):
+    top = max(values.values(), default=0.0)
+    return {k: (v / top if top > 0 else 0.0) for k, v in values.items()}
+
+
+def requirement_similarity(vector_store, code_nodes, doc_nodes):
+    """
+    Kod dugumleri ile gereksinim dokumanlari arasindaki en yuksek kosinus benzerligi (her iki yonde).
+    Vektorler Chroma'da saklananlardir; tek matris carpimi ile hesaplanir
+    (kayitli izlenebilirlik matrisi varsa o kullanilir, bkz. src/rag/traceability.py).
+    Donus: ({kod dugumu: benzerlik}, {dokuman: (benzerlik, en benzer kod dugumu)})
+    """
+    if vector_store is None or not code_nodes or not doc_nodes:
+        return {}, {}
+    matrix = load_traceability(vector_store)
+    if matrix is not None:
+        # Izlenebilirlik matrisi indekslemede hesaplandi; en iyi baglantilar dogrudan okunur
+        code_sim, doc_sim = {}, {}
+        for node_id in code_nodes:
+            best = matrix.requirements_for(node_id, 1)
+            if best:
+                code_sim[node_id] = best[0][1]
+        for node_id in doc_nodes:
+            best = matrix.code_for(node_id, 1)
+            if best:
+                doc_sim[node_id] = (best[0][1], best[0][0])
+        return code_sim, doc_sim
+    ids, vectors = vector_store.node_embeddings(list(code_nodes) + list(doc_nodes))
+    if not len(ids):
+        return {}, {}
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    doc_set = set(doc_nodes)
+    code_rows = [i for i, n in enumerate(ids) if n not in doc_set]
+    doc_rows = [i for i, n in enumerate(ids) if n in doc_set]
+    if not code_rows or not doc_rows:
+        return {}, {}
+    similarity = np.clip(vectors[code_rows] @ vectors[doc_rows].T, 0.0, 1.0)
+    code_sim = {ids[r]: float(v) for r, v in zip(code_rows, similarity.max(axis=1))}
+    best = similarity.argmax(axis=0)
+    doc_sim = {ids[r]: (float(similarity[best[j], j]), ids[code_rows[best[j]]]) for j, r in enumerate(doc_rows)}
+    return code_sim, doc_sim
+
+
+def node_scores(graph, vector_store=None, weights=None):
+    """
+    Dosya, fonksiyon, sinif ve gereksinim dugumleri icin oncelik skoru.
+    Metrikler: cagri grafiginde giris derecesi (kac dosya cagiriyor), PageRank, gereksinim benzerligi, boyut.
+    PageRank grafigi: cagiran dosya -> cagrilan tanim ve tanim -> tanimlandigi dosya; boylece onemli
+    tanimlari iceren dosyalarin cagirdiklari da onem kazanir. Gereksinim dokumanlari cagri grafiginde
+    olmadigi icin grafik metriklerini en cok benzedikleri kod dugumunden alir.
+    Donus: {dugum: {"score": ..., <metrik>: ...}}
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    with tracer.span("priority.metrics", nodes=graph.number_of_nodes()) as span:
+        code_nodes = [n for n, d in graph.nodes(data=True) if d.get("type") in DEFINITION_TYPES + ("file",)]
+        doc_nodes = [n for n, d in graph.nodes(data=True) if d.get("type") == "requirement_doc"]
+
+        edges = call_edges(graph)
+        for node_id in code_nodes:
+            file_name = graph.nodes[node_id].get("file")
+            if file_name and f"FILE:{file_name}" in graph:
+                edges.append((node_id, f"FILE:{file_name}"))
+        ranks = pagerank(code_nodes, edges)
+        callers = {}
+        for source, target in edges:
+            if target.startswith(("FUNC:", "CLASS:")) and source != target:
+                callers.setdefault(target, set()).add(source)
+        in_degree = {n: len(callers.get(n, ())) for n in code_nodes}
+        code_sim, doc_sim = requirement_similarity(vector_store, code_nodes, doc_nodes)
+
+        raw = {}
+        for node_id in code_nodes:
+            raw[node_id] = {"pagerank": ranks.get(node_id, 0.0), "in_degree": in_degree[node_id],
+                            "requirements": code_sim.get(node_id, 0.0),
+                            "size": math.log1p(_size_of(graph.nodes[node_id]))}
+        for node_id in doc_nodes:
+            similarity, nearest = doc_sim.get(node_id, (0.0, None))
+            raw[node_id] = {"pagerank": ranks.get(nearest, 0.0) * similarity,
+                            "in_degree": in_degree.get(nearest, 0) * similarity,
+                            "requirements": similarity,
+                            "size": math.log1p(_size_of(graph.nodes[node_id]))}
+
+        normalized = {metric: _normalize({n: m[metric] for n, m in raw.items()}) for metric in weights}
+        scores = {}
+        for node_id, metrics in raw.items():
+            score = sum(weight * normalized[metric][node_id] for metric, weight in weights.items())
+            scores[node_id] = dict(metrics, score=round(score, 6))
+        span.set(call_edges=len(edges), docs=len(doc_nodes), with_requirements=bool(doc_sim))
+    return scores
+
+
+def rank_units(graph, files, vector_store=None, weights=None):
+    """
+    Uretim birimlerini (ozet listesi: "CODE: x.py", "DOC: y.pdf") oncelige gore siralar.
+    Bir kod dosyasinin skoru, kendisinin ve icindeki en onemli tanimin skorlarinin en buyugudur.
+    Donus: [(ozet ogesi, skor), ...] azalan skor sirasinda (esitlikte orijinal sira korunur).
+    """
+    scores = node_scores(graph, vector_store, weights)
+    by_file = {}
+    for node_id, data in graph.nodes(data=True):
+        if data.get("type") in DEFINITION_TYPES and data.get("file") and node_id in scores:
+            by_file[data["file"]] = max(by_file.get(data["file"], 0.0), scores[node_id]["score"])
+    ranked = []
+    for item in files:
+        fname = file_name_of(item)
+        if item.startswith("DOC: "):
+            score = scores.get(f"DOC:{fname}", {}).get("score", 0.0)
+        else:
+            score = max(scores.get(f"FILE:{fname}", {}).get("score", 0.0), by_file.get(fname, 0.0))
+        ranked.append((item, round(score, 6)))
+    return sorted(ranked, key=lambda pair: -pair[1])
+
+
+# --- Butce ---
+
+class Budget:
+    def __init__(self, seconds=None, tokens=None, clock=time.monotonic):
+        """
+        Uretim icin sure (duvar saati) ve/veya token butcesi.
+        Bir sonraki birim, olculen ortalama birim maliyeti kalan butceye sigmiyorsa baslatilmaz;
+        boylece calisma butce asilmadan temiz sekilde durur. Paralel calisan depolar ayni butceyi paylasabilir.
+        """
+        self.seconds = seconds
+        self.tokens = tokens
+        self.clock = clock
+        self.started = None
+        self.tokens_used = 0
+        self.units = 0
+        self.unit_seconds = 0.0
+        self.stopped_by = None
+        self._lock = threading.Lock()
+
+    @property
+    def limited(self):
+        return bool(self.seconds or self.tokens)
+
+    def start(self):
+        if self.started is None:
+            self.started = self.clock()
+        return self
+
+    def elapsed(self):
+        return self.clock() - self.started if self.started is not None else 0.0
+
+    def record(self, seconds, tokens):
+        """LLM'e giden bir birimin maliyeti (checkpoint'ten gelen birimler sayilmaz)."""
+        with self._lock:
+            self.units += 1
+            self.unit_seconds += seconds
+            self.tokens_used += tokens
+
+    def allows(self, reserve_units=0):
+        """Bir birim (ve ardindan 'reserve_units' birim daha, orn. konsolidasyon) butceye sigiyor mu?"""
+        self.start()
+        need = 1 + reserve_units
+        if self.seconds:
+            average = self.unit_seconds / self.units if self.units else 0.0
+            if self.elapsed() + average * need > self.seconds:
+                self.stopped_by = "time"
+                return False
+        if self.tokens:
+            average = self.tokens_used / self.units if self.units else 0
+            if self.tokens_used + average * need > self.tokens:
+                self.stopped_by = "tokens"
+                return False
+        return True
+
+    def to_dict(self):
+        return {"seconds": self.seconds, "tokens": self.tokens, "elapsed_s": round(self.elapsed(), 2),
+                "tokens_used": self.tokens_used, "llm_units": self.units, "stopped_by": self.stopped_by}
+
+
+def coverage_report(ranking, result, graph=None):
+    """
+    Butceli uretimin kapsami: uretilen birimler, onem (skor) agirlikli kapsam ve atlanan en onemli birimler.
+    ranking: rank_units ciktisi, result: GenerationResult.
+    """
+    skipped = set(result.skipped)
+    done = [(item, score) for item, score in ranking if file_name_of(item) not in skipped]
+    total_score = sum(score for _, score in ranking)
+    report = {
+        "units": len(ranking),
+        "generated": len(done),
+        "skipped": len(ranking) - len(done),
+        "score_coverage": round(sum(s for _, s in done) / total_score, 4) if total_score else 1.0,
+        "top_skipped": [file_name_of(item) for item, _ in ranking if file_name_of(item) in skipped][:10],
+    }
+    if graph is not None:
+        done_files = {file_name_of(item) for item, _ in done}
+        definitions = [d.get("file") for _, d in graph.nodes(data=True) if d.get("type") in DEFINITION_TYPES]
+        covered = sum(1 for f in definitions if f in done_files)
+        report["definition_coverage"] = round(covered / len(definitions), 4) if definitions else 1.0
+    if result.budget is not None:
+        report["budget"] = result.budget
+    return report
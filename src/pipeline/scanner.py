@@ -0,0 +1,415 @@
+import os
+import re
+import time
+import queue
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.tracing import tracer
+from src.pipeline.ingestion import SKIP_DIRS, is_valid_file
+
+IGNORE_FILE = ".qaignore"
+MAX_FILE_BYTES = int(os.environ.get("QA_SCAN_MAX_BYTES", str(1024 * 1024)))
+SCAN_WORKERS = int(os.environ.get("QA_SCAN_WORKERS", str(min(8, (os.cpu_count() or 1) * 2))))
+SNIFF_BYTES = 8192
+EXAMPLES_PER_REASON = 5
+
+# Ucuncu parti / paketlenmis kod klasorleri (atlanir, 'vendored' olarak sayilir)
+VENDOR_DIRS = ("vendor", "third_party", "thirdparty", "site-packages", "bower_components", ".venv")
+GENERATED_NAME_RE = re.compile(
+    r"(\.min\.(js|css)|\.bundle\.js|[-.]chunk\.js|_pb2(_grpc)?\.py|\.pb\.go|\.generated\.\w+|\.g\.cs|\.designer\.cs|_generated\.\w+)$",
+    re.IGNORECASE,
+)
+# Uretilmis dosya isaretleri (kucuk harfe cevrilmis ilk MARKER_BYTES bayt icinde):
+# arac adi iceren isaretler her yerde, genel ifadeler sadece girintisiz yorum satirlarinda aranir
+GENERATED_MARKER_RE = re.compile(
+    rb"@generated|generated by (?:the )?(?:protoc|swagger|openapi|webpack|thrift|grpc)"
+    rb"|^ ?(?:#|//|/\*|\*|--|<!--)[^\n]*?(?:auto-?generated|do not edit|this file was generated)",
+    re.MULTILINE,
+)
+MARKER_BYTES = 1024
+# Kucultulmus (minified) kod: ilk baytlardaki ortalama satir uzunlugu
+MINIFIED_LINE_LENGTH = 250
+# Ikili dosya kabul esigi: NUL bayti veya metin disi bayt orani
+BINARY_RATIO = 0.30
+_TEXT_BYTES = bytes(range(32, 127)) + b"\n\r\t\f\b\x1b"
+
+
+# --- .gitignore eslestirme ---
+
+def _translate(pattern):
+    """Tek bir gitignore desenini (basta '/' olmadan) regex govdesine cevirir."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    def __init__(self, lines, base=""):
+        """
+        Tek bir ignore dosyasinin derlenmis kurallari. 'base', dosyanin bulundugu klasorun
+        kok dizine gore yoludur ('/' ayracli); desenler bu klasore gore eslestirilir.
+        Kurallar: yorum (#), olumsuzlama (!), sadece klasor (sonda /), kok baglantili (basta veya ortada /), *, **, ?, [].
+        """
+        self.base = base
+        self.rules = []  # (regex, negate, dir_only)
+        for raw in lines:
+            line = raw.rstrip("\n").rstrip("\r")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            # Bastaki veya ortadaki '/' deseni ignore dosyasinin klasorune baglar (sondaki '/' baglamaz)
+            anchored = "/" in line.rstrip("/")
+            line = line.strip("/")
+            if not line:
+                continue
+            prefix = "" if anchored else "(?:.*/)?"
+            regex = re.compile(f"^{prefix}{_translate(line)}(?:/.*)?$" if not dir_only
+                               else f"^{prefix}{_translate(line)}$")
+            self.rules.append((regex, negate, dir_only))
+
+    @classmethod
+    def from_file(cls, path, base=""):
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                return cls(f.readlines(), base)
+        except OSError:
+            return None
+
+    def match(self, rel_path, is_dir):
+        """None: kural yok, True: yoksay, False: acikca dahil (olumsuzlama)."""
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+def is_ignored(rule_sets, rel_path, is_dir):
+    """Ust klasordekinden alt klasordekine kadar tum kurallar; son eslesen kazanir."""
+    ignored = False
+    for rules in rule_sets:
+        result = rules.match(rel_path, is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+# --- Dosya siniflandirma ---
+
+def sniff(path):
+    """Ilk baytlara bakarak (ikili mi, uretilmis mi) dondurur."""
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    if not head:
+        return False, False
+    if b"\x00" in head:
+        return True, False
+    try:
+        head.decode("utf-8")
+        is_text = True
+    except UnicodeDecodeError as e:
+        # Okunan parcanin sonunda yarim kalan cok baytli karakter normaldir
+        is_text = e.start >= len(head) - 3
+    if not is_text and len(head.translate(None, _TEXT_BYTES)) / len(head) > BINARY_RATIO:
+        return True, False
+    header = head[:MARKER_BYTES].lower()
+    # Ucuz on kontrol; regex sadece aday basliklarda calisir
+    if (b"generated" in header or b"do not edit" in header) and GENERATED_MARKER_RE.search(header):
+        return False, True
+    # Kisa dosyalar (tek satirlik sabitler vb.) kucultulmus sayilmaz
+    if len(head) >= 4 * MINIFIED_LINE_LENGTH and len(head) / (head.count(b"\n") + 1) >= MINIFIED_LINE_LENGTH:
+        return False, True
+    return False, False
+
+
+class ScanResult:
+    def __init__(self, root):
+        self.root = root
+        self.files = []
+        self.bytes = 0
+        self.skipped = Counter()
+        self.examples = {}
+        self.elapsed = 0.0
+
+    def skip(self, reason, rel_path):
+        self.skipped[reason] += 1
+        examples = self.examples.setdefault(reason, [])
+        if len(examples) < EXAMPLES_PER_REASON:
+            examples.append(rel_path)
+
+    def to_dict(self):
+        return {
+            "files": len(self.files),
+            "bytes": self.bytes,
+            "skipped": dict(self.skipped),
+            "examples": self.examples,
+            "elapsed_s": round(self.elapsed, 3),
+        }
+
+
+class ProjectScanner:
+    def __init__(self, max_bytes=MAX_FILE_BYTES, workers=SCAN_WORKERS, use_gitignore=True,
+                 ignore_file=IGNORE_FILE, skip_generated=True):
+        """
+        os.scandir tabanli proje tarayicisi.
+        - .gitignore (her klasorde, ust klasor kurallari miras alinir) ve proje ignore dosyasi (.qaignore)
+        - SKIP_DIRS / VENDOR_DIRS klasorleri, desteklenmeyen uzantilar
+        - boyut limiti (max_bytes), uretilmis dosya sezgileri (isim, baslik isareti, kucultulmus satirlar)
+        - ilk baytlara bakarak ikili dosya tespiti (PDF haric)
+        Klasorler is parcacigi havuzunda paralel taranir; sonuc sirasi deterministiktir.
+        """
+        self.max_bytes = max_bytes
+        self.workers = max(1, workers)
+        self.use_gitignore = use_gitignore
+        self.ignore_file = ignore_file
+        self.skip_generated = skip_generated
+
+    def _load_rules(self, path, rel_dir):
+        rule_sets = []
+        names = ([".gitignore"] if self.use_gitignore else []) + ([self.ignore_file] if self.ignore_file else [])
+        for name in names:
+            rules = IgnoreRules.from_file(os.path.join(path, name), rel_dir)
+            if rules is not None and rules.rules:
+                rule_sets.append(rules)
+        return rule_sets
+
+    def check_file(self, path, size=None):
+        """Dosya icin (atlama nedeni veya None, boyut): boyut, uretilmis dosya ve ikili dosya kontrolleri."""
+        if size is None:
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                return "error", 0
+        name = os.path.basename(path)
+        if size > self.max_bytes:
+            return "size", size
+        if self.skip_generated and GENERATED_NAME_RE.search(name):
+            return "generated", size
+        if name.lower().endswith(".pdf"):
+            return None, size
+        try:
+            binary, generated = sniff(path)
+        except OSError:
+            return "error", size
+        if binary:
+            return "binary", size
+        if generated and self.skip_generated:
+            return "generated", size
+        return None, size
+
+    def _scan_dir(self, path, rel_dir, inherited):
+        """Tek klasor: (alt klasorler, kabul edilen dosyalar, atlananlar)."""
+        rule_sets = inherited + self._load_rules(path, rel_dir)
+        subdirs, files, skipped = [], [], []
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return subdirs, files, [("error", rel_dir or ".")]
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                skipped.append(("error", rel_path))
+                continue
+            if is_dir:
+                if entry.name in SKIP_DIRS or entry.name == "__MACOSX":
+                    skipped.append(("skip_dir", rel_path))
+                elif entry.name in VENDOR_DIRS:
+                    skipped.append(("vendored", rel_path))
+                elif is_ignored(rule_sets, rel_path, True):
+                    skipped.append(("ignored", rel_path))
+                else:
+                    subdirs.append((entry.path, rel_path, rule_sets))
+                continue
+            if not entry.is_file():
+                continue
+            if not is_valid_file(entry.name):
+                skipped.append(("extension", rel_path))
+                continue
+            if is_ignored(rule_sets, rel_path, False):
+                skipped.append(("ignored", rel_path))
+                continue
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                skipped.append(("error", rel_path))
+                continue
+            reason, size = self.check_file(entry.path, size)
+            if reason:
+                skipped.append((reason, rel_path))
+            else:
+                files.append((entry.path, size))
+        return subdirs, files, skipped
+
+    def scan(self, root):
+        started = time.perf_counter()
+        result = ScanResult(root)
+        found = []
+        with tracer.span("scan", root=root) as span:
+            # Biten klasorler kuyruga duser; alt klasorleri hemen havuza eklenir
+            completed = queue.Queue()
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="qa-scan") as pool:
+                pool.submit(self._scan_dir, root, "", []).add_done_callback(completed.put)
+                outstanding = 1
+                while outstanding:
+                    subdirs, files, skipped = completed.get().result()
+                    outstanding -= 1
+                    found.extend(files)
+                    for reason, rel_path in skipped:
+                        result.skip(reason, rel_path)
+                    for sub in subdirs:
+                        pool.submit(self._scan_dir, *sub).add_done_callback(completed.put)
+                        outstanding += 1
+            found.sort()
+            result.files = [p for p, _ in found]
+            result.bytes = sum(size for _, size in found)
+            result.elapsed = time.perf_counter() - started
+            span.set(files=len(result.files), skipped=sum(result.skipped.values()), **{
+                f"skipped_{k}": v for k, v in result.skipped.items()})
+        return result
+
+
+class PathRules:
+    def __init__(self, root, scanner=None):
+        """
+        Tek tek dosyalara (izleme modu) tarayicinin kurallarini uygular: SKIP_DIRS / VENDOR_DIRS,
+        kok ve ara klasorlerdeki .gitignore / .qaignore kurallari, uzanti; icerik kontrolleri icin check_file.
+        Ignore dosyalari klasor bazinda onbellege alinir ve degistiklerinde (mtime) yeniden okunur.
+        """
+        self.root = os.path.abspath(root)
+        self.scanner = scanner or ProjectScanner()
+        self._cache = {}  # rel_dir -> (ignore dosyalarinin mtime'lari, kurallar)
+
+    def dir_rules(self, rel_dir):
+        """Sadece bu klasorun kendi ignore dosyalarindaki kurallar."""
+        path = os.path.join(self.root, *rel_dir.split("/")) if rel_dir else self.root
+        names = ([".gitignore"] if self.scanner.use_gitignore else []) + \
+            ([self.scanner.ignore_file] if self.scanner.ignore_file else [])
+        stamps = []
+        for name in names:
+            try:
+                stamps.append(os.stat(os.path.join(path, name)).st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+        cached = self._cache.get(rel_dir)
+        if cached is None or cached[0] != stamps:
+            cached = (stamps, self.scanner._load_rules(path, rel_dir) if any(stamps) else [])
+            self._cache[rel_dir] = cached
+        return cached[1]
+
+    def _dir_reason(self, name, rel_path, rule_sets):
+        if name in SKIP_DIRS or name == "__MACOSX":
+            return "skip_dir"
+        if name in VENDOR_DIRS:
+            return "vendored"
+        if is_ignored(rule_sets, rel_path, True):
+            return "ignored"
+        return None
+
+    def path_reason(self, path):
+        """Dosya yolu icin (icerige bakmadan) atlama nedeni veya None; kok disindaki yollar 'outside'."""
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        parts = rel.split(os.sep)
+        if parts[0] == os.pardir:
+            return "outside"
+        rule_sets = list(self.dir_rules(""))
+        for i, name in enumerate(parts[:-1]):
+            rel_dir = "/".join(parts[:i + 1])
+            reason = self._dir_reason(name, rel_dir, rule_sets)
+            if reason:
+                return reason
+            rule_sets += self.dir_rules(rel_dir)
+        if not is_valid_file(parts[-1]):
+            return "extension"
+        if is_ignored(rule_sets, "/".join(parts), False):
+            return "ignored"
+        return None
+
+    def file_reason(self, path):
+        """Yol kurallari + boyut / uretilmis / ikili dosya kontrolleri (ilk taramayla ayni karar)."""
+        return self.path_reason(path) or self.scanner.check_file(path)[0]
+
+    def walk(self):
+        """Yol kurallarini gecen dosyalar: (yol, os.stat_result); icerik okunmaz (yoklama icin ucuz)."""
+        stack = [(self.root, "", list(self.dir_rules("")))]
+        while stack:
+            path, rel_dir, rule_sets = stack.pop()
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not self._dir_reason(entry.name, rel_path, rule_sets):
+                            stack.append((entry.path, rel_path, rule_sets + self.dir_rules(rel_path)))
+                    elif (entry.is_file() and is_valid_file(entry.name)
+                          and not is_ignored(rule_sets, rel_path, False)):
+                        yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+
+def scan_project(root, **options):
+    return ProjectScanner(**options).scan(root)
+
+
+def combine_stats(results):
+    """Birden fazla taramanin (orn. birkac ZIP) istatistiklerini tek sozlukte toplar."""
+    combined = {"files": 0, "bytes": 0, "skipped": Counter(), "examples": {}, "elapsed_s": 0.0}
+    for result in results:
+        combined["files"] += len(result.files)
+        combined["bytes"] += result.bytes
+        combined["skipped"].update(result.skipped)
+        combined["elapsed_s"] = round(combined["elapsed_s"] + result.elapsed, 3)
+        for reason, examples in result.examples.items():
+            merged = combined["examples"].setdefault(reason, [])
+            merged.extend(examples[:EXAMPLES_PER_REASON - len(merged)])
+    combined["skipped"] = dict(combined["skipped"])
+    return combined
@@ -0,0 +1,228 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+from src.utils.tracing import tracer
+from src.graph.dedup import clear_duplicates
+from src.rag.traceability import load_traceability, trace_path
+from src.pipeline.ingestion import DOC_EXTENSIONS, collect_files, read_document, repo_slug
+from src.pipeline.scanner import PathRules
+
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_POLL_INTERVAL = 0.5
+WRITE_EVENTS = ("created", "modified", "deleted", "moved", "closed")
+
+
+class ProjectWatcher:
+    def __init__(self, root, parser, vector_store=None, debounce=DEFAULT_DEBOUNCE,
+                 poll_interval=DEFAULT_POLL_INTERVAL, use_inotify=True, on_update=None):
+        """
+        Proje klasorunu izler ve degisen dosyalari artimli olarak grafige ve vektor deposuna isler.
+        - Olaylar watchdog ile alinir (Linux'ta inotify); watchdog yoksa veya baslatilamazsa
+          os.scandir tabanli yoklamaya (polling) duser.
+        - Ayni dosyadaki art arda olaylar 'debounce' saniye sessizlik olana kadar birlestirilir.
+        - parser, CodeGraphParser(keep_trees=True) olmalidir (artimli reparse icin).
+        - Dosyalar ilk taramayla ayni kurallardan gecer (scanner.PathRules: ignore dosyalari,
+          boyut siniri, uretilmis / ikili dosya tespiti); kurala takilan dosya indeksten cikarilir.
+        on_update(dict): her islenen dosya icin cagrilir (dosya, degisen/silinen dugumler, gecikme).
+        """
+        self.root = os.path.abspath(root)
+        self.parser = parser
+        self.vector_store = vector_store
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.on_update = on_update
+        self.rules = PathRules(self.root)
+        self.backend = None
+        # Izlenebilirlik matrisi (build_index ile olusturulduysa) degisen dugumler icin artimli guncellenir
+        self.traceability = load_traceability(vector_store) if vector_store is not None else None
+
+        self._pending = {}  # yol -> (ilk olay zamani, son olay zamani)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._observer = None
+        self._snapshot = {}
+
+    # --- Olay kaynaklari ---
+
+    def _watched(self, path):
+        """Yol kurallari proje kokune gore goreli yola uygulanir (proje 'build/' gibi bir klasorun altinda olabilir)."""
+        return self.rules.path_reason(path) is None
+
+    def notify(self, path):
+        """Bir dosya olayini kaydeder (watchdog, yoklama veya dis cagiranlar)."""
+        path = os.path.abspath(path)
+        if not self._watched(path):
+            return
+        now = time.perf_counter()
+        with self._lock:
+            first, _ = self._pending.get(path, (now, now))
+            self._pending[path] = (first, now)
+
+    def _start_inotify(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # Sadece yazma olaylari; okuma (opened / closed_no_write) olaylari kendi okumalarimizla dongu yaratir
+                if event.is_directory or event.event_type not in WRITE_EVENTS:
+                    return
+                watcher.notify(event.src_path)
+                dest = getattr(event, "dest_path", None)
+                if dest:
+                    watcher.notify(dest)
+
+        try:
+            observer = Observer()
+            observer.schedule(_Handler(), self.root, recursive=True)
+            observer.start()
+        except OSError as e:
+            # orn. inotify izleme limiti (fs.inotify.max_user_watches) asildi
+            print(f"Warning: inotify unavailable ({e}); falling back to polling.")
+            return False
+        self._observer = observer
+        self.backend = type(observer).__name__
+        return True
+
+    def _scan(self):
+        """Izlenen dosyalarin (mtime_ns, boyut) anlik goruntusu."""
+        return {path: (stat.st_mtime_ns, stat.st_size) for path, stat in self.rules.walk()}
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            current = self._scan()
+            for path in set(current) | set(self._snapshot):
+                if current.get(path) != self._snapshot.get(path):
+                    self.notify(path)
+            self._snapshot = current
+
+    # --- Isleme ---
+
+    def _debounce_loop(self):
+        while not self._stop.wait(self.debounce / 4):
+            now = time.perf_counter()
+            with self._lock:
+                ready = [(p, first) for p, (first, last) in self._pending.items() if now - last >= self.debounce]
+                for path, _ in ready:
+                    del self._pending[path]
+            for path, first in ready:
+                try:
+                    self.process(path, first)
+                except Exception as e:
+                    # Yarim kaydedilmis / gecici olarak okunamayan dosya: bir sonraki olayda tekrar denenir
+                    print(f"Warning: Could not update {os.path.basename(path)}: {type(e).__name__}: {e}")
+
+    def process(self, path, first_event=None):
+        """Tek dosyanin degisikligini grafige ve vektor deposuna uygular."""
+        first_event = first_event or time.perf_counter()
+        file_name = os.path.basename(path)
+        with tracer.span("watch.update", file=file_name) as span:
+            # Silinen veya artik atlanan (buyumus, ikili hale gelmis...) dosya indeksten cikarilir
+            if not os.path.exists(path) or self.rules.file_reason(path):
+                changes = {"changed": [], "removed": self.parser.remove_file(path)}
+                doc_node = f"DOC:{file_name}"
+                if doc_node in self.parser.graph:
+                    self.parser.graph.remove_node(doc_node)
+                    changes["removed"].append(doc_node)
+            elif file_name.lower().endswith(DOC_EXTENSIONS):
+                self.parser.graph.add_node(f"DOC:{file_name}", type="requirement_doc", content=read_document(path))
+                changes = {"changed": [f"DOC:{file_name}"], "removed": []}
+            else:
+                changes = self.parser.reparse_file(path)
+
+            # Degisen dugum artik bir kopyanin temsilcisi/uyesi olmayabilir; serbest kalan uyeler de embed edilir
+            released = clear_duplicates(self.parser.graph, changes["changed"] + changes["removed"])
+            nodes = changes["changed"] + changes["removed"] + [n for n in released if n not in changes["changed"]]
+            if self.vector_store is not None and nodes:
+                self.vector_store.update_nodes(self.parser.graph, nodes)
+                if self.traceability is not None:
+                    self.traceability.update(self.vector_store, changes["changed"] + released, changes["removed"],
+                                             graph=self.parser.graph)
+                    self.traceability.save(trace_path(self.vector_store.db_path, self.vector_store.collection_name))
+            latency_ms = (time.perf_counter() - first_event) * 1000.0
+            span.set(changed=len(changes["changed"]), removed=len(changes["removed"]), latency_ms=round(latency_ms, 2))
+
+        update = {"file": file_name, "changed": changes["changed"], "removed": changes["removed"],
+                  "latency_ms": round(latency_ms, 1)}
+        if self.on_update:
+            self.on_update(update)
+        return update
+
+    # --- Yasam dongusu ---
+
+    def start(self):
+        self._stop.clear()
+        if not (self.use_inotify and self._start_inotify()):
+            self.backend = "polling"
+            self._snapshot = self._scan()
+            self._threads.append(threading.Thread(target=self._poll_loop, name="qa-watch-poll", daemon=True))
+        self._threads.append(threading.Thread(target=self._debounce_loop, name="qa-watch", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main(argv=None):
+    from src.graph.code_parser import CodeGraphParser
+    from src.pipeline.ingestion import ingest_files, build_index
+
+    arg_parser = argparse.ArgumentParser(description="Watch a project and keep its graph and vector index up to date.")
+    arg_parser.add_argument("root", help="Project directory to watch.")
+    arg_parser.add_argument("--collection", help="Chroma collection (default: watch_<dir name>_<path hash>).")
+    arg_parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="Quiet period in seconds.")
+    arg_parser.add_argument("--poll", action="store_true", help="Use polling instead of inotify.")
+    arg_parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    args = arg_parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        arg_parser.error(f"not a directory: {args.root}")
+    collection = args.collection or f"watch_{repo_slug(args.root)}"
+
+    parser, summary = ingest_files(collect_files(args.root), parser=CodeGraphParser(keep_trees=True))
+    vector_store = build_index(parser, collection)
+
+    def report(update):
+        print(f"[watch] {update['file']}: {len(update['changed'])} changed, {len(update['removed'])} removed "
+              f"-> searchable in {update['latency_ms']} ms")
+
+    watcher = ProjectWatcher(args.root, parser, vector_store, debounce=args.debounce,
+                             poll_interval=args.poll_interval, use_inotify=not args.poll, on_update=report)
+    with watcher:
+        print(f"Watching {watcher.root} ({len(summary)} files, backend: {watcher.backend}, collection: {collection}). Ctrl-C to stop.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import os
+import uuid
+
+import numpy as np
+
+STORAGE_MODES = ("float32", "float16", "int8")
+COMPACT_DIR = "compact"
+SCORE_CHUNK_ROWS = 65536
+# Günlük (journal) anlık görüntünün bu oranını aşınca bir sonraki kayıt tam görüntü yazar
+JOURNAL_COMPACT_RATIO = 0.5
+
+
+def index_path(db_path, collection_name):
+    """Koleksiyonun sıkıştırılmış vektör dosyası (Chroma klasörünün yanında)."""
+    return os.path.join(db_path, COMPACT_DIR, f"{collection_name}.npz")
+
+
+def journal_path(path):
+    """Anlık görüntüden sonraki ekleme/silmelerin günlüğü (izleme modunda tam yeniden yazım yapılmaz)."""
+    return path[:-len(".npz")] + ".log" if path.endswith(".npz") else path + ".log"
+
+
+class CompactIndex:
+    def __init__(self, dtype="float16", model_name=None, dimension=None):
+        """
+        Embedding'lerin bitişik NumPy dizilerinde düşük hassasiyetli kopyası (aday araması için).
+        Chroma'daki float32 vektörlerin yerine geçmez, onlara ek olarak diskte yer kaplar.
+        - float16: vektör başına 2 byte/boyut
+        - int8: vektör başına ölçekli (scale = max|x| / 127) skaler kuantizasyon, 1 byte/boyut
+        Her vektörün orijinal (float32) normu ayrıca saklanır; skorlar kosinüs benzerliğidir.
+        Sonuçlar yaklaşıktır; tam hassasiyetli yeniden skorlama CodeVectorStore'da yapılır.
+        """
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unsupported compact dtype '{dtype}' (expected float16 or int8)")
+        self.dtype = dtype
+        self.model_name = model_name
+        self.dimension = dimension
+        self.ids = []
+        self.codes = np.zeros((0, dimension or 0), dtype=np.float16 if dtype == "float16" else np.int8)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self._pending = []  # son kayıttan beri yapılan değişiklikler (günlüğe eklenecek)
+        self._snapshot_id = None  # günlük sadece aynı kimlikli anlık görüntüye uygulanır
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes + self.norms.nbytes
+
+    def _encode(self, vectors):
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def add(self, ids, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("add() expects one 2-D row per id")
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+            self.codes = self.codes.reshape(0, self.dimension)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {vectors.shape[1]} does not match index dimension {self.dimension}")
+        codes, scales = self._encode(vectors)
+        self.ids.extend(ids)
+        self.codes = np.concatenate([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales])
+        norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+        self.norms = np.concatenate([self.norms, norms])
+        self._pending.append(("add", list(ids), codes, scales, norms))
+
+    def remove(self, ids):
+        drop = set(ids).intersection(self.ids)
+        if not drop:
+            return
+        self._pending.append(("remove", sorted(drop)))
+        keep = np.array([i not in drop for i in self.ids], dtype=bool)
+        self.ids = [i for i in self.ids if i not in drop]
+        self.codes = self.codes[keep]
+        self.scales = self.scales[keep]
+        self.norms = self.norms[keep]
+
+    def search(self, query, n):
+        """Yaklaşık kosinüs skoruna göre en iyi n adayın (id, skor) listesi."""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dimension:
+            raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self.dimension}")
+        if not self.ids or n <= 0:
+            return []
+        scores = np.empty(len(self.ids), dtype=np.float32)
+        # Parça parça float32'ye açılır; tüm matris tek seferde tam genişliğe çevrilmez
+        for start in range(0, len(self.ids), SCORE_CHUNK_ROWS):
+            end = start + SCORE_CHUNK_ROWS
+            scores[start:end] = self.codes[start:end].astype(np.float32) @ query
+        scores *= self.scales
+        scores /= np.clip(self.norms, 1e-12, None) * max(float(np.linalg.norm(query)), 1e-12)
+        n = min(n, len(scores))
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    @property
+    def dirty(self):
+        return bool(self._pending)
+
+    def save(self, path):
+        """
+        Değişiklikleri kaydeder. Anlık görüntü varsa ve günlük küçükse sadece son değişiklikler
+        günlüğe eklenir; aksi halde tam görüntü yazılır ve günlük sıfırlanır.
+        """
+        log_path = journal_path(path)
+        try:
+            snapshot_bytes = os.path.getsize(path)
+            log_bytes = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        except OSError:
+            snapshot_bytes = None
+        if (snapshot_bytes is not None and self._snapshot_id is not None
+                and log_bytes < snapshot_bytes * JOURNAL_COMPACT_RATIO):
+            if self._pending:
+                with open(log_path, "ab") as f:
+                    if log_bytes == 0:
+                        np.save(f, np.array([self._snapshot_id]))
+                    for op in self._pending:
+                        np.save(f, np.array([op[0]]))
+                        np.save(f, np.array(op[1], dtype=str))
+                        for array in op[2:]:
+                            np.save(f, array)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp.npz"
+            self._snapshot_id = uuid.uuid4().hex
+            np.savez(tmp_path, ids=np.array(self.ids, dtype=str), codes=self.codes, scales=self.scales,
+                     norms=self.norms, meta=np.array([self.dtype, self.model_name or "", str(self.dimension or 0),
+                                                      self._snapshot_id]))
+            # Eski günlük yeni görüntüye uygulanmaz (kimlik uyuşmaz), yine de silinir
+            os.replace(tmp_path, path)
+            if os.path.exists(log_path):
+                os.remove(log_path)
+        self._pending = []
+
+    def _replay(self, log_path):
+        """Günlüğü sırayla uygular; yarım yazılmış son kayıt (çökme) ve başka görüntünün günlüğü yok sayılır."""
+        with open(log_path, "rb") as f:
+            try:
+                header = np.load(f).tolist()[0]
+            except (EOFError, ValueError, OSError):
+                header = None
+            if header is None or header != self._snapshot_id:
+                self._snapshot_id = None  # eski / bozuk günlük: bir sonraki kayıt tam görüntü yazar
+                return
+            complete = f.tell()
+            while True:
+                try:
+                    kind = np.load(f).tolist()[0]
+                    ids = np.load(f).tolist()
+                    if kind == "add":
+                        codes, scales, norms = np.load(f), np.load(f), np.load(f)
+                except (EOFError, ValueError, OSError):
+                    break
+                if kind == "remove":
+                    self.remove(ids)
+                else:
+                    self.ids.extend(ids)
+                    self.codes = np.concatenate([self.codes, codes])
+                    self.scales = np.concatenate([self.scales, scales])
+                    self.norms = np.concatenate([self.norms, norms])
+                complete = f.tell()
+            if complete < os.fstat(f.fileno()).st_size:
+                # Yarım kayıttan sonra eklenenler okunamaz: bir sonraki kayıt tam görüntü yazar
+                self._snapshot_id = None
+        self._pending = []
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            dtype, model_name, dimension, *snapshot_id = data["meta"].tolist()
+            index = cls(dtype, model_name or None, int(dimension) or None)
+            index._snapshot_id = snapshot_id[0] if snapshot_id else None
+            index.ids = data["ids"].tolist()
+            index.codes = data["codes"]
+            index.scales = data["scales"]
+            index.norms = data["norms"]
+        if os.path.exists(journal_path(path)):
+            index._replay(journal_path(path))
+        return index
@@ -0,0 +1,169 @@
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_BACKEND = "torch"
+BACKENDS = ("torch", "onnx")
+
+# all-MiniLM-L6-v2'nin SentenceTransformer ayarı (max_seq_length); ONNX yolu da aynı kesmeyi kullanır
+MAX_SEQ_LENGTH = 256
+ONNX_BATCH_SIZE = 32
+
+_BACKEND_CACHE = {}
+_BACKEND_LOCK = threading.Lock()
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model_name=DEFAULT_MODEL):
+        """SentenceTransformer (PyTorch) backend'i. Mevcut koleksiyonlar bu backend ile oluşturuldu."""
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    @property
+    def version(self):
+        return f"{self.model_name}/torch-fp32"
+
+    @property
+    def dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return np.asarray(self.model.encode(texts), dtype=np.float32)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model_dir, model_name=DEFAULT_MODEL, quantize=True, intra_op_threads=0, inter_op_threads=0):
+        """
+        ONNX Runtime backend'i (CPU). model_dir içinde 'model.onnx' (veya 'onnx/model.onnx') ve
+        'tokenizer.json' beklenir. quantize=True ise int8 dinamik kuantize model kullanılır;
+        yoksa bir kez üretilip 'model_int8.onnx' olarak model_dir'e kaydedilir.
+        Thread sayıları 0 ise ONNX Runtime varsayılanı (fiziksel çekirdek sayısı) kullanılır.
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.model_dir = model_dir
+        self.quantize = quantize
+        self._dimension = None
+
+        model_path = self._resolve_model(model_dir, quantize)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = int(intra_op_threads)
+        options.inter_op_num_threads = int(inter_op_threads)
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(self._find(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+    @property
+    def version(self):
+        return f"{self.model_name}/onnx-{'int8' if self.quantize else 'fp32'}"
+
+    @property
+    def dimension(self):
+        # Çıkış boyutu grafikte sembolik olabilir; tek bir kısa metinle ölçülür
+        if self._dimension is None:
+            self._dimension = int(self.encode("dimension probe").shape[0])
+        return self._dimension
+
+    @staticmethod
+    def _find(model_dir, file_name):
+        for candidate in (os.path.join(model_dir, file_name), os.path.join(model_dir, "onnx", file_name)):
+            if os.path.exists(candidate):
+                return candidate
+        raise FileNotFoundError(f"{file_name} not found in {model_dir}")
+
+    @classmethod
+    def _resolve_model(cls, model_dir, quantize):
+        fp32_path = cls._find(model_dir, "model.onnx")
+        if not quantize:
+            return fp32_path
+        int8_path = os.path.join(os.path.dirname(fp32_path), "model_int8.onnx")
+        if not os.path.exists(int8_path):
+            # Ağırlıklar int8, aktivasyonlar çalışma anında kuantize edilir (kalibrasyon verisi gerekmez)
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            tmp_path = int8_path + ".tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        return int8_path
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        chunks = []
+        for start in range(0, len(texts), ONNX_BATCH_SIZE):
+            encodings = self.tokenizer.encode_batch(texts[start:start + ONNX_BATCH_SIZE])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            # SentenceTransformer ile aynı: mean pooling + L2 normalizasyon
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            chunks.append(pooled.astype(np.float32))
+        vectors = np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+def backend_settings():
+    """Ortam değişkenlerinden backend ayarları (QA_EMBED_*)."""
+    return {
+        "backend": os.environ.get("QA_EMBED_BACKEND", DEFAULT_BACKEND),
+        "model_dir": os.environ.get("QA_EMBED_MODEL_DIR"),
+        "quantize": os.environ.get("QA_EMBED_QUANTIZE", "1").lower() not in ("0", "false", "no"),
+        "intra_op_threads": int(os.environ.get("QA_EMBED_THREADS", "0")),
+        "inter_op_threads": int(os.environ.get("QA_EMBED_INTER_THREADS", "0")),
+    }
+
+
+def get_backend(backend=None, model_name=DEFAULT_MODEL, **options):
+    """
+    Embedding backend'ini bir kez yükler ve süreç genelinde paylaşır.
+    Verilmeyen ayarlar QA_EMBED_* ortam değişkenlerinden okunur.
+    onnxruntime/tokenizers kurulu değilse aynı vektör uzayını üreten PyTorch backend'ine uyarıyla dönülür.
+    """
+    settings = backend_settings()
+    settings.update({k: v for k, v in options.items() if v is not None})
+    backend = backend or settings["backend"]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+    if backend == "torch":
+        key = (backend, model_name)
+    else:
+        if not settings["model_dir"]:
+            raise ValueError("ONNX backend requires a local model directory (QA_EMBED_MODEL_DIR)")
+        key = (backend, model_name, os.path.abspath(settings["model_dir"]), settings["quantize"],
+               settings["intra_op_threads"], settings["inter_op_threads"])
+
+    with _BACKEND_LOCK:
+        instance = _BACKEND_CACHE.get(key)
+        if instance is None:
+            if backend == "torch":
+                instance = TorchBackend(model_name)
+            else:
+                try:
+                    instance = OnnxBackend(settings["model_dir"], model_name, quantize=settings["quantize"],
+                                           intra_op_threads=settings["intra_op_threads"],
+                                           inter_op_threads=settings["inter_op_threads"])
+                except ImportError as e:
+                    print(f"Warning: ONNX embedding backend unavailable ({e}); falling back to torch.")
+                    instance = _BACKEND_CACHE.get(("torch", model_name)) or TorchBackend(model_name)
+                    _BACKEND_CACHE[("torch", model_name)] = instance
+            _BACKEND_CACHE[key] = instance
+        return instance
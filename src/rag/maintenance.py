@@ -0,0 +1,350 @@
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sadece surec ici kilit
+    fcntl = None
+
+DEFAULT_DB_PATH = os.path.join(os.getcwd(), "data", "vector_db")
+REGISTRY_FILE = "session_registry.json"
+
+# Ayni erisimi her sorguda diske yazmamak icin minimum aralik (saniye)
+TOUCH_INTERVAL = 60
+
+# Tum CollectionRegistry orneklerinin paylastigi kilit (her Streamlit oturumu kendi ornegini olusturur)
+_REGISTRY_LOCK = threading.Lock()
+
+
+class CollectionRegistry:
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        """
+        Oturum koleksiyonlarinin yasam dongusu kaydi.
+        Her koleksiyon icin olusturulma ve son erisim zamanini JSON olarak tutar.
+        Oku-degistir-yaz islemleri surec genelinde ve (fcntl varsa) surecler arasinda kilitlenir.
+        """
+        self.db_path = db_path
+        self.path = os.path.join(db_path, REGISTRY_FILE)
+
+    @contextmanager
+    def _locked(self):
+        with _REGISTRY_LOCK:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.db_path, exist_ok=True)
+            with open(f"{self.path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        os.makedirs(self.db_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{REGISTRY_FILE}.", suffix=".tmp", dir=self.db_path)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2)
+            # Atomik degisim: yarim yazilmis kayit dosyasi okunmasin
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def touch(self, name, force=False):
+        """Koleksiyonun son erisim zamanini gunceller."""
+        now = time.time()
+        with self._locked():
+            entries = self._load()
+            entry = entries.get(name)
+            if entry and not force and now - entry.get("last_access", 0) < TOUCH_INTERVAL:
+                return
+            if entry is None:
+                entry = {"created": now}
+            entry["last_access"] = now
+            entries[name] = entry
+            self._save(entries)
+
+    def forget(self, name):
+        """Koleksiyonu kayittan cikarir."""
+        with self._locked():
+            entries = self._load()
+            if entries.pop(name, None) is not None:
+                self._save(entries)
+
+    def entries(self):
+        with self._locked():
+            return self._load()
+
+    def prune(self, existing_names):
+        """Artik veritabaninda olmayan koleksiyonlarin kayitlarini siler."""
+        with self._locked():
+            entries = self._load()
+            kept = {name: e for name, e in entries.items() if name in existing_names}
+            if len(kept) != len(entries):
+                self._save(kept)
+            return len(entries) - len(kept)
+
+
+def directory_size(path):
+    """Bir klasorun toplam boyutunu (byte) hesaplar."""
+    total = 0
+    if not os.path.exists(path):
+        return 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+class CatalogUnavailable(Exception):
+    """Chroma katalogu okunamadi; katalogdaki koleksiyonlari silinmis saymak veri kaybina yol acar."""
+
+
+def _read_catalog(db_path, required=False):
+    """
+    Chroma'nin SQLite katalogunu salt-okunur acar.
+    Donus: ({koleksiyon_adi: koleksiyon_id}, {segment_id: koleksiyon_id})
+    Okuma hatasinda required=False ise uyari verip bos dondurur (rapor), required=True ise CatalogUnavailable
+    firlatir (silme/budama yapan cagiranlar).
+    """
+    sqlite_path = os.path.join(db_path, "chroma.sqlite3")
+    if not os.path.exists(sqlite_path):
+        return {}, {}
+    try:
+        conn = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+        try:
+            collections = dict(conn.execute("SELECT name, id FROM collections").fetchall())
+            segments = dict(conn.execute("SELECT id, collection FROM segments").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        if required:
+            raise CatalogUnavailable(f"Could not read Chroma catalog {sqlite_path}: {e}") from e
+        print(f"Warning: Could not read Chroma catalog: {e}")
+        return {}, {}
+    return collections, segments
+
+
+def collection_sizes(db_path=DEFAULT_DB_PATH, required=False):
+    """Her koleksiyonun segment klasorlerinin diskteki boyutunu dondurur (required: bkz. _read_catalog)."""
+    collections, segments = _read_catalog(db_path, required)
+    sizes = {name: 0 for name in collections}
+    id_to_name = {cid: name for name, cid in collections.items()}
+    for segment_id, collection_id in segments.items():
+        name = id_to_name.get(collection_id)
+        if name is not None:
+            sizes[name] += directory_size(os.path.join(db_path, segment_id))
+    from src.rag.compact_index import index_path, journal_path
+    from src.rag.traceability import trace_path
+    for name in sizes:
+        compact_path = index_path(db_path, name)
+        for path in (compact_path, journal_path(compact_path), trace_path(db_path, name)):
+            if os.path.exists(path):
+                sizes[name] += os.path.getsize(path)
+    return sizes
+
+
+def storage_report(db_path=DEFAULT_DB_PATH):
+    """Sidebar icin hafif ozet: koleksiyon sayisi ve toplam disk kullanimi."""
+    collections, _ = _read_catalog(db_path)
+    return {
+        "collections": len(collections),
+        "bytes": directory_size(db_path),
+    }
+
+
+def drop_collection(client, name, registry=None):
+    """Koleksiyonu Chroma'dan ve kayittan siler."""
+    try:
+        client.delete_collection(name=name)
+        deleted = True
+    except Exception as e:
+        # Koleksiyon zaten yoksa sessizce gec
+        print(f"Warning: Could not delete collection '{name}': {e}")
+        deleted = False
+    if registry is not None:
+        registry.forget(name)
+        # Arama indeksi ve günlüğü (float16/int8 modu) ve izlenebilirlik matrisi
+        from src.rag.compact_index import index_path, journal_path
+        from src.rag.traceability import trace_path
+        compact_path = index_path(registry.db_path, name)
+        for path in (compact_path, journal_path(compact_path), trace_path(registry.db_path, name)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    return deleted
+
+
+def collect_garbage(client, registry, ttl_seconds=None, max_bytes=None, max_collections=None, protect=()):
+    """
+    Eski oturum koleksiyonlarini temizler.
+    1. TTL: son erisimi ttl_seconds'tan eski olanlari siler.
+    2. LRU: koleksiyon sayisi veya disk kotasi (koleksiyon dosyalarinin toplami) asiliyorsa
+       en az kullanilandan baslayarak siler; geri kazanilacak yer kalmayinca durur.
+    'protect' icindeki koleksiyonlar (aktif oturum) asla silinmez.
+    Katalog okunamazsa hicbir sey silinmez ve kayit budanmaz.
+    """
+    db_path = registry.db_path
+    now = time.time()
+    try:
+        sizes = collection_sizes(db_path, required=True)
+    except CatalogUnavailable as e:
+        print(f"Warning: {e}; skipping garbage collection.")
+        return []
+    entries = registry.entries()
+    protect = set(protect)
+
+    # Kayitta olmayan (eski surumden kalma) koleksiyonlar en eski kabul edilir
+    def last_access(name):
+        return entries.get(name, {}).get("last_access", 0)
+
+    candidates = sorted((n for n in sizes if n not in protect), key=last_access)
+    evicted = []
+
+    if ttl_seconds is not None:
+        for name in list(candidates):
+            if now - last_access(name) > ttl_seconds:
+                drop_collection(client, name, registry)
+                evicted.append(name)
+                candidates.remove(name)
+
+    remaining = len(sizes) - len(evicted)
+    if max_collections is not None:
+        while candidates and remaining > max_collections:
+            name = candidates.pop(0)
+            drop_collection(client, name, registry)
+            evicted.append(name)
+            remaining -= 1
+
+    if max_bytes is not None:
+        # Sadece koleksiyonlarin kendi dosyalari karsilastirilir: SQLite katalogu ve sahipsiz segmentler
+        # koleksiyon silinerek kuculmez (bkz. compact), kotaya dahil edilirse her sey silinse de kota asilir.
+        total = sum(size for name, size in sizes.items() if name not in evicted)
+        for name in [n for n in candidates if sizes.get(n, 0) > 0]:
+            if total <= max_bytes:
+                break
+            drop_collection(client, name, registry)
+            evicted.append(name)
+            candidates.remove(name)
+            total -= sizes[name]
+        if total > max_bytes:
+            print(f"Warning: {total / 1e6:.1f} MB in protected collections exceeds the "
+                  f"{max_bytes / 1e6:g} MB quota; nothing more to evict.")
+
+    registry.prune(set(sizes) - set(evicted))
+    if evicted:
+        print(f"Garbage collection: {len(evicted)} collection(s) evicted.")
+    return evicted
+
+
+def compact(db_path=DEFAULT_DB_PATH):
+    """
+    Offline sikistirma. Sunucu/Streamlit kapaliyken calistirilmalidir.
+    - Silinmis koleksiyonlardan kalan sahipsiz segment klasorlerini kaldirir.
+    - SQLite dosyasini VACUUM ile kucultur.
+    """
+    sqlite_path = os.path.join(db_path, "chroma.sqlite3")
+    if not os.path.exists(sqlite_path):
+        print(f"Nothing to compact: {sqlite_path} not found.")
+        return {"removed_dirs": 0, "bytes_before": 0, "bytes_after": 0}
+
+    bytes_before = directory_size(db_path)
+    try:
+        collections, segments = _read_catalog(db_path, required=True)
+    except CatalogUnavailable as e:
+        # Bos katalog tum segment klasorlerini sahipsiz gosterir
+        print(f"Warning: {e}; skipping compaction.")
+        return {"removed_dirs": 0, "bytes_before": bytes_before, "bytes_after": bytes_before}
+
+    removed_dirs = 0
+    for entry in os.scandir(db_path):
+        # Segment klasorleri UUID isimlidir; katalogda olmayanlar sahipsizdir
+        if entry.is_dir() and len(entry.name) == 36 and entry.name.count("-") == 4 and entry.name not in segments:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed_dirs += 1
+
+    conn = sqlite3.connect(sqlite_path)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    CollectionRegistry(db_path).prune(set(collections))
+    bytes_after = directory_size(db_path)
+    print(f"Compaction done: {removed_dirs} orphan segment(s) removed, {bytes_before / 1e6:.1f} MB -> {bytes_after / 1e6:.1f} MB")
+    return {"removed_dirs": removed_dirs, "bytes_before": bytes_before, "bytes_after": bytes_after}
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Vector DB maintenance for QA Expert AI session collections.")
+    arg_parser.add_argument("--db-path", default=DEFAULT_DB_PATH)
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("report", help="Show collection count and disk usage.")
+    sub.add_parser("compact", help="Remove orphan segments and VACUUM (run while the app is stopped).")
+    gc_parser = sub.add_parser("gc", help="Evict collections by TTL / LRU quota.")
+    gc_parser.add_argument("--ttl-hours", type=float, default=None)
+    gc_parser.add_argument("--max-mb", type=float, default=None)
+    gc_parser.add_argument("--max-collections", type=int, default=None)
+    gc_parser.add_argument("--keep", nargs="*", default=[])
+
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "report":
+        report = storage_report(args.db_path)
+        print(f"Collections: {report['collections']} | Disk: {report['bytes'] / 1e6:.1f} MB")
+        for name, size in sorted(collection_sizes(args.db_path).items()):
+            print(f"  {name}: {size / 1e6:.2f} MB")
+    elif args.command == "compact":
+        compact(args.db_path)
+    elif args.command == "gc":
+        import chromadb
+        client = chromadb.PersistentClient(path=args.db_path)
+        collect_garbage(
+            client,
+            CollectionRegistry(args.db_path),
+            ttl_seconds=args.ttl_hours * 3600 if args.ttl_hours is not None else None,
+            max_bytes=args.max_mb * 1e6 if args.max_mb is not None else None,
+            max_collections=args.max_collections,
+            protect=args.keep,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import os
+import threading
+
+import numpy as np
+
+from src.utils.tracing import tracer
+
+TRACE_DIR = "traceability"
+DOC_PREFIX = "DOC:"
+# Her gereksinim için en benzer N kod düğümü ve her kod düğümü için en benzer N gereksinim
+TOP_N = int(os.environ.get("QA_TRACE_TOP_N", "5"))
+# Bu kosinüs benzerliğinin altındaki bağlantılar saklanmaz
+MIN_SCORE = float(os.environ.get("QA_TRACE_MIN_SCORE", "0.2"))
+# Prompt'a eklenen bağlı gereksinim/kod metni (karakter)
+CONTEXT_CHARS = int(os.environ.get("QA_TRACE_CONTEXT_CHARS", "1200"))
+CONTEXT_LINKS = 2
+
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def trace_path(db_path, collection_name):
+    """Koleksiyonun izlenebilirlik matrisi dosyası (Chroma klasörünün yanında)."""
+    return os.path.join(db_path, TRACE_DIR, f"{collection_name}.npz")
+
+
+def _normalize(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _top_n(scores, n):
+    """Her satırın en yüksek n skorunun sütun indeksleri ve skorları (argpartition, tam sıralama yapılmaz)."""
+    if scores.shape[1] > n:
+        idx = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    else:
+        idx = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    return idx, np.take_along_axis(scores, idx, axis=1)
+
+
+class TraceabilityMatrix:
+    def __init__(self, top_n=TOP_N, min_score=MIN_SCORE):
+        """
+        Gereksinim (DOC:) ↔ kod (FILE:/FUNC:/CLASS:) bağlantıları, seyrek (sparse) olarak.
+        Saklanan girdiler iki yönlü en iyi N listelerinin birleşimidir: bir (gereksinim, kod) çifti,
+        gereksinimin ilk N kodu veya kodun ilk N gereksinimi arasındaysa tutulur.
+        Skorlar Chroma'daki embedding'lerin kosinüs benzerliğidir; üretim sırasında ANN sorgusu yapılmaz.
+        """
+        self.top_n = top_n
+        self.min_score = min_score
+        self.by_doc = {}      # gereksinim -> {kod düğümü: skor}
+        self.by_code = {}     # kod düğümü -> {gereksinim: skor}
+        self.code_files = {}  # kod düğümü -> dosya adı (dosya bazlı sorgular için)
+        # Normalize vektörler sadece bellekte tutulur (artımlı güncellemede sadece değişenler okunur)
+        self._vectors = {}
+
+    def __len__(self):
+        return sum(len(links) for links in self.by_doc.values())
+
+    # --- Hesaplama ---
+
+    def build(self, vector_store, graph=None):
+        """Tüm matrisi tek bir (gereksinim x kod) matris çarpımıyla hesaplar."""
+        with tracer.span("traceability.build") as span:
+            self.by_doc, self.by_code = {}, {}
+            self._load_vectors(vector_store)
+            if graph is not None:
+                self.code_files = {n: self._file_of(graph, n) for n in self._vectors if not n.startswith(DOC_PREFIX)}
+            docs, codes = self._split(self._vectors)
+            self._link(docs, codes, doc_side="top", code_side="top")
+            span.set(requirements=len(docs), code_nodes=len(codes), links=len(self))
+        return self
+
+    def update(self, vector_store, changed=(), removed=(), graph=None):
+        """
+        Sadece değişen/silinen düğümler için yeniden hesaplar:
+          - değişen düğümlerin satır/sütunları (değişen x tüm karşı taraf, tek çarpım),
+          - karşı taraftaki düğümler için yeni skor mevcut N'inci skoru geçiyorsa eklenir,
+          - değişen bir düğümü listesinden kaybeden düğümlerin listeleri baştan hesaplanır.
+        """
+        touched = set(changed) | set(removed)
+        if not touched:
+            return self
+        with tracer.span("traceability.update", changed=len(changed), removed=len(removed)) as span:
+            if not self._vectors:
+                self._load_vectors(vector_store)
+            partners = set()
+            for node_id in touched:
+                self._vectors.pop(node_id, None)
+                self.code_files.pop(node_id, None)
+                partners.update(self._unlink(node_id))
+            partners -= touched
+
+            ids, vectors = vector_store.node_embeddings(sorted(set(changed)))
+            self._vectors.update(zip(ids, _normalize(vectors)))
+            if graph is not None:
+                self.code_files.update({n: self._file_of(graph, n) for n in ids if not n.startswith(DOC_PREFIX)})
+
+            all_docs, all_codes = self._split(self._vectors)
+            new_docs, new_codes = self._split(ids)
+            self._link(new_docs, all_codes, doc_side="top", code_side="merge")
+            self._link(all_docs, new_codes, doc_side="merge", code_side="top")
+            partner_docs, partner_codes = self._split(sorted(p for p in partners if p in self._vectors))
+            self._link(partner_docs, all_codes, doc_side="top")
+            self._link(all_docs, partner_codes, code_side="top")
+            span.set(recomputed=len(partners), links=len(self))
+        return self
+
+    def _load_vectors(self, vector_store):
+        ids, vectors = vector_store.node_embeddings()
+        self._vectors = dict(zip(ids, _normalize(vectors)))
+
+    @staticmethod
+    def _split(node_ids):
+        docs = [n for n in node_ids if n.startswith(DOC_PREFIX)]
+        return docs, [n for n in node_ids if not n.startswith(DOC_PREFIX)]
+
+    @staticmethod
+    def _file_of(graph, node_id):
+        if node_id.startswith("FILE:"):
+            return node_id[len("FILE:"):]
+        return graph.nodes[node_id].get("file") if node_id in graph else None
+
+    def _unlink(self, node_id):
+        forward, backward = (self.by_doc, self.by_code) if node_id.startswith(DOC_PREFIX) else (self.by_code, self.by_doc)
+        links = forward.pop(node_id, {})
+        for other in links:
+            back = backward.get(other)
+            if back is not None:
+                back.pop(node_id, None)
+                if not back:
+                    del backward[other]
+        return links
+
+    def _kth_scores(self, node_ids, links):
+        """Her düğümün mevcut N'inci en iyi skoru (listesi N'den kısaysa -inf)."""
+        kth = np.full(len(node_ids), -np.inf, dtype=np.float32)
+        for i, node_id in enumerate(node_ids):
+            scores = links.get(node_id)
+            if scores and len(scores) >= self.top_n:
+                kth[i] = sorted(scores.values(), reverse=True)[self.top_n - 1]
+        return kth
+
+    def _link(self, docs, codes, doc_side=None, code_side=None):
+        """
+        docs x codes benzerlik bloğunu tek matris çarpımıyla hesaplar ve girdileri ekler.
+        doc_side / code_side: 'top' (o tarafın ilk N'i bu bloktan seçilir), 'merge' (sadece mevcut
+        N'inci skoru geçenler eklenir), None (o yön güncellenmez).
+        """
+        if not docs or not codes:
+            return
+        scores = np.vstack([self._vectors[d] for d in docs]) @ np.vstack([self._vectors[c] for c in codes]).T
+        for side, owners, others, block, links in (
+            (doc_side, docs, codes, scores, self.by_doc),
+            (code_side, codes, docs, scores.T, self.by_code),
+        ):
+            if side is None:
+                continue
+            idx, best = _top_n(block, self.top_n)
+            keep = best >= self.min_score
+            if side == "merge":
+                keep &= best > self._kth_scores(owners, links)[:, None]
+            for row, col in zip(*np.nonzero(keep)):
+                owner, other, score = owners[row], others[idx[row, col]], float(best[row, col])
+                doc, code = (owner, other) if links is self.by_doc else (other, owner)
+                self.by_doc.setdefault(doc, {})[code] = score
+                self.by_code.setdefault(code, {})[doc] = score
+
+    # --- Sorgular ---
+
+    def requirements_for(self, node_id, n=None):
+        """Kod düğümüne en çok benzeyen gereksinimler: [(DOC:..., skor)] azalan sırada."""
+        links = sorted(self.by_code.get(node_id, {}).items(), key=lambda pair: -pair[1])
+        return links[:n or self.top_n]
+
+    def code_for(self, doc_id, n=None):
+        """Gereksinime en çok benzeyen kod düğümleri: [(düğüm, skor)] azalan sırada."""
+        links = sorted(self.by_doc.get(doc_id, {}).items(), key=lambda pair: -pair[1])
+        return links[:n or self.top_n]
+
+    def requirements_for_file(self, file_name, n=None):
+        """Dosyadaki tüm kod düğümleri üzerinden (en yüksek skorla) gereksinimler."""
+        best = {}
+        for code, file in self.code_files.items():
+            if file == file_name:
+                for doc, score in self.by_code.get(code, {}).items():
+                    best[doc] = max(best.get(doc, 0.0), score)
+        return sorted(best.items(), key=lambda pair: -pair[1])[:n or self.top_n]
+
+    def stats(self):
+        return {"requirements": len(self.by_doc), "code_nodes": len(self.by_code), "links": len(self),
+                "top_n": self.top_n}
+
+    def to_rows(self):
+        """UI tablosu: her gereksinim için ilk N kod düğümü."""
+        return [{"requirement": doc[len(DOC_PREFIX):], "code": code, "file": self.code_files.get(code) or "",
+                 "similarity": round(score, 3)}
+                for doc in sorted(self.by_doc) for code, score in self.code_for(doc)]
+
+    # --- Kalıcılık ---
+
+    def save(self, path):
+        """COO biçiminde (satır: gereksinim, sütun: kod düğümü, skor) sıkıştırılmamış npz."""
+        docs = sorted(self.by_doc)
+        codes = sorted(set(self.by_code) | set(self.code_files))
+        doc_index = {d: i for i, d in enumerate(docs)}
+        code_index = {c: i for i, c in enumerate(codes)}
+        pairs = [(doc_index[d], code_index[c], s) for d, links in self.by_doc.items() for c, s in links.items()]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, docs=np.array(docs, dtype=str), codes=np.array(codes, dtype=str),
+                 files=np.array([self.code_files.get(c) or "" for c in codes], dtype=str),
+                 rows=np.array([p[0] for p in pairs], dtype=np.int32),
+                 cols=np.array([p[1] for p in pairs], dtype=np.int32),
+                 scores=np.array([p[2] for p in pairs], dtype=np.float32),
+                 meta=np.array([str(self.top_n), str(self.min_score)]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            top_n, min_score = data["meta"].tolist()
+            matrix = cls(int(top_n), float(min_score))
+            docs, codes = data["docs"].tolist(), data["codes"].tolist()
+            matrix.code_files = {c: f for c, f in zip(codes, data["files"].tolist()) if f}
+            for row, col, score in zip(data["rows"].tolist(), data["cols"].tolist(), data["scores"].tolist()):
+                matrix.by_doc.setdefault(docs[row], {})[codes[col]] = score
+                matrix.by_code.setdefault(codes[col], {})[docs[row]] = score
+        return matrix
+
+
+def build_traceability(vector_store, graph):
+    """İndeksleme sonunda matrisi hesaplar ve koleksiyonun yanına kaydeder."""
+    matrix = TraceabilityMatrix().build(vector_store, graph)
+    matrix.save(trace_path(vector_store.db_path, vector_store.collection_name))
+    return matrix
+
+
+def load_traceability(vector_store):
+    """Kayıtlı matrisi döndürür (yoksa None); dosya değişmedikçe diskten tekrar okunmaz."""
+    path = trace_path(vector_store.db_path, vector_store.collection_name)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, TraceabilityMatrix.load(path))
+            _CACHE[path] = cached
+        return cached[1]
+
+
+def trace_context(vector_store, file_name):
+    """
+    Üretim birimi için prompt'a eklenecek izlenebilirlik bloğu (yoksa boş metin).
+    Kod dosyası: en benzer gereksinimlerin metni; gereksinim dokümanı: onu karşılayan kod parçaları.
+    """
+    matrix = load_traceability(vector_store)
+    if matrix is None:
+        return ""
+    doc_id = f"{DOC_PREFIX}{file_name}"
+    if doc_id in matrix.by_doc:
+        links, title = matrix.code_for(doc_id, CONTEXT_LINKS), "Code implementing this requirement"
+    else:
+        links, title = matrix.requirements_for_file(file_name, CONTEXT_LINKS), "Requirements traced to this file"
+    if not links:
+        return ""
+    documents = vector_store.node_documents([node for node, _ in links])
+    parts = [f"TRACEABILITY ({title}):"]
+    for node, score in links:
+        parts.append(f"--- {node} (similarity {score:.2f}) ---\n{documents.get(node, '')[:CONTEXT_CHARS]}")
+    return "\n".join(parts)
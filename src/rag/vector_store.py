@@ -1,49 +1,146 @@
 import os
-import uuid
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+import threading
+
+import numpy as np
+
+# chromadb ve sentence_transformers (torch) ağır bağımlılıklardır; ilk ihtiyaç anında yüklenir.
+# Böylece modülü içe aktarmak (örn. sidebar'daki disk raporu) UI açılışını yavaşlatmaz.
+from src.utils.tracing import traced, tracer
+from src.utils.sessions import embed_limiter
+from src.rag.embeddings import DEFAULT_MODEL, get_backend
+from src.rag.compact_index import STORAGE_MODES, CompactIndex, index_path
+from src.rag.maintenance import CollectionRegistry, collect_garbage, drop_collection, storage_report
+
+# Süreç genelinde paylaşılan Chroma istemcileri (her mağaza için yeniden açılmaz)
+_CLIENT_CACHE = {}
+_CLIENT_LOCK = threading.Lock()
+
+# Sıkıştırılmış modda k sonuç için k * RESCORE_FACTOR aday tam hassasiyetle yeniden skorlanır
+RESCORE_FACTOR = int(os.environ.get("QA_VECTOR_RESCORE_FACTOR", "4"))
+
+
+def get_chroma_client(db_path):
+    """
+    Aynı yol için tek bir PersistentClient döndürür.
+    Aynı klasöre paralel istemci açmak Chroma'da yarış durumuna yol açar.
+    """
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(db_path)
+        if client is None:
+            import chromadb
+            client = chromadb.PersistentClient(path=db_path)
+            _CLIENT_CACHE[db_path] = client
+        return client
+
+
+def get_embedding_model(model_name=DEFAULT_MODEL, backend=None):
+    """
+    Embedding backend'ini bir kez yükler, sonraki çağrılarda aynı örneği döndürür.
+    backend verilmezse QA_EMBED_BACKEND (varsayılan 'torch') kullanılır.
+    """
+    return get_backend(backend, model_name=model_name)
+
 
 class CodeVectorStore:
-    def __init__(self, collection_name="qa_expert_codebase"):
+    def __init__(self, collection_name="qa_expert_codebase", embedding_backend=None, storage=None):
         """
         Graph-Enhanced Vector Store.
         Kodları hem anlamsal (vector) hem de yapısal (graph metadata) olarak saklar.
+        embedding_backend: 'torch' (SentenceTransformer) veya 'onnx' (ONNX Runtime, int8); bkz. src/rag/embeddings.py
+        storage: 'float32' (sadece Chroma) veya 'float16' / 'int8' (arama hızı modu: aday araması
+                 Chroma'ya ek olarak tutulan düşük hassasiyetli NumPy indeksinde yapılır, ilk adaylar
+                 Chroma'daki float32 vektörlerle yeniden skorlanır; disk kullanımı azalmaz, artar).
+                 Koleksiyon oluşturulurken kaydedilir; mevcut koleksiyonlarda kayıtlı mod kullanılır.
         """
+        storage = storage or os.environ.get("QA_VECTOR_STORAGE", "float32")
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown vector storage '{storage}' (expected one of {', '.join(STORAGE_MODES)})")
+
         # Veritabanını diske kaydetmek için yol belirle
-        self.db_path = os.path.join(os.getcwd(), "data", "vector_db")
+        self.db_path = self.default_db_path()
         
         # ChromaDB İstemcisini (Client) başlat
         # PersistentClient, verilerin program kapansa bile silinmemesini sağlar.
-        self.client = chromadb.PersistentClient(path=self.db_path)
+        self.client = get_chroma_client(self.db_path)
         
         # Embedding Modeli (Kodlar ve İngilizce için optimize edilmiş model)
         # 'all-MiniLM-L6-v2' hem hızlıdır hem de CPU dostudur.
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model = get_embedding_model(DEFAULT_MODEL, backend=embedding_backend)
         
         # Koleksiyonu oluştur veya varsa getir
-        self.collection = self.client.get_or_create_collection(name=collection_name)
+        # Model, boyut, backend sürümü ve depolama modu koleksiyon oluşturulurken kaydedilir (sonradan değişmez)
+        self.collection_name = collection_name
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={
+                "embedding_model": self.embedding_model.model_name,
+                "embedding_dim": self.embedding_model.dimension,
+                "embedding_backend": self.embedding_model.version,
+                "storage": storage,
+            },
+        )
+        self._check_embedding_compat()
+        self.storage = (self.collection.metadata or {}).get("storage", "float32")
+        self._compact = None
+
+        # Yaşam döngüsü kaydı (TTL / LRU temizliği için son erişim zamanı)
+        self.registry = CollectionRegistry(self.db_path)
+        self.registry.touch(collection_name, force=True)
+
+    def _check_embedding_compat(self):
+        """
+        Aynı modelin backend'leri (torch, onnx fp32/int8) aynı vektör uzayını paylaşır ve karıştırılabilir.
+        Farklı bir modelle oluşturulmuş koleksiyona yazmak/sorgulamak anlamsız sonuç verir.
+        Metadata'sı olmayan eski koleksiyonlar varsayılan modelle (torch) oluşturulmuştur.
+        """
+        metadata = self.collection.metadata or {}
+        stored_model = metadata.get("embedding_model", DEFAULT_MODEL)
+        if stored_model != self.embedding_model.model_name:
+            raise ValueError(
+                f"Collection '{self.collection_name}' was embedded with '{stored_model}', "
+                f"not '{self.embedding_model.model_name}'"
+            )
+        self.dimension = metadata.get("embedding_dim")
+        if self.dimension is not None and self.dimension != self.embedding_model.dimension:
+            raise ValueError(
+                f"Collection '{self.collection_name}' stores {self.dimension}-d vectors, "
+                f"but the embedding model produces {self.embedding_model.dimension}-d vectors"
+            )
 
-    def add_graph_documents(self, graph):
+    def _compact_index(self):
+        """Sıkıştırılmış indeksi ilk ihtiyaçta diskten yükler (yoksa boş oluşturur)."""
+        if self._compact is None:
+            path = index_path(self.db_path, self.collection_name)
+            if os.path.exists(path):
+                self._compact = CompactIndex.load(path)
+            else:
+                self._compact = CompactIndex(self.storage, self.embedding_model.model_name, self.dimension)
+        return self._compact
+
+    @traced("add_graph_documents")
+    def add_graph_documents(self, graph, node_ids=None):
         """
         NetworkX Grafiğindeki düğümleri Vektör Veritabanına aktarır.
         NOVELTY: Düğümleri kaydederken 'outgoing_edges' (çağırdığı fonksiyonlar) bilgisini de ekler.
+        node_ids verilirse sadece o düğümler eklenir; verilmezse (tam indeksleme) grafikte artık
+        karşılığı olmayan eski kayıtlar silinir. Kayıt kimliği node_id'dir (upsert): aynı koleksiyona
+        tekrar indeksleme (izleme modunun yeniden başlatılması, --keep-index) kopya üretmez.
+        Neredeyse aynı düğümlerin (src.graph.dedup) sadece temsilcisi embed edilir; üyeler 'duplicates' metadata'sında tutulur.
         """
         ids = []
         documents = []
         metadatas = []
-        embeddings = []
 
         print(f"Updating database... Total Nodes in Graph: {graph.number_of_nodes()}")
 
-        for node_id in graph.nodes():
+        for node_id in (graph.nodes() if node_ids is None else [n for n in node_ids if n in graph]):
             node_data = graph.nodes[node_id]
             
             # Sadece dosya içeriği veya fonksiyon kodu olanları al
             # Parser'dan gelen veriye göre 'content' veya 'code' anahtarını kontrol et
             content = node_data.get("content") or node_data.get("code")
             
-            if content:
+            if content and not node_data.get("duplicate_of"):
                 # 1. Bağımlılıkları Bul (Graph Traversal)
                 # Bu düğümden çıkan okları (çağırdığı fonksiyonları) bul
                 # graph.out_edges(node_id) bize (Kaynak, Hedef) çiftlerini verir
@@ -57,39 +154,201 @@ class CodeVectorStore:
                     "node_id": node_id,
                     "calls": neighbor_str  # Bu fonksiyonun kimi çağırdığını metadata olarak ekle
                 }
-                
-                # 3. Embedding Hesapla (Metni vektöre çevir)
-                vector = self.embedding_model.encode(content).tolist()
+                if node_data.get("duplicates"):
+                    meta["duplicates"] = ",".join(node_data["duplicates"])
 
                 # Listelere ekle (Batch işlem için)
-                ids.append(str(uuid.uuid4()))
+                ids.append(node_id)
                 documents.append(content)
                 metadatas.append(meta)
-                embeddings.append(vector)
+
+        if node_ids is None:
+            self._delete_stale(set(ids))
 
         # Hepsini tek seferde ChromaDB'ye ekle
         if documents:
-            self.collection.add(
-                ids=ids,
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas
-            )
+            # 3. Embedding Hesapla (Metinleri tek batch'te vektöre çevir)
+            with tracer.span("embed", documents=len(documents), bytes=sum(len(d) for d in documents)):
+                # float32 NumPy dizisi doğrudan verilir (.tolist() ile float64 Python listesine çevrilmez)
+                with embed_limiter.slot():
+                    embeddings = self.embedding_model.encode(documents)
+
+            with tracer.span("chroma.upsert", documents=len(documents)):
+                self.collection.upsert(
+                    ids=ids,
+                    documents=documents,
+                    embeddings=embeddings,
+                    metadatas=metadatas
+                )
+
+            if self.storage != "float32":
+                with tracer.span("compact.add", documents=len(documents), storage=self.storage):
+                    index = self._compact_index()
+                    index.remove(ids)
+                    index.add(ids, embeddings)
             print(f"Success: {len(documents)} code snippets and Graph Metadata processed into Vector DB.")
         else:
             print("Warning: No suitable documents found in the graph to add.")
+        self._save_compact()
+
+    def _save_compact(self):
+        """Sıkıştırılmış indeksin değişikliklerini işlem sonunda bir kez kaydeder (çoğunlukla günlüğe ekleme)."""
+        if self._compact is not None and self._compact.dirty:
+            with tracer.span("compact.save", storage=self.storage):
+                self._compact.save(index_path(self.db_path, self.collection_name))
+
+    def _delete_stale(self, keep_ids):
+        """Tam indekslemede, yazılmayacak kayıtları (silinmiş düğümler, eski uuid kimlikli kayıtlar) siler."""
+        stale = [i for i in self.collection.get(include=[])["ids"] if i not in keep_ids]
+        if not stale:
+            return
+        with tracer.span("chroma.delete", nodes=len(stale)):
+            self.collection.delete(ids=stale)
+        if self.storage != "float32":
+            self._compact_index().remove(stale)
+
+    @traced("update_nodes")
+    def update_nodes(self, graph, node_ids):
+        """
+        Verilen düğümlerin vektör kayıtlarını yeniler: eski kayıtlar silinir, grafikte hâlâ
+        içeriği olanlar yeniden embed edilir (izleme modunda sadece değişen tanımlar için).
+        """
+        node_ids = sorted(set(node_ids))
+        if not node_ids:
+            return
+        with tracer.span("chroma.delete", nodes=len(node_ids)):
+            stale = self.collection.get(where={"node_id": {"$in": node_ids}}, include=[])["ids"]
+            if stale:
+                self.collection.delete(ids=stale)
+        if stale and self.storage != "float32":
+            self._compact_index().remove(stale)
+        present = [n for n in node_ids if n in graph and (graph.nodes[n].get("content") or graph.nodes[n].get("code"))]
+        if present:
+            self.add_graph_documents(graph, present)
+        self._save_compact()
 
+    @traced("search_similar")
     def search_similar(self, query, k=3):
         """
         Kullanıcı sorgusuna en uygun kod parçalarını getirir.
         """
+        self.registry.touch(self.collection_name)
+
         # Sorguyu vektöre çevir
-        query_vector = self.embedding_model.encode(query).tolist()
-        
+        with tracer.span("embed_query", bytes=len(query)):
+            with embed_limiter.slot():
+                query_vector = self.embedding_model.encode(query)
+
+        # Boyut uyuşmazlığı sessizce yanlış sonuç vermesin diye sorgudan önce kontrol edilir
+        if self.dimension is not None and len(query_vector) != self.dimension:
+            raise ValueError(
+                f"Query vector has {len(query_vector)} dimensions, collection "
+                f"'{self.collection_name}' expects {self.dimension}"
+            )
+
+        if self.storage != "float32":
+            return self._search_compact(query_vector, k)
+
         # Veritabanında en yakın vektörleri ara
-        results = self.collection.query(
-            query_embeddings=[query_vector],
-            n_results=k
-        )
+        with tracer.span("chroma.query", k=k):
+            results = self.collection.query(
+                query_embeddings=[query_vector],
+                n_results=k
+            )
         
-        return results
\ No newline at end of file
+        return results
+
+    def _search_compact(self, query_vector, k):
+        """
+        İki aşamalı arama: sıkıştırılmış indeksten k * RESCORE_FACTOR aday,
+        ardından adayların Chroma'daki float32 vektörleriyle tam hassasiyetli sıralama.
+        Dönüş Chroma query() çıktısıyla aynı biçimdedir (mesafe: kare L2).
+        """
+        with tracer.span("compact.search", k=k, storage=self.storage) as span:
+            candidates = self._compact_index().search(query_vector, k * RESCORE_FACTOR)
+            span.set(candidates=len(candidates))
+        if not candidates:
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+        with tracer.span("chroma.rescore", candidates=len(candidates)):
+            found = self.collection.get(ids=[c[0] for c in candidates],
+                                        include=["embeddings", "documents", "metadatas"])
+            vectors = np.asarray(found["embeddings"], dtype=np.float32)
+            query = np.asarray(query_vector, dtype=np.float32)
+            distances = (vectors * vectors).sum(axis=1) - 2.0 * (vectors @ query) + float(query @ query)
+            order = np.argsort(distances)[:k]
+
+        return {
+            "ids": [[found["ids"][i] for i in order]],
+            "documents": [[found["documents"][i] for i in order]],
+            "metadatas": [[found["metadatas"][i] for i in order]],
+            "distances": [[float(distances[i]) for i in order]],
+        }
+
+    def node_embeddings(self, node_ids=None):
+        """
+        Saklanan float32 vektörleri düğüm kimliğiyle döndürür (yeniden embed etmeden).
+        Dönüş: (node_id listesi, (n, d) float32 matris). Aynı düğümün birden fazla kaydı varsa ilki alınır.
+        """
+        if node_ids is not None and not node_ids:
+            return [], np.zeros((0, self.dimension or 0), dtype=np.float32)
+        where = {"node_id": {"$in": sorted(node_ids)}} if node_ids is not None else None
+        with tracer.span("chroma.get_embeddings"):
+            found = self.collection.get(where=where, include=["embeddings", "metadatas"])
+        ids, rows, seen = [], [], set()
+        for meta, vector in zip(found["metadatas"], found["embeddings"]):
+            node_id = meta.get("node_id")
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            ids.append(node_id)
+            rows.append(vector)
+        matrix = np.asarray(rows, dtype=np.float32).reshape(len(rows), -1)
+        return ids, matrix
+
+    def node_documents(self, node_ids):
+        """Düğümlerin saklanan metinleri (ANN sorgusu olmadan, node_id ile): {node_id: doküman}."""
+        if not node_ids:
+            return {}
+        found = self.collection.get(where={"node_id": {"$in": sorted(node_ids)}}, include=["documents", "metadatas"])
+        documents = {}
+        for meta, document in zip(found["metadatas"], found["documents"]):
+            documents.setdefault(meta.get("node_id"), document)
+        return documents
+
+    # --- Koleksiyon Yaşam Döngüsü ---
+    # Bu metotlar embedding modelini yüklemez; sadece Chroma istemcisini açar.
+
+    @staticmethod
+    def default_db_path():
+        return os.path.join(os.getcwd(), "data", "vector_db")
+
+    @classmethod
+    def delete_session(cls, collection_name, db_path=None):
+        """Oturum koleksiyonunu diskten siler ("Reset Session")."""
+        db_path = db_path or cls.default_db_path()
+        client = get_chroma_client(db_path)
+        return drop_collection(client, collection_name, CollectionRegistry(db_path))
+
+    @classmethod
+    def garbage_collect(cls, ttl_seconds=None, max_bytes=None, max_collections=None, protect=(), db_path=None):
+        """
+        Eski koleksiyonları TTL ve LRU (disk kotası / koleksiyon sayısı) kurallarına göre siler.
+        """
+        db_path = db_path or cls.default_db_path()
+        if not os.path.exists(db_path):
+            return []
+        client = get_chroma_client(db_path)
+        return collect_garbage(
+            client,
+            CollectionRegistry(db_path),
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            max_collections=max_collections,
+            protect=protect,
+        )
+
+    @classmethod
+    def storage_report(cls, db_path=None):
+        """Koleksiyon sayısı ve toplam disk kullanımı."""
+        return storage_report(db_path or cls.default_db_path())
@@ -1,6 +1,9 @@
 import os
 from pypdf import PdfReader
 
+from src.utils.tracing import traced, current_span
+
+@traced("extract_text_from_pdf")
 def extract_text_from_pdf(pdf_path):
     """
     Verilen PDF dosyasindan metin icerigini cikarir.
@@ -12,6 +15,8 @@ def extract_text_from_pdf(pdf_path):
             text = page.extract_text()
             if text:
                 text_content += text + "\n"
+        current_span().set(file=os.path.basename(pdf_path), bytes=os.path.getsize(pdf_path),
+                           pages=len(reader.pages), chars=len(text_content))
         return text_content
     except Exception as e:
         return f"Error reading PDF: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+
+from src.utils.tracing import tracer
+
+# Cok kullanicili (paylasimli Streamlit) calisma icin surec geneli sinirlar ve oturum kotalari.
+# Embedding modeli ve Chroma istemcisi zaten surec genelinde tektir (get_backend / get_chroma_client);
+# burada ayni kaynaklara ayni anda kac isin girebilecegi ve her oturumun ne kadar yer kaplayabilecegi sinirlanir.
+WORKSPACES_DIR = os.path.join("data", "workspaces")
+MAX_CONCURRENT_EMBED = int(os.environ.get("QA_MAX_CONCURRENT_EMBED", "2"))
+MAX_CONCURRENT_LLM = int(os.environ.get("QA_MAX_CONCURRENT_LLM", "8"))
+SESSION_MAX_FILES = int(os.environ.get("QA_SESSION_MAX_FILES", "5000"))
+SESSION_MAX_BYTES = float(os.environ.get("QA_SESSION_MAX_MB", "200")) * 1e6
+SESSION_MAX_GENERATIONS = int(os.environ.get("QA_SESSION_MAX_GENERATIONS", "1"))
+
+_SAFE_ID_RE = re.compile(r"[^A-Za-z0-9_-]")
+# UI oturum kimlikleri: session_<uuid4 hex>; tahmin edilemez ve Chroma koleksiyon adi olarak gecerlidir
+SESSION_ID_RE = re.compile(r"session_[0-9a-f]{32}")
+
+
+class QuotaExceeded(Exception):
+    """Oturum kotasi (dosya, byte, eszamanli uretim) asildiginda firlatilir."""
+
+
+class ConcurrencyLimiter:
+    def __init__(self, name, limit):
+        """
+        Surec genelinde ayni anda calisabilecek is sayisini sinirlar (limit <= 0: sinirsiz).
+        Fazla istekler reddedilmez, sirada bekler; boylece yuk altinda bellek yerine gecikme artar.
+        """
+        self.name = name
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit) if limit > 0 else None
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+
+    @contextmanager
+    def slot(self):
+        if self._semaphore is None:
+            yield
+            return
+        with self._lock:
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+        with tracer.span(f"{self.name}.wait", limit=self.limit) as span:
+            started = time.perf_counter()
+            self._semaphore.acquire()
+            span.set(waited_ms=round((time.perf_counter() - started) * 1000.0, 2))
+        with self._lock:
+            self.waiting -= 1
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._semaphore.release()
+
+    def to_dict(self):
+        return {"limit": self.limit, "active": self.active, "waiting": self.waiting, "peak_waiting": self.peak_waiting}
+
+
+embed_limiter = ConcurrencyLimiter("embed", MAX_CONCURRENT_EMBED)
+llm_limiter = ConcurrencyLimiter("llm", MAX_CONCURRENT_LLM)
+
+
+# --- Oturum calisma klasorleri ---
+
+def valid_session_id(value):
+    """URL'den gelen kimlik beklenen bicimdeyse kendisini, degilse None dondurur."""
+    return value if isinstance(value, str) and SESSION_ID_RE.fullmatch(value) else None
+
+
+def safe_session_id(session_id):
+    """URL'den gelen oturum kimligini klasor adina uygun hale getirir (yol gecisi olmaz)."""
+    return _SAFE_ID_RE.sub("_", str(session_id))[:64] or "default"
+
+
+def session_workspace(session_id, root=WORKSPACES_DIR):
+    """Oturuma ozel yukleme klasoru; baska oturumlarin dosyalari etkilenmez."""
+    return os.path.join(root, safe_session_id(session_id))
+
+
+def reset_workspace(session_id, root=WORKSPACES_DIR):
+    """Oturumun klasorunu bosaltip yeniden olusturur ve yolunu dondurur."""
+    path = session_workspace(session_id, root)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def remove_workspace(session_id, root=WORKSPACES_DIR):
+    shutil.rmtree(session_workspace(session_id, root), ignore_errors=True)
+
+
+def collect_workspaces(ttl_seconds, protect=(), root=WORKSPACES_DIR):
+    """Son degisikligi ttl_seconds'tan eski oturum klasorlerini siler. Donus: silinen oturumlar."""
+    if not os.path.isdir(root):
+        return []
+    protect = {safe_session_id(s) for s in protect}
+    now = time.time()
+    removed = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name not in protect and now - entry.stat().st_mtime > ttl_seconds:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed.append(entry.name)
+    return removed
+
+
+# --- Oturum kotalari ---
+
+class SessionQuota:
+    def __init__(self, max_files=SESSION_MAX_FILES, max_bytes=SESSION_MAX_BYTES,
+                 max_generations=SESSION_MAX_GENERATIONS):
+        """
+        Tek oturumun bir analizde isleyebilecegi dosya sayisi / toplam boyut ve
+        ayni anda kuyrukta veya calisir durumda tutabilecegi uretim isi sayisi (<= 0: sinirsiz).
+        Kontroller dosyalar diske yazilmadan once yapilir.
+        """
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.max_generations = max_generations
+
+    def check_size(self, files, total_bytes):
+        if self.max_files > 0 and files > self.max_files:
+            raise QuotaExceeded(f"{files} files exceed the per-session limit of {self.max_files}")
+        if self.max_bytes > 0 and total_bytes > self.max_bytes:
+            raise QuotaExceeded(f"{total_bytes / 1e6:.1f} MB exceeds the per-session limit of "
+                                f"{self.max_bytes / 1e6:g} MB")
+
+    def check_paths(self, paths, used_files=0, used_bytes=0):
+        """Yerel dosyalar (kopyalanmadan once). Donus: (dosya sayisi, toplam byte) dahil edilenlerle."""
+        total = used_bytes + sum(os.path.getsize(p) for p in paths)
+        self.check_size(used_files + len(paths), total)
+        return used_files + len(paths), total
+
+    def check_archive(self, zip_file, used_files=0, used_bytes=0):
+        """ZIP arsivi: acilmis boyutlar (zip bombasi dahil) cikarmadan once kontrol edilir."""
+        members = [info for info in zip_file.infolist() if not info.is_dir()]
+        total = used_bytes + sum(info.file_size for info in members)
+        self.check_size(used_files + len(members), total)
+        return used_files + len(members), total
+
+    def check_generations(self, store, session_id):
+        """Oturumun kuyruktaki/calisan uretim isleri sinira ulastiysa yeni is kabul edilmez."""
+        if self.max_generations <= 0:
+            return
+        from src.jobs.store import ACTIVE_STATES
+        from src.jobs.tasks import GENERATION
+        active = [j for j in store.list(owner=session_id, statuses=list(ACTIVE_STATES)) if j["kind"] == GENERATION]
+        if len(active) >= self.max_generations:
+            raise QuotaExceeded(f"{len(active)} generation job(s) already in flight for this session "
+                                f"(limit {self.max_generations})")
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import uuid
+import threading
+import functools
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error", "exported")
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes)
+        self.error = None
+        self.exported = False
+
+    def set(self, **attributes):
+        """Span'e sayac/etiket ekler (bytes, tokens, eval_count ...)."""
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self):
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otel(self):
+        """OpenTelemetry (OTLP/JSON) span kaydi formatinda dondurur."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otel_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+def _otel_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class _NoopSpan:
+    """Tracing kapaliyken kullanilan bos span. Hicbir sey kaydetmez."""
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "name", "attributes", "span")
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+
+    def __enter__(self):
+        self.span = self.tracer._open(self.name, self.attributes)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        self.tracer._close(self.span)
+        return False
+
+
+class Tracer:
+    def __init__(self, enabled=False, export_path=None, export_format="jsonl", max_spans=50000):
+        """
+        Pipeline enstrumantasyonu.
+        Kapaliyken her cagri tek bir bool kontrolune iner (neredeyse sifir maliyet).
+        'enabled' surec geneli varsayilandir (QA_TRACE, CLI); bir calisma (Streamlit oturumu, arka plan isi)
+        start_run/resume_run(enabled=...) ile sadece kendi thread'i icin acip kapatabilir.
+        """
+        self.default_enabled = enabled
+        self.export_path = export_path
+        self.export_format = export_format
+        self.max_spans = max_spans
+        self._spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def enabled(self):
+        return getattr(self._local, "enabled", self.default_enabled)
+
+    @enabled.setter
+    def enabled(self, value):
+        self.default_enabled = value
+
+    def set_enabled(self, enabled):
+        """Sadece bu thread icin acar/kapatir; None surec varsayilanina doner. Diger oturumlar etkilenmez."""
+        if enabled is None:
+            self._local.__dict__.pop("enabled", None)
+        else:
+            self._local.enabled = bool(enabled)
+
+    # --- Run (trace) yonetimi ---
+    def start_run(self, enabled=None):
+        """Yeni bir calisma (trace) baslatir ve kimligini dondurur."""
+        trace_id = uuid.uuid4().hex
+        self.set_enabled(enabled)
+        self._local.trace_id = trace_id
+        self._local.stack = []
+        return trace_id
+
+    def resume_run(self, trace_id, enabled=None):
+        """Onceki bir calismanin span'lerine devam eder (Streamlit rerun'lari, arka plan isleri icin)."""
+        self.set_enabled(enabled)
+        self._local.trace_id = trace_id
+        self._local.stack = []
+
+    def _trace_id(self):
+        trace_id = getattr(self._local, "trace_id", None)
+        if trace_id is None:
+            trace_id = self._local.trace_id = uuid.uuid4().hex
+        return trace_id
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # --- Span API ---
+    def span(self, name, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return _SpanContext(self, name, attributes)
+
+    def current_span(self):
+        if not self.enabled:
+            return NOOP_SPAN
+        stack = self._stack()
+        return stack[-1] if stack else NOOP_SPAN
+
+    def _open(self, name, attributes):
+        stack = self._stack()
+        parent_id = stack[-1].span_id if stack else None
+        span = Span(name, self._trace_id(), parent_id, attributes)
+        stack.append(span)
+        return span
+
+    def _close(self, span):
+        span.end_ns = time.time_ns()
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        with self._lock:
+            self._spans.append(span)
+            # Uzun yasayan sunucuda bellek sinirsiz buyumesin
+            if len(self._spans) > self.max_spans:
+                del self._spans[: len(self._spans) - self.max_spans]
+
+    # --- Raporlama ---
+    def spans(self, trace_id=None):
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [s for s in spans if s.trace_id == trace_id]
+        return spans
+
+    def summary(self, trace_id=None):
+        """Asama bazinda ozet tablo: cagri sayisi, toplam/ortalama/max sure, byte ve token sayaclari."""
+        spans = self.spans(trace_id)
+        roots_ms = sum(s.duration_ms for s in spans if s.parent_id is None) or 1.0
+        rows = {}
+        for s in spans:
+            row = rows.setdefault(s.name, {
+                "stage": s.name, "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "bytes": 0, "tokens": 0, "errors": 0,
+            })
+            row["calls"] += 1
+            row["total_ms"] += s.duration_ms
+            row["max_ms"] = max(row["max_ms"], s.duration_ms)
+            row["bytes"] += int(s.attributes.get("bytes", 0) or 0)
+            row["tokens"] += int(s.attributes.get("eval_count", 0) or 0)
+            row["errors"] += 1 if (s.error or s.attributes.get("error")) else 0
+        result = []
+        for row in sorted(rows.values(), key=lambda r: r["total_ms"], reverse=True):
+            row["avg_ms"] = round(row["total_ms"] / row["calls"], 2)
+            row["share_pct"] = round(100.0 * row["total_ms"] / roots_ms, 1)
+            row["total_ms"] = round(row["total_ms"], 2)
+            row["max_ms"] = round(row["max_ms"], 2)
+            result.append(row)
+        return result
+
+    def export(self, path=None, trace_id=None, export_format=None):
+        """
+        Henuz disa aktarilmamis span'leri JSON Lines olarak dosyaya ekler.
+        export_format: 'jsonl' (duz kayit) veya 'otel' (OpenTelemetry span formati).
+        """
+        path = path or self.export_path
+        if not path:
+            return 0
+        export_format = export_format or self.export_format
+        spans = [s for s in self.spans(trace_id) if not s.exported]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for s in spans:
+                record = s.to_otel() if export_format == "otel" else s.to_dict()
+                f.write(json.dumps(record, default=str) + "\n")
+                s.exported = True
+        return len(spans)
+
+    def clear(self, trace_id=None):
+        with self._lock:
+            if trace_id is None:
+                self._spans = []
+            else:
+                self._spans = [s for s in self._spans if s.trace_id != trace_id]
+
+
+# Surec genelinde tek tracer. QA_TRACE=1 ile acilir.
+tracer = Tracer(
+    enabled=os.getenv("QA_TRACE", "0").lower() in ("1", "true", "yes"),
+    export_path=os.getenv("QA_TRACE_FILE"),
+    export_format=os.getenv("QA_TRACE_FORMAT", "jsonl"),
+)
+
+
+def current_span():
+    return tracer.current_span()
+
+
+def traced(name):
+    """Fonksiyonu bir span ile sarar. Tracing kapaliyken dogrudan cagirir."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
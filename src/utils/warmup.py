@@ -0,0 +1,78 @@
+import time
+import threading
+
+OLLAMA_BASE_URL = "http://localhost:11434"
+MODELS_REFRESH_SECONDS = 60
+
+# Surec genelinde paylasilan isinma durumu (tum Streamlit oturumlari icin bir kez)
+_state = {
+    "started": False,
+    "models": None,
+    "models_fetched": 0.0,
+    "models_fetching": False,
+    "parser_ready": False,
+    "embedding_ready": False,
+    "error": None,
+}
+_lock = threading.Lock()
+
+
+def _fetch_models(base_url):
+    import requests
+    try:
+        response = requests.get(f"{base_url}/api/tags", timeout=3)
+        if response.status_code == 200:
+            _state["models"] = [m['name'] for m in response.json()['models']]
+    except Exception:
+        pass
+    finally:
+        _state["models_fetched"] = time.time()
+        _state["models_fetching"] = False
+
+
+def _warmup(base_url):
+    _state["models_fetching"] = True
+    _fetch_models(base_url)
+    try:
+        # tree_sitter / networkx / pypdf
+        import src.graph.code_parser  # noqa: F401
+        import src.utils.pdf_processor  # noqa: F401
+        _state["parser_ready"] = True
+
+        # chromadb + sentence_transformers (torch): en pahali kisim
+        from src.rag.vector_store import CodeVectorStore, get_chroma_client, get_embedding_model
+        get_chroma_client(CodeVectorStore.default_db_path())
+        get_embedding_model()
+        _state["embedding_ready"] = True
+    except Exception as e:
+        _state["error"] = f"{type(e).__name__}: {e}"
+
+
+def start_background_warmup(base_url=OLLAMA_BASE_URL):
+    """
+    Agir bagimliliklari ve embedding modelini arka planda yukler.
+    Ilk sayfa cizildikten sonra cagrilir; tekrar cagrilar etkisizdir.
+    """
+    with _lock:
+        if _state["started"]:
+            return False
+        _state["started"] = True
+    threading.Thread(target=_warmup, args=(base_url,), name="qa-warmup", daemon=True).start()
+    return True
+
+
+def available_models(fallback, base_url=OLLAMA_BASE_URL):
+    """
+    Ollama model listesi hazirsa onu, degilse varsayilan listeyi dondurur (asla bloklamaz).
+    Liste eskidiyse arka planda yenilenir.
+    """
+    with _lock:
+        stale = _state["started"] and time.time() - _state["models_fetched"] > MODELS_REFRESH_SECONDS
+        if stale and not _state["models_fetching"]:
+            _state["models_fetching"] = True
+            threading.Thread(target=_fetch_models, args=(base_url,), daemon=True).start()
+    return _state["models"] or list(fallback)
+
+
+def status():
+    return dict(_state)
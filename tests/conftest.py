@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Testler depo kokunden 'src.' importlariyla calisir (pytest hangi klasorden baslatilirsa baslatilsin)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,56 @@
+import json
+import socket
+
+import pytest
+
+import cli
+from benchmarks.mock_ollama import MockOllamaServer
+
+
+@pytest.fixture
+def server():
+    server = MockOllamaServer(latency_ms=1, output_tokens=10, models=("gherkin-qa",)).start()
+    yield server
+    server.stop()
+
+
+def dead_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api/generate"
+
+
+def test_check_llm_accepts_a_serving_endpoint(server):
+    assert cli.check_llm(server.generate_url, "gherkin-qa") == (True, "")
+
+
+def test_check_llm_reports_missing_model(server):
+    ok, reason = cli.check_llm(server.generate_url, "llama3")
+    assert not ok
+    assert "model 'llama3' not available" in reason and "gherkin-qa" in reason
+
+
+def test_endpoint_down_exits_before_any_work(tmp_path, capsys):
+    out_dir = tmp_path / "features"
+    code = cli.main([str(tmp_path), "--api-url", dead_url(), "--out-dir", str(out_dir)])
+    assert code == cli.EXIT_LLM_UNAVAILABLE
+    assert "No usable LLM endpoint" in capsys.readouterr().err
+    assert not out_dir.exists()
+
+
+def test_failed_repositories_are_reported_in_the_summary(tmp_path):
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    (empty / "notes.bin").write_bytes(b"\x00\x01")
+    out_dir = tmp_path / "features"
+    code = cli.main([str(tmp_path / "missing"), str(empty), "--skip-llm-check", "--out-dir", str(out_dir)])
+    assert code == cli.EXIT_FAILED
+
+    summary = json.loads((out_dir / "run_summary.json").read_text())
+    assert summary["exit_code"] == cli.EXIT_FAILED
+    assert summary["counts"] == {"ok": 0, "partial": 0, "failed": 2}
+    missing, no_files = summary["repos"]
+    assert missing["error"].startswith("FileNotFoundError")
+    assert no_files["error"] == "ValueError: No valid source or requirement files found"
+    assert missing["feature_file"] is None and no_files["feature_file"] is None
@@ -0,0 +1,84 @@
+import pytest
+
+from src.graph.code_parser import CodeGraphParser
+
+SOURCE = '''def load(path):
+    return open(path).read()
+
+
+def parse(path):
+    return load(path).split()
+
+
+class Report:
+    def render(self):
+        return parse("x")
+'''
+
+
+@pytest.fixture
+def parsed(tmp_path):
+    path = tmp_path / "report.py"
+    path.write_text(SOURCE)
+    parser = CodeGraphParser(keep_trees=True)
+    parser.parse_file(str(path))
+    return parser, path
+
+
+def fresh_graph(path):
+    parser = CodeGraphParser()
+    parser.parse_file(str(path))
+    return parser.graph
+
+
+def test_body_edit_only_updates_touched_definition(parsed):
+    parser, path = parsed
+    path.write_text(SOURCE.replace("split()", "split(',')"))
+    changes = parser.reparse_file(str(path))
+    assert changes == {"changed": ["FUNC:parse", "FILE:report.py"], "removed": []}
+    assert "split(',')" in parser.graph.nodes["FUNC:parse"]["code"]
+
+
+def test_inserted_lines_shift_untouched_definitions(parsed):
+    parser, path = parsed
+    path.write_text("import os\n\n" + SOURCE)
+    changes = parser.reparse_file(str(path))
+    assert "FUNC:parse" not in changes["changed"]
+    assert parser.graph.nodes["FUNC:parse"]["start_line"] == fresh_graph(path).nodes["FUNC:parse"]["start_line"]
+
+
+def test_rename_reports_removed_definition(parsed):
+    parser, path = parsed
+    path.write_text(SOURCE.replace("def load(", "def read_file(").replace("return load(", "return read_file("))
+    changes = parser.reparse_file(str(path))
+    assert changes["removed"] == ["FUNC:load"]
+    assert "FUNC:read_file" in changes["changed"]
+    assert "FUNC:load" not in parser.graph
+    # Cagri kenarlari yeniden kurulur: sonuc bastan parse ile ayni grafik
+    expected = fresh_graph(path)
+    assert set(parser.graph.nodes) == set(expected.nodes)
+    assert set(parser.graph.edges) == set(expected.edges)
+
+
+def test_unchanged_file_is_a_no_op(parsed):
+    parser, path = parsed
+    assert parser.reparse_file(str(path)) == {"changed": [], "removed": []}
+
+
+def test_remove_file_drops_file_and_definitions(parsed):
+    parser, path = parsed
+    removed = parser.remove_file(str(path))
+    assert set(removed) == {"FUNC:load", "FUNC:parse", "CLASS:Report", "FUNC:render", "FILE:report.py"}
+    assert not any(node.startswith(("FUNC:", "CLASS:", "FILE:")) for node in parser.graph)
+    assert parser.trees == {}
+
+
+def test_definitions_called_from_other_files_stay_as_call_targets(parsed, tmp_path):
+    parser, path = parsed
+    caller = tmp_path / "main.py"
+    caller.write_text("from report import parse\n\nparse('data.txt')\n")
+    parser.parse_file(str(caller))
+    parser.remove_file(str(path))
+    assert parser.graph.has_edge("FILE:main.py", "FUNC:parse")
+    assert parser.graph.nodes["FUNC:parse"] == {}
+    assert "FUNC:load" not in parser.graph
@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.rag.compact_index import CompactIndex, journal_path
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(1).standard_normal((50, 16)).astype(np.float32)
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_search_ranks_exact_match_first(dtype, vectors):
+    index = CompactIndex(dtype)
+    index.add([f"n{i}" for i in range(50)], vectors)
+    top_id, score = index.search(vectors[7], 3)[0]
+    assert top_id == "n7" and score == pytest.approx(1.0, abs=0.02)
+
+
+def test_small_updates_are_journaled_and_replayed(tmp_path, vectors):
+    path = str(tmp_path / "compact" / "c.npz")
+    index = CompactIndex("int8")
+    index.add([f"n{i}" for i in range(50)], vectors)
+    index.save(path)
+    snapshot_mtime = os.stat(path).st_mtime_ns
+    assert not os.path.exists(journal_path(path))
+
+    index.remove(["n1", "n2"])
+    index.add(["n1"], vectors[:1])
+    index.save(path)
+    assert os.stat(path).st_mtime_ns == snapshot_mtime
+    assert os.path.exists(journal_path(path))
+
+    loaded = CompactIndex.load(path)
+    assert loaded.ids == index.ids
+    assert np.array_equal(loaded.codes, index.codes)
+    assert not loaded.dirty
+
+
+def test_large_journal_is_folded_into_a_new_snapshot(tmp_path, vectors):
+    path = str(tmp_path / "c.npz")
+    index = CompactIndex("float16")
+    index.add(["n0"], vectors[:1])
+    index.save(path)
+    index.add([f"n{i}" for i in range(1, 50)], vectors[1:])
+    index.save(path)  # gunluk, tek vektorluk goruntunun yarisini asar
+    index.remove(["n3"])
+    index.save(path)
+    assert not os.path.exists(journal_path(path))
+    assert len(CompactIndex.load(path)) == 49
+
+
+def test_torn_or_foreign_journal_is_ignored(tmp_path, vectors):
+    path = str(tmp_path / "c.npz")
+    index = CompactIndex("int8")
+    index.add([f"n{i}" for i in range(50)], vectors)
+    index.save(path)
+    index.remove(["n0"])
+    index.save(path)
+    with open(journal_path(path), "ab") as f:
+        f.write(b"\x93NUMPY partial")
+
+    loaded = CompactIndex.load(path)
+    assert len(loaded) == 49
+    # Yarim kayittan sonra eklenenler kaybolmasin diye bir sonraki kayit tam goruntu yazar
+    loaded.remove(["n1"])
+    loaded.save(path)
+    assert not os.path.exists(journal_path(path))
+    assert len(CompactIndex.load(path)) == 48
+
+    # Baska (eski) goruntuye ait gunluk uygulanmaz
+    other = str(tmp_path / "other.npz")
+    stale = CompactIndex.load(path)
+    stale.save(other)
+    stale.remove(["n2"])
+    stale.save(other)
+    os.replace(journal_path(other), journal_path(path))
+    assert len(CompactIndex.load(path)) == 48
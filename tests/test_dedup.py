@@ -0,0 +1,75 @@
+import networkx as nx
+
+from src.graph.dedup import clear_duplicates, collapse_duplicates, file_duplicates
+
+BODY = '''def {name}(items, rate):
+    """Sum the order lines and apply the tax rate."""
+    total = 0
+    for item in items:
+        if item["qty"] > 0:
+            total += item["price"] * item["qty"]
+    discount = total * 0.05 if total > 100 else 0
+    return round((total - discount) * (1 + rate), 2)
+'''
+
+
+def build_graph():
+    graph = nx.DiGraph()
+    for name, file_name in (("total", "a.py"), ("total_copy", "b.py"), ("total_vendored", "c.py")):
+        graph.add_node(f"FUNC:{name}", type="function", file=file_name, start_line=1,
+                       code=BODY.format(name="calc"))
+    graph.add_node("FUNC:other", type="function", file="a.py", start_line=20,
+                   code="def other(path):\n    with open(path) as f:\n        return [line.split(',') for line in f]\n")
+    return graph
+
+
+def test_collapse_groups_copies_under_first_member():
+    graph = build_graph()
+    groups = collapse_duplicates(graph)
+    assert groups == {"FUNC:total": ["FUNC:total_copy", "FUNC:total_vendored"]}
+    assert graph.nodes["FUNC:total_copy"]["duplicate_of"] == "FUNC:total"
+    assert graph.has_edge("FUNC:total_vendored", "FUNC:total")
+    assert "duplicate_of" not in graph.nodes["FUNC:other"]
+
+
+def test_clear_changed_representative_releases_members():
+    graph = build_graph()
+    collapse_duplicates(graph)
+    released = clear_duplicates(graph, ["FUNC:total"])
+    assert sorted(released) == ["FUNC:total_copy", "FUNC:total_vendored"]
+    assert not any("duplicate_of" in data or "duplicates" in data for _, data in graph.nodes(data=True))
+    assert not any(r == "duplicate_of" for _, _, r in graph.edges(data="relation"))
+
+
+def test_clear_changed_member_keeps_other_members():
+    graph = build_graph()
+    collapse_duplicates(graph)
+    # Temsilcinin uye listesi (vektor metadata'si) degistigi icin o da yeniden yazilir
+    assert clear_duplicates(graph, ["FUNC:total_copy"]) == ["FUNC:total"]
+    assert "duplicate_of" not in graph.nodes["FUNC:total_copy"]
+    assert graph.nodes["FUNC:total_vendored"]["duplicate_of"] == "FUNC:total"
+    assert graph.nodes["FUNC:total"]["duplicates"] == ["FUNC:total_vendored"]
+
+
+def test_clear_removed_nodes():
+    graph = build_graph()
+    collapse_duplicates(graph)
+    graph.remove_node("FUNC:total")
+    assert sorted(clear_duplicates(graph, ["FUNC:total"])) == ["FUNC:total_copy", "FUNC:total_vendored"]
+    assert not any("duplicate_of" in data for _, data in graph.nodes(data=True))
+
+    graph = build_graph()
+    collapse_duplicates(graph)
+    graph.remove_node("FUNC:total_copy")
+    assert clear_duplicates(graph, ["FUNC:total_copy"]) == ["FUNC:total"]
+    assert graph.nodes["FUNC:total"]["duplicates"] == ["FUNC:total_vendored"]
+
+
+def test_clear_all_and_file_mapping():
+    graph = nx.DiGraph()
+    for file_name in ("a.py", "b.py", "c.py"):
+        graph.add_node(f"FILE:{file_name}", type="file", content=BODY.format(name="calc"))
+    collapse_duplicates(graph)
+    assert file_duplicates(graph, ["CODE: a.py", "CODE: b.py", "DOC: spec.txt"]) == {"b.py": "a.py"}
+    clear_duplicates(graph)
+    assert file_duplicates(graph, ["CODE: a.py", "CODE: b.py", "CODE: c.py"]) == {}
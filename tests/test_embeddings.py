@@ -0,0 +1,58 @@
+import sys
+
+import pytest
+
+from src.rag import embeddings
+
+
+class FakeTorchBackend:
+    name = "torch"
+
+    def __init__(self, model_name=embeddings.DEFAULT_MODEL):
+        self.model_name = model_name
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    # Surec genelindeki onbellek ve QA_EMBED_* ayarlari testler arasinda paylasilmasin
+    monkeypatch.setattr(embeddings, "_BACKEND_CACHE", {})
+    monkeypatch.setattr(embeddings, "TorchBackend", FakeTorchBackend)
+    for name in ("QA_EMBED_BACKEND", "QA_EMBED_MODEL_DIR", "QA_EMBED_QUANTIZE", "QA_EMBED_THREADS"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_backend_is_selected_from_the_environment(monkeypatch):
+    monkeypatch.setenv("QA_EMBED_BACKEND", "torch")
+    monkeypatch.setenv("QA_EMBED_QUANTIZE", "0")
+    assert embeddings.backend_settings()["quantize"] is False
+    backend = embeddings.get_backend()
+    assert isinstance(backend, FakeTorchBackend)
+    assert embeddings.get_backend("torch") is backend
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown embedding backend 'tpu'"):
+        embeddings.get_backend("tpu")
+
+
+def test_onnx_requires_a_model_directory():
+    with pytest.raises(ValueError, match="QA_EMBED_MODEL_DIR"):
+        embeddings.get_backend("onnx")
+
+
+def test_onnx_not_installed_falls_back_to_torch(monkeypatch, tmp_path, capsys):
+    monkeypatch.setitem(sys.modules, "onnxruntime", None)
+    backend = embeddings.get_backend("onnx", model_dir=str(tmp_path))
+    assert isinstance(backend, FakeTorchBackend)
+    assert "falling back to torch" in capsys.readouterr().out
+    # Ayni torch ornegi paylasilir; ONNX tekrar denenmez
+    assert embeddings.get_backend("torch") is backend
+    assert embeddings.get_backend("onnx", model_dir=str(tmp_path)) is backend
+
+
+def test_missing_model_files_are_reported(tmp_path):
+    (tmp_path / "onnx").mkdir()
+    (tmp_path / "onnx" / "model.onnx").write_bytes(b"")
+    assert embeddings.OnnxBackend._find(str(tmp_path), "model.onnx").endswith("onnx/model.onnx")
+    with pytest.raises(FileNotFoundError, match="tokenizer.json not found"):
+        embeddings.OnnxBackend._find(str(tmp_path), "tokenizer.json")
@@ -0,0 +1,116 @@
+import socket
+
+import pytest
+
+from benchmarks.mock_ollama import MockOllamaServer
+from src.agent import llm_client
+from src.agent.endpoint_pool import OLLAMA, OPENAI, Endpoint, EndpointPool, NoEndpointAvailable, parse_endpoints
+from src.agent.llm_client import LLMClient
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**options):
+        server = MockOllamaServer(**{"latency_ms": 5, "output_tokens": 10, **options}).start()
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.stop()
+
+
+def dead_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def test_endpoint_url_forms():
+    ollama, v1, prefixed = parse_endpoints("http://h:11434/api/generate, http://h:8080/v1,openai+http://h:9000/")
+    assert (ollama.kind, ollama.base_url) == (OLLAMA, "http://h:11434")
+    assert (v1.kind, v1.base_url, v1.generate_url) == (OPENAI, "http://h:8080", "http://h:8080/v1/completions")
+    assert (prefixed.kind, prefixed.base_url) == (OPENAI, "http://h:9000")
+
+
+def test_pick_prefers_least_outstanding_and_release_frees_slot():
+    # Tek endpoint'li havuzlar gibi saglik kontrolu yapilmasin diye ilk kontrol tamamlanmis sayilir
+    pool = EndpointPool([Endpoint("http://a"), Endpoint("http://b")])
+    pool._ready.set()
+    first = pool.pick("m")
+    second = pool.pick("m")
+    assert {first.base_url, second.base_url} == {"http://a", "http://b"}
+    pool.release(first)
+    assert pool.pick("m") is first
+    assert first.outstanding == 1 and second.outstanding == 1
+
+
+def test_pick_skips_unhealthy_and_excluded_endpoints():
+    a, b = Endpoint("http://a"), Endpoint("http://b")
+    pool = EndpointPool([a, b])
+    pool._ready.set()
+    chosen = pool.pick("m")
+    pool.release(chosen, failed=True, error="connection_error")
+    assert not chosen.healthy and chosen.last_error == "connection_error"
+    other = b if chosen is a else a
+    assert pool.pick("m") is other
+    # Hepsi sagliksizsa yine de denenir; denenmis olanlar haric tutulur
+    pool.release(other, failed=True)
+    assert pool.pick("m", exclude=[chosen]) is other
+    with pytest.raises(NoEndpointAvailable):
+        pool.pick("m", exclude=[a, b])
+
+
+def test_health_check_routes_by_model(servers):
+    qa = servers(models=("gherkin-qa",))
+    other = servers(models=("llama3",))
+    pool = EndpointPool(parse_endpoints(f"{qa.base_url},{other.base_url}"))
+    try:
+        for _ in range(3):
+            endpoint = pool.pick("llama3")
+            assert endpoint.base_url == other.base_url
+            pool.release(endpoint)
+        assert pool.pick("gherkin-qa").base_url == qa.base_url
+    finally:
+        pool.close()
+
+
+def test_client_fails_over_from_unreachable_endpoint(servers):
+    live = servers()
+    client = LLMClient("gherkin-qa", api_url=f"{dead_url()},{live.generate_url}")
+    try:
+        for _ in range(2):
+            assert client.generate_response("def f(): pass", {"type": "code"}, "scenarios").startswith("Feature:")
+        assert client.last_error is None
+        assert live.requests_served == 2
+        assert all(e.outstanding == 0 for e in client.pool.endpoints)
+    finally:
+        client.pool.close()
+
+
+def test_client_fails_over_on_read_timeout(servers, monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_TIMEOUT", (1.0, 0.3))
+    slow = servers(latency_ms=2000)
+    fast = servers()
+    client = LLMClient("gherkin-qa", api_url=f"{slow.generate_url},{fast.generate_url}")
+    try:
+        # Ilk saglik kontrolunden sonra yavas endpoint de saglikli gorunur; sira ile ilk o denenir
+        for _ in range(2):
+            assert client.generate_response("def f(): pass", {"type": "code"}, "scenarios").startswith("Feature:")
+        slow_endpoint = next(e for e in client.pool.endpoints if e.base_url == slow.base_url)
+        assert not slow_endpoint.healthy and slow_endpoint.last_error == "timeout"
+        assert fast.requests_served == 2
+    finally:
+        client.pool.close()
+
+
+def test_client_reports_error_when_every_endpoint_is_down():
+    client = LLMClient("gherkin-qa", api_url=f"{dead_url()},{dead_url()}")
+    try:
+        assert client.generate_response("x", {"type": "code"}, "q").startswith("Hata")
+        assert client.last_error == "connection_error"
+    finally:
+        client.pool.close()
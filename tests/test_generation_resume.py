@@ -0,0 +1,111 @@
+import socket
+
+import pytest
+
+from benchmarks.mock_ollama import MockOllamaServer
+from src.agent.llm_client import LLMClient
+from src.pipeline.checkpoint import CheckpointStore
+from src.pipeline.generation import COMPONENT_WISE, GLOBAL_CONSOLIDATION, generate
+
+FILES = ["CODE: billing.py", "CODE: checkout.py", "CODE: cart.py"]
+
+
+class StaticStore:
+    """search_similar icin sabit sonuc donduren vektor deposu (izlenebilirlik matrisi yok)."""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.collection_name = "resume_test"
+
+    def search_similar(self, query, k=3):
+        return {"documents": [[f"def handler(): pass  # {query}"]], "metadatas": [[{"type": "function"}]]}
+
+
+class Interrupt(Exception):
+    pass
+
+
+@pytest.fixture
+def server():
+    server = MockOllamaServer(latency_ms=5, output_tokens=10).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.db"))
+
+
+def dead_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api/generate"
+
+
+def interrupt_at(unit):
+    def on_progress(i, total, message):
+        if i == unit:
+            raise Interrupt(message)
+    return on_progress
+
+
+def test_component_wise_resume_skips_completed_units(server, checkpoint, tmp_path):
+    llm = LLMClient("gherkin-qa", api_url=server.generate_url)
+    store = StaticStore(tmp_path)
+    with pytest.raises(Interrupt):
+        generate(COMPONENT_WISE, FILES, store, llm, on_progress=interrupt_at(2), checkpoint=checkpoint, run_id="r1")
+    assert server.requests_served == 2
+    assert checkpoint.progress("r1")["done"] == 2
+
+    result = generate(COMPONENT_WISE, FILES, store, llm, checkpoint=checkpoint, run_id="r1")
+    assert result.ok and result.resumed == 2
+    assert server.requests_served == 3
+    assert [line for line in result.report.splitlines() if line.startswith("# --- Source:")] == [
+        "# --- Source: billing.py ---", "# --- Source: checkout.py ---", "# --- Source: cart.py ---"]
+
+
+def test_failed_units_are_retried_on_resume(server, checkpoint, tmp_path):
+    store = StaticStore(tmp_path)
+    down = LLMClient("gherkin-qa", api_url=dead_url())
+    first = generate(COMPONENT_WISE, FILES, store, down, checkpoint=checkpoint, run_id="r2")
+    assert first.failed == ["billing.py", "checkout.py", "cart.py"]
+    assert checkpoint.progress("r2") == {"done": 0, "failed": 3}
+
+    result = generate(COMPONENT_WISE, FILES, store, LLMClient("gherkin-qa", api_url=server.generate_url),
+                      checkpoint=checkpoint, run_id="r2")
+    assert result.ok and result.resumed == 0
+    assert server.requests_served == 3
+    assert checkpoint.progress("r2") == {"done": 3, "failed": 0}
+
+
+def test_global_resume_reuses_consolidation(server, checkpoint, tmp_path):
+    llm = LLMClient("gherkin-qa", api_url=server.generate_url)
+    store = StaticStore(tmp_path)
+    first = generate(GLOBAL_CONSOLIDATION, FILES, store, llm, checkpoint=checkpoint, run_id="r3")
+    assert first.ok and server.requests_served == 4
+
+    again = generate(GLOBAL_CONSOLIDATION, FILES, store, llm, checkpoint=checkpoint, run_id="r3")
+    assert again.report == first.report
+    assert again.resumed == 4
+    assert server.requests_served == 4
+
+
+def test_without_run_id_nothing_is_checkpointed(server, checkpoint, tmp_path):
+    llm = LLMClient("gherkin-qa", api_url=server.generate_url)
+    generate(COMPONENT_WISE, FILES, StaticStore(tmp_path), llm, checkpoint=checkpoint)
+    generate(COMPONENT_WISE, FILES, StaticStore(tmp_path), llm, checkpoint=checkpoint)
+    assert server.requests_served == 6
+
+
+def test_finished_run_purges_stale_runs(server, checkpoint, tmp_path):
+    checkpoint.start_run("old")
+    checkpoint.record("old", "billing.py", "Feature: old")
+    checkpoint._execute("UPDATE runs SET updated = updated - 30 * 86400 WHERE run_id = ?", ("old",))
+
+    llm = LLMClient("gherkin-qa", api_url=server.generate_url)
+    result = generate(COMPONENT_WISE, FILES, StaticStore(tmp_path), llm, checkpoint=checkpoint, run_id="r4")
+    assert result.ok
+    assert checkpoint.progress("old")["done"] == 0
+    assert checkpoint.progress("r4")["done"] == 3
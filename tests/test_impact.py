@@ -0,0 +1,120 @@
+import pytest
+
+from src.graph.code_parser import CodeGraphParser
+from src.pipeline.impact import ImpactAnalyzer, parse_diff, replace_sections, split_sections
+
+DIFF = """diff --git a/src/billing.py b/src/billing.py
+--- a/src/billing.py
++++ b/src/billing.py
+@@ -3,0 +4,2 @@ def total(items):
++    # rounding
++    pass
+@@ -10 +12 @@ def tax(amount):
+-    return amount * 0.18
++    return amount * 0.2
+diff --git a/old/legacy.py b/old/legacy.py
+--- a/old/legacy.py
++++ /dev/null
+@@ -1,3 +0,0 @@
+-def legacy():
+-    pass
+-
+diff --git a/docs/readme.txt b/docs/readme.txt
+--- a/docs/readme.txt
++++ b/docs/readme.txt
+@@ -5,2 +4,0 @@
+-old line
+-old line
+"""
+
+REPORT = """Feature header
+
+# --- Source: a.py ---
+Feature: A
+
+# --- Source: b.py ---
+Feature: B
+
+# --- Source: c.py ---
+Feature: C
+
+"""
+
+
+def test_parse_diff_maps_hunks_to_new_lines():
+    changes = parse_diff(DIFF)
+    assert changes["billing.py"] == {4, 5, 12}
+    assert changes["legacy.py"] is None
+    # Sadece silme iceren hunk: komsu satirlar degismis sayilir
+    assert changes["readme.txt"] == {4, 5}
+
+
+RENAME_DIFF = """diff --git a/src/payment.py b/src/payments.py
+similarity index 90%
+rename from src/payment.py
+rename to src/payments.py
+--- a/src/payment.py
++++ b/src/payments.py
+@@ -3 +3 @@
+-    return 1
++    return 2
+diff --git a/src/cart.py b/lib/basket.py
+similarity index 100%
+rename from src/cart.py
+rename to lib/basket.py
+diff --git a/src/tax.py b/lib/tax.py
+similarity index 100%
+rename from src/tax.py
+rename to lib/tax.py
+"""
+
+
+def test_parse_diff_treats_rename_source_as_removed():
+    changes = parse_diff(RENAME_DIFF)
+    assert changes == {"payment.py": None, "payments.py": None, "cart.py": None, "basket.py": None}
+
+
+def test_renamed_file_section_is_removed(tmp_path):
+    new_file = tmp_path / "payments.py"
+    new_file.write_text("def pay():\n    return 2\n")
+    parser = CodeGraphParser()
+    parser.parse_file(str(new_file))
+    report = ImpactAnalyzer(parser.graph).analyze(parse_diff(RENAME_DIFF))
+    assert report.removed == {"payment.py", "cart.py", "basket.py"}
+    assert "payments.py" in report.files
+
+
+def test_split_sections_keeps_header_and_order():
+    header, sections = split_sections(REPORT)
+    assert header == "Feature header\n\n"
+    assert [name for name, _ in sections] == ["a.py", "b.py", "c.py"]
+
+
+def test_replace_sections_updates_removes_and_appends():
+    updated = replace_sections(REPORT, {"b.py": "Feature: B2", "d.py": "Feature: D"}, removed={"c.py"})
+    header, sections = split_sections(updated)
+    assert header == "Feature header\n\n"
+    assert [name for name, _ in sections] == ["a.py", "b.py", "d.py"]
+    assert "Feature: A" in sections[0][1]
+    assert "Feature: B2" in sections[1][1] and "Feature: B\n" not in updated
+    assert "Feature: C" not in updated
+
+
+def test_replace_sections_requires_component_wise_output():
+    with pytest.raises(ValueError):
+        replace_sections("Feature: merged output\n", {"a.py": "x"})
+
+
+def test_analyzer_follows_callers_across_files(tmp_path):
+    (tmp_path / "billing.py").write_text("def tax(amount):\n    return amount * 0.2\n")
+    (tmp_path / "checkout.py").write_text("from billing import tax\n\n\ndef pay(amount):\n    return tax(amount)\n")
+    (tmp_path / "other.py").write_text("def unrelated():\n    return 1\n")
+    parser = CodeGraphParser()
+    for name in ("billing.py", "checkout.py", "other.py"):
+        parser.parse_file(str(tmp_path / name))
+    parser.graph.add_node("DOC:spec.txt", type="requirement_doc", content="Checkout must apply tax before pay.")
+
+    report = ImpactAnalyzer(parser.graph).analyze({"billing.py": {2}, "gone.py": None})
+    assert report.seeds == {"FUNC:tax"}
+    assert report.files == {"billing.py", "checkout.py", "spec.txt"}
+    assert report.removed == {"gone.py"}
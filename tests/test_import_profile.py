@@ -0,0 +1,26 @@
+from benchmarks.import_profile import app_imports
+
+APP = '''import streamlit as st
+import os
+from src.utils import tracing
+from src.jobs.runner import get_runner
+
+if os.getenv("QA_DEBUG"):
+    import pdb
+
+def render():
+    import pandas as pd
+    return pd
+'''
+
+
+def test_app_imports_follow_module_level_imports(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(APP)
+    # Fonksiyon icindeki tembel import ilk cizimde yuklenmez
+    assert app_imports(str(path)) == ["streamlit", "os", "src.utils.tracing", "src.jobs.runner", "pdb"]
+
+
+def test_app_imports_match_the_real_app():
+    modules = app_imports()
+    assert {"streamlit", "src.rag.traceability", "src.pipeline.scanner", "src.utils.sessions"} <= set(modules)
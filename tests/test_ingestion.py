@@ -0,0 +1,18 @@
+import re
+
+from src.pipeline.ingestion import repo_slug
+
+CHROMA_NAME = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9._-]{1,61}[a-zA-Z0-9]$")
+
+
+def test_repo_slug_is_a_valid_collection_name(tmp_path):
+    for name in ("my project (copy)", "ödeme servisi", "-" * 80, "a" * 200, "orders.tar.gz"):
+        path = tmp_path / name[:100]
+        slug = repo_slug(str(path))
+        assert CHROMA_NAME.match(slug), slug
+        assert CHROMA_NAME.match(f"watch_{slug}"), slug
+    assert repo_slug(str(tmp_path / "orders.tar.gz")).startswith("orders_")
+
+
+def test_repo_slug_separates_same_basename(tmp_path):
+    assert repo_slug(str(tmp_path / "a" / "app")) != repo_slug(str(tmp_path / "b" / "app"))
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from src.jobs.runner import JobRunner
+from src.jobs.store import JobStore, QUEUED, RUNNING, SUCCEEDED, INTERRUPTED
+
+
+def make_store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.db"))
+
+
+def age(store, job_id, seconds):
+    # heartbeat'i geriye alarak sahibi durmus bir sureci taklit eder
+    store._execute("UPDATE jobs SET heartbeat = heartbeat - ? WHERE id = ?", (seconds, job_id))
+
+
+def test_recover_leaves_live_workers_alone(tmp_path):
+    store = make_store(tmp_path)
+    queued = store.create("analysis", {}, worker="other")
+    running = store.create("analysis", {}, worker="other")
+    assert store.mark_running(running, "other")
+
+    assert store.recover("me", stale_after=60) == []
+    assert store.get(running)["status"] == RUNNING
+    assert store.get(queued)["worker"] == "other"
+
+
+def test_recover_takes_over_stale_rows(tmp_path):
+    store = make_store(tmp_path)
+    queued = store.create("analysis", {}, worker="dead")
+    running = store.create("analysis", {}, worker="dead")
+    store.mark_running(running, "dead")
+    age(store, queued, 120)
+    age(store, running, 120)
+
+    assert store.recover("me", stale_after=60) == [queued]
+    assert store.get(running)["status"] == INTERRUPTED
+    assert store.get(queued)["worker"] == "me"
+    # ikinci surec ayni isi tekrar devralamaz
+    assert store.recover("third", stale_after=60) == []
+
+
+def test_heartbeat_keeps_rows_fresh(tmp_path):
+    store = make_store(tmp_path)
+    job_id = store.create("analysis", {}, worker="other")
+    age(store, job_id, 120)
+    store.heartbeat("other")
+    assert store.recover("me", stale_after=60) == []
+
+
+def test_mark_running_claims_once(tmp_path):
+    store = make_store(tmp_path)
+    job_id = store.create("analysis", {}, worker="me")
+    assert not store.mark_running(job_id, "other")
+    assert store.mark_running(job_id, "me")
+    assert not store.mark_running(job_id, "me")
+
+
+def test_purge_removes_only_old_finished_jobs(tmp_path):
+    store = make_store(tmp_path)
+    old = store.create("analysis", {})
+    fresh = store.create("analysis", {})
+    active = store.create("analysis", {})
+    store.finish(old, SUCCEEDED, result={"ok": True})
+    store.finish(fresh, SUCCEEDED, result={"ok": True})
+    store._execute("UPDATE jobs SET finished = finished - 7200 WHERE id = ?", (old,))
+
+    assert store.purge(3600) == 1
+    assert store.get(old) is None
+    assert store.get(fresh)["status"] == SUCCEEDED
+    assert store.get(active)["status"] == QUEUED
+
+
+def test_runner_resumes_stale_queue_and_purges_on_start(tmp_path):
+    store = make_store(tmp_path)
+    stale = store.create("echo", {"value": 7}, worker="dead")
+    age(store, stale, 3600)
+    done = store.create("echo", {})
+    store.finish(done, SUCCEEDED)
+    store._execute("UPDATE jobs SET finished = finished - 7200 WHERE id = ?", (done,))
+
+    finished = threading.Event()
+    runner = JobRunner(store, max_workers=1, heartbeat_interval=1, retention_seconds=3600)
+
+    def echo(params, ctx):
+        finished.set()
+        return params
+
+    runner.register("echo", echo)
+    try:
+        runner.recover()
+        assert finished.wait(5)
+        for _ in range(50):
+            if store.get(stale)["status"] == SUCCEEDED:
+                break
+            time.sleep(0.05)
+        assert runner.result(stale) == {"value": 7}
+        assert store.get(done) is None
+    finally:
+        runner.shutdown()
@@ -0,0 +1,96 @@
+import math
+
+import pytest
+
+from benchmarks.mock_ollama import MockOllamaServer
+from src.agent.llm_client import LLMClient
+
+SUMMARY = "Project: shop\nSource files: " + ", ".join(f"module_{i}.py" for i in range(300))
+OUTPUT_TOKENS = 10
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**options):
+        # prompt_tokens_per_second: sahte sunucu prefix cache ve 'context' davranisini simule eder
+        server = MockOllamaServer(**{"latency_ms": 1, "output_tokens": OUTPUT_TOKENS,
+                                     "prompt_tokens_per_second": 1e6, **options}).start()
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.stop()
+
+
+def session_client(url, **options):
+    llm = LLMClient("gherkin-qa", api_url=url, **{"session": True, **options})
+    llm.project_summary = SUMMARY
+    return llm
+
+
+def prompt_tokens(llm, *args):
+    # Sahte sunucu 4 karakterlik parcalari token sayar
+    return math.ceil(len(llm._build_prompt(*args)) / 4)
+
+
+def test_follow_up_continues_from_previous_context(servers):
+    llm = session_client(servers().generate_url, reuse_context=True)
+    llm.generate_response("def pay(): pass", "{}", "Scenarios for pay.py")
+    first = len(llm.context)
+
+    args = ("merged scenarios", "Project Global Context", "Generate Final Master Feature")
+    llm.generate_response(*args, follow_up=True)
+    assert len(llm.context) == first + prompt_tokens(llm, *args) + OUTPUT_TOKENS
+    # Gonderilen context (onceki yanitin token'lari haric) yeniden degerlendirilmez; tahmin onu cache'ten gelmis sayar
+    assert llm.stats["cached_tokens"] >= first - OUTPUT_TOKENS
+
+
+@pytest.mark.parametrize("reuse_context, follow_up", [(False, True), (True, False)])
+def test_context_is_only_sent_for_follow_ups_with_reuse(servers, reuse_context, follow_up):
+    llm = session_client(servers().generate_url, reuse_context=reuse_context)
+    llm.generate_response("def pay(): pass", "{}", "Scenarios for pay.py")
+
+    args = ("merged scenarios", "Project Global Context", "Generate Final Master Feature")
+    llm.generate_response(*args, follow_up=follow_up)
+    assert len(llm.context) == prompt_tokens(llm, *args) + OUTPUT_TOKENS
+
+
+def test_without_session_mode_no_context_is_kept(servers):
+    llm = LLMClient("gherkin-qa", api_url=servers().generate_url, session=False, reuse_context=True)
+    llm.generate_response("def pay(): pass", "{}", "Scenarios for pay.py")
+    llm.generate_response("merged", "{}", "final", follow_up=True)
+    assert llm.context is None
+    assert llm.stats["calls"] == 0
+
+
+def test_follow_up_fails_over_without_context(servers):
+    first, second = servers(), servers()
+    llm = session_client(f"{first.base_url},{second.base_url}", reuse_context=True)
+    llm.generate_response("def pay(): pass", "{}", "Scenarios for pay.py")
+    owner, other = (first, second) if first.requests_served else (second, first)
+    owner.stop()
+
+    args = ("merged scenarios", "Project Global Context", "Generate Final Master Feature")
+    llm.generate_response(*args, follow_up=True)
+    assert llm.last_error is None and other.requests_served == 1
+    # Baska endpoint'te onceki context gecersizdir; istek context'siz gonderilir
+    assert len(llm.context) == prompt_tokens(llm, *args) + OUTPUT_TOKENS
+
+
+def test_first_call_on_warm_model_still_counts_cached_prefix(servers):
+    server = servers(load_ms=300)
+    cold = session_client(server.generate_url)
+    cold.generate_response("def pay(): pass", "{}", "Scenarios for pay.py")
+    # Model bu cagri icin yuklendi: oran kesin olculur, cache bos
+    assert cold._calibrated and cold.stats["cached_tokens"] == 0
+
+    # keep_alive ile model ve prefix cache'i sicak: yeni istemcinin ilk cagrisi soguk sayilmamali
+    warm = session_client(server.generate_url)
+    warm.generate_response("def refund(): pass", "{}", "Scenarios for refund.py")
+    assert not warm._calibrated
+    shared_prefix_tokens = len(SUMMARY) // 4
+    assert warm.stats["cached_tokens"] >= 0.9 * shared_prefix_tokens
+    assert warm.stats["prompt_eval_saved_ms"] > 0
@@ -0,0 +1,84 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from src.rag.maintenance import CollectionRegistry, collect_garbage, collection_sizes, directory_size
+
+chromadb = pytest.importorskip("chromadb")
+
+
+@pytest.fixture
+def db(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    registry = CollectionRegistry(str(tmp_path))
+    rng = np.random.default_rng(0)
+    for i, name in enumerate(["session_old", "session_mid", "session_new", "session_active"]):
+        collection = client.get_or_create_collection(name)
+        collection.add(ids=[str(j) for j in range(200)], embeddings=rng.random((200, 32)).tolist())
+        registry.touch(name, force=True)
+        # Erisim sirasi: old en eski, active en yeni
+        entries = registry._load()
+        entries[name]["last_access"] = 1000.0 + i
+        registry._save(entries)
+    return client, registry
+
+
+def names(client):
+    return sorted(c.name if hasattr(c, "name") else c for c in client.list_collections())
+
+
+def test_ttl_evicts_stale_collections_but_not_protected(db):
+    client, registry = db
+    evicted = collect_garbage(client, registry, ttl_seconds=60, protect=["session_active"])
+    assert evicted == ["session_old", "session_mid", "session_new"]
+    assert names(client) == ["session_active"]
+    assert list(registry.entries()) == ["session_active"]
+
+
+def test_max_collections_evicts_least_recently_used(db):
+    client, registry = db
+    assert collect_garbage(client, registry, max_collections=2) == ["session_old", "session_mid"]
+    assert names(client) == ["session_active", "session_new"]
+
+
+def test_byte_quota_counts_collection_files_only(db, tmp_path):
+    client, registry = db
+    sizes = collection_sizes(str(tmp_path))
+    assert all(size > 0 for size in sizes.values())
+    # Katalog (chroma.sqlite3) kotaya dahil olsaydi bu limit hic saglanamazdi
+    assert directory_size(str(tmp_path)) > sum(sizes.values())
+    limit = sum(sizes.values()) - sizes["session_old"]
+    assert collect_garbage(client, registry, max_bytes=limit) == ["session_old"]
+    assert names(client) == ["session_active", "session_mid", "session_new"]
+
+
+def test_byte_quota_stops_when_only_protected_collections_remain(db):
+    client, registry = db
+    evicted = collect_garbage(client, registry, max_bytes=1, protect=["session_active", "session_new"])
+    assert evicted == ["session_old", "session_mid"]
+    assert names(client) == ["session_active", "session_new"]
+
+
+def test_registry_updates_from_many_instances_are_not_lost(tmp_path):
+    def touch_many(worker):
+        for i in range(20):
+            CollectionRegistry(str(tmp_path)).touch(f"session_{worker}_{i}")
+
+    threads = [threading.Thread(target=touch_many, args=(w,)) for w in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(CollectionRegistry(str(tmp_path)).entries()) == 120
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+
+
+def test_unreadable_catalog_skips_eviction_and_prune(db, tmp_path):
+    client, registry = db
+    before = registry.entries()
+    catalog = tmp_path / "chroma.sqlite3"
+    catalog.write_bytes(b"not a sqlite database" * 100)
+    assert collect_garbage(client, registry, ttl_seconds=60, max_collections=0) == []
+    assert registry.entries() == before
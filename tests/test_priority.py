@@ -0,0 +1,105 @@
+import pytest
+
+from benchmarks.mock_ollama import MockOllamaServer
+from src.agent.llm_client import LLMClient
+from src.graph.code_parser import CodeGraphParser
+from src.pipeline.generation import COMPONENT_WISE, GLOBAL_CONSOLIDATION, generate
+from src.pipeline.priority import Budget, coverage_report, pagerank, rank_units
+
+SOURCES = {
+    "core.py": "def validate(order):\n    return order is not None\n",
+    "checkout.py": "from core import validate\n\ndef checkout(order):\n    return validate(order)\n",
+    "refund.py": "from core import validate\n\ndef refund(order):\n    return validate(order)\n",
+    "report.py": "def render():\n    return 'ok'\n",
+}
+
+
+class StaticStore:
+    """search_similar icin sabit sonuc donduren vektor deposu (izlenebilirlik matrisi yok)."""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.collection_name = "priority_test"
+
+    def search_similar(self, query, k=3):
+        return {"documents": [[f"def handler(): pass  # {query}"]], "metadatas": [[{"type": "function"}]]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def server():
+    server = MockOllamaServer(latency_ms=1, output_tokens=10).start()
+    yield server
+    server.stop()
+
+
+def test_pagerank_favors_the_called_node():
+    ranks = pagerank(["a", "b", "hub"], [("a", "hub"), ("b", "hub")])
+    assert max(ranks, key=ranks.get) == "hub"
+    assert sum(ranks.values()) == pytest.approx(1.0)
+    assert pagerank([], []) == {}
+
+
+def test_rank_units_puts_shared_code_first(tmp_path):
+    parser = CodeGraphParser()
+    for name, code in SOURCES.items():
+        (tmp_path / name).write_text(code)
+        parser.parse_file(str(tmp_path / name))
+    files = [f"CODE: {name}" for name in SOURCES]
+    ranking = rank_units(parser.graph, files)
+    assert ranking[0][0] == "CODE: core.py"
+    assert sorted(item for item, _ in ranking) == sorted(files)
+
+
+def test_time_budget_reserves_the_average_unit_cost():
+    clock = FakeClock()
+    budget = Budget(seconds=10, clock=clock).start()
+    assert budget.allows()
+    clock.now = 4.0
+    budget.record(4.0, 0)
+    assert budget.allows()  # 4 + 4 <= 10
+    assert not budget.allows(reserve_units=1)  # 4 + 8 > 10
+    assert budget.stopped_by == "time"
+
+
+def test_unlimited_budget_never_stops():
+    budget = Budget()
+    budget.record(100.0, 10 ** 6)
+    assert not budget.limited and budget.allows(reserve_units=5)
+
+
+def test_token_budget_skips_remaining_units_and_reports_coverage(server, tmp_path):
+    files = ["CODE: core.py", "CODE: checkout.py", "CODE: refund.py"]
+    budget = Budget(tokens=1)
+    llm = LLMClient("gherkin-qa", api_url=server.generate_url)
+    result = generate(COMPONENT_WISE, files, StaticStore(tmp_path), llm, budget=budget)
+
+    assert server.requests_served == 1
+    assert result.skipped == ["checkout.py", "refund.py"]
+    assert result.budget["stopped_by"] == "tokens" and result.budget["llm_units"] == 1
+
+    report = coverage_report([("CODE: core.py", 0.6), ("CODE: checkout.py", 0.3), ("CODE: refund.py", 0.1)], result)
+    assert (report["generated"], report["skipped"]) == (1, 2)
+    assert report["score_coverage"] == 0.6
+    assert report["top_skipped"] == ["checkout.py", "refund.py"]
+
+
+def test_global_mode_keeps_a_unit_for_consolidation(server, tmp_path):
+    clock = FakeClock()
+    budget = Budget(seconds=10, clock=clock)
+    budget.start()
+    budget.record(4.0, 0)
+    clock.now = 4.0
+    llm = LLMClient("gherkin-qa", api_url=server.generate_url)
+    # 4 s gecti, birim ortalamasi 4 s: bir dosya + konsolidasyon (8 s) sigmaz, sadece konsolidasyon yapilir
+    files = ["CODE: core.py", "CODE: checkout.py"]
+    result = generate(GLOBAL_CONSOLIDATION, files, StaticStore(tmp_path), llm, budget=budget)
+    assert result.skipped == ["core.py", "checkout.py"]
+    assert budget.stopped_by == "time"
@@ -0,0 +1,74 @@
+import os
+
+from src.pipeline.scanner import IgnoreRules, PathRules, is_ignored, scan_project
+
+
+def write(root, rel_path, content="x = 1\n"):
+    path = os.path.join(root, *rel_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with open(path, mode) as f:
+        f.write(content)
+    return path
+
+
+def test_leading_slash_anchors_to_ignore_file_dir():
+    rules = IgnoreRules(["/build/"])
+    assert rules.match("build", True)
+    assert rules.match("src/build", True) is None
+
+
+def test_middle_slash_anchors_but_trailing_slash_does_not():
+    assert IgnoreRules(["docs/api"]).match("docs/api", True)
+    assert IgnoreRules(["docs/api"]).match("src/docs/api", True) is None
+    assert IgnoreRules(["build/"]).match("src/build", True)
+
+
+def test_dir_only_pattern_skips_files():
+    rules = IgnoreRules(["cache/"])
+    assert rules.match("cache", True)
+    assert rules.match("cache", False) is None
+
+
+def test_negation_last_match_wins():
+    rules = IgnoreRules(["*.py", "!keep.py"])
+    assert rules.match("a/drop.py", False)
+    assert rules.match("a/keep.py", False) is False
+
+
+def test_nested_rules_apply_below_their_base():
+    root_rules = IgnoreRules(["*.log"])
+    nested = IgnoreRules(["!important.log", "/local.py"], base="pkg")
+    assert is_ignored([root_rules, nested], "pkg/important.log", False) is False
+    assert is_ignored([root_rules, nested], "pkg/local.py", False)
+    assert not is_ignored([root_rules, nested], "pkg/sub/local.py", False)
+    assert is_ignored([root_rules, nested], "other/important.log", False)
+
+
+def test_scan_applies_gitignore_and_qaignore(tmp_path):
+    root = str(tmp_path)
+    write(root, ".gitignore", "/out/\n")
+    write(root, ".qaignore", "secret.py\n")
+    write(root, "out/gen.py")
+    write(root, "src/out/kept.py")
+    write(root, "src/secret.py")
+    write(root, "src/app.py")
+    found = sorted(os.path.relpath(p, root).replace(os.sep, "/") for p in scan_project(root).files)
+    assert found == ["src/app.py", "src/out/kept.py"]
+
+
+def test_path_rules_match_initial_scan(tmp_path):
+    # Proje 'build/' altinda olsa da kurallar koke gore goreli yola uygulanir
+    root = str(tmp_path / "build" / "proj")
+    write(root, ".gitignore", "gen/\n")
+    kept = write(root, "src/app.py")
+    generated = write(root, "src/gen/out.py")
+    vendored = write(root, "node_modules/lib.js")
+    binary = write(root, "blob.py", b"\x00\x01\x02" * 64)
+    rules = PathRules(root)
+    assert rules.file_reason(kept) is None
+    assert rules.path_reason(generated) == "ignored"
+    assert rules.path_reason(vendored) == "skip_dir"
+    assert rules.path_reason(binary) is None and rules.file_reason(binary) == "binary"
+    assert rules.path_reason(os.path.join(str(tmp_path), "other.py")) == "outside"
+    assert sorted(path for path, _ in rules.walk()) == sorted([kept, binary])
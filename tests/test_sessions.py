@@ -0,0 +1,113 @@
+import io
+import os
+import threading
+import time
+import uuid
+import zipfile
+
+import pytest
+
+from src.jobs.store import JobStore, SUCCEEDED
+from src.jobs.tasks import ANALYSIS, GENERATION
+from src.utils.sessions import (ConcurrencyLimiter, QuotaExceeded, SessionQuota, collect_workspaces,
+                                reset_workspace, safe_session_id, session_workspace, valid_session_id)
+
+
+@pytest.mark.parametrize("value", [None, "", "default", "session_123", "../../etc", "session_" + "g" * 32,
+                                   "session_" + "a" * 32 + "/..", ["session_" + "a" * 32]])
+def test_invalid_session_ids_are_rejected(value):
+    assert valid_session_id(value) is None
+
+
+def test_generated_session_ids_are_accepted():
+    session_id = f"session_{uuid.uuid4().hex}"
+    assert valid_session_id(session_id) == session_id
+
+
+def test_workspace_names_cannot_escape_the_root(tmp_path):
+    assert safe_session_id("../../etc/passwd") == "______etc_passwd"
+    path = reset_workspace("../../etc", root=str(tmp_path))
+    assert os.path.dirname(path) == str(tmp_path) and os.path.isdir(path)
+    assert session_workspace("", root=str(tmp_path)).endswith("default")
+
+
+def test_collect_workspaces_keeps_protected_and_recent(tmp_path):
+    for name in ("old", "active", "recent"):
+        reset_workspace(name, root=str(tmp_path))
+    stale = time.time() - 7200
+    for name in ("old", "active"):
+        os.utime(tmp_path / name, (stale, stale))
+    assert collect_workspaces(3600, protect=["active"], root=str(tmp_path)) == ["old"]
+    assert sorted(os.listdir(tmp_path)) == ["active", "recent"]
+
+
+def test_file_and_byte_quotas(tmp_path):
+    quota = SessionQuota(max_files=2, max_bytes=100)
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"f{i}.py"))
+        with open(paths[-1], "w") as f:
+            f.write("x" * 30)
+    assert quota.check_paths(paths[:2]) == (2, 60)
+    with pytest.raises(QuotaExceeded, match="3 files exceed"):
+        quota.check_paths(paths[2:], used_files=2, used_bytes=60)
+    with pytest.raises(QuotaExceeded, match="MB exceeds"):
+        SessionQuota(max_files=0, max_bytes=50).check_paths(paths[:2])
+
+
+def test_archive_quota_uses_uncompressed_sizes():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("big.txt", "0" * 10_000)  # sikistirilmis hali cok kucuk
+    with zipfile.ZipFile(buffer) as archive:
+        with pytest.raises(QuotaExceeded):
+            SessionQuota(max_bytes=5_000).check_archive(archive)
+        assert SessionQuota(max_bytes=20_000).check_archive(archive) == (1, 10_000)
+
+
+def test_generation_quota_counts_only_active_generations(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    quota = SessionQuota(max_generations=1)
+    done = store.create(GENERATION, {}, owner="s1")
+    store.finish(done, SUCCEEDED)
+    store.create(ANALYSIS, {}, owner="s1")
+    store.create(GENERATION, {}, owner="s2")
+    quota.check_generations(store, "s1")
+
+    store.create(GENERATION, {}, owner="s1")
+    with pytest.raises(QuotaExceeded, match="limit 1"):
+        quota.check_generations(store, "s1")
+    SessionQuota(max_generations=0).check_generations(store, "s1")
+
+
+def test_limiter_queues_extra_work_instead_of_failing():
+    limiter = ConcurrencyLimiter("test", 2)
+    release = threading.Event()
+    peak = []
+
+    def work():
+        with limiter.slot():
+            peak.append(limiter.active)
+            release.wait(5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(100):
+        if (limiter.active, limiter.waiting) == (2, 2):
+            break
+        time.sleep(0.01)
+    state = limiter.to_dict()
+    assert (state["active"], state["waiting"]) == (2, 2) and state["peak_waiting"] >= 2
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert max(peak) == 2
+    assert (limiter.active, limiter.waiting) == (0, 0)
+
+
+def test_unlimited_limiter_does_not_block():
+    limiter = ConcurrencyLimiter("test", 0)
+    with limiter.slot(), limiter.slot():
+        pass
+    assert limiter.to_dict()["limit"] == 0
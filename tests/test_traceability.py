@@ -0,0 +1,96 @@
+import networkx as nx
+import numpy as np
+
+from src.rag.traceability import (TraceabilityMatrix, build_traceability, load_traceability, trace_context,
+                                  trace_path)
+
+
+class VectorStore:
+    """node_embeddings / node_documents sunan bellek ici vektor deposu."""
+
+    def __init__(self, db_path, vectors):
+        self.db_path = str(db_path)
+        self.collection_name = "trace_test"
+        self.vectors = dict(vectors)
+
+    def node_embeddings(self, ids=None):
+        ids = [i for i in (self.vectors if ids is None else ids) if i in self.vectors]
+        return ids, np.array([self.vectors[i] for i in ids], dtype=np.float32).reshape(len(ids), -1)
+
+    def node_documents(self, ids):
+        return {i: f"text of {i}" for i in ids if i in self.vectors}
+
+
+def make_vectors(seed=0, docs=4, codes=12, dim=8):
+    rng = np.random.default_rng(seed)
+    vectors = {f"DOC:req_{i}.md": rng.normal(size=dim) for i in range(docs)}
+    vectors.update({f"FUNC:f{i}": rng.normal(size=dim) for i in range(codes)})
+    return vectors
+
+
+def make_graph(vectors):
+    graph = nx.DiGraph()
+    for node_id in vectors:
+        if node_id.startswith("FUNC:"):
+            graph.add_node(node_id, type="function", file=f"{node_id[5:]}.py")
+    return graph
+
+
+def links(matrix):
+    return {doc: {code: round(score, 5) for code, score in codes.items()} for doc, codes in matrix.by_doc.items()}
+
+
+def test_build_links_each_requirement_to_its_closest_code(tmp_path):
+    vectors = make_vectors()
+    vectors["FUNC:twin"] = vectors["DOC:req_0.md"] * 3  # ayni yon: benzerlik 1
+    matrix = TraceabilityMatrix(top_n=3, min_score=0.0).build(VectorStore(tmp_path, vectors), make_graph(vectors))
+    best, score = matrix.code_for("DOC:req_0.md")[0]
+    assert best == "FUNC:twin" and score > 0.999
+    assert matrix.requirements_for("FUNC:twin")[0][0] == "DOC:req_0.md"
+    assert matrix.requirements_for_file("twin.py")[0][0] == "DOC:req_0.md"
+    assert all(len(matrix.code_for(doc)) <= 3 for doc in matrix.by_doc)
+
+
+def test_min_score_drops_weak_links(tmp_path):
+    vectors = {"DOC:a.md": np.array([1.0, 0.0]), "FUNC:same": np.array([1.0, 0.1]),
+               "FUNC:orthogonal": np.array([0.0, 1.0])}
+    matrix = TraceabilityMatrix(top_n=5, min_score=0.5).build(VectorStore(tmp_path, vectors))
+    assert [code for code, _ in matrix.code_for("DOC:a.md")] == ["FUNC:same"]
+    assert matrix.requirements_for("FUNC:orthogonal") == []
+
+
+def test_incremental_update_matches_a_full_rebuild(tmp_path):
+    vectors = make_vectors(seed=1)
+    store = VectorStore(tmp_path, vectors)
+    matrix = TraceabilityMatrix(top_n=3, min_score=0.0).build(store, make_graph(vectors))
+
+    rng = np.random.default_rng(7)
+    store.vectors["FUNC:f3"] = rng.normal(size=8)
+    store.vectors["DOC:req_1.md"] = rng.normal(size=8)
+    store.vectors["FUNC:new"] = store.vectors["DOC:req_2.md"].copy()
+    del store.vectors["FUNC:f5"]
+    matrix.update(store, changed=["FUNC:f3", "DOC:req_1.md", "FUNC:new"], removed=["FUNC:f5"],
+                  graph=make_graph(store.vectors))
+
+    rebuilt = TraceabilityMatrix(top_n=3, min_score=0.0).build(store, make_graph(store.vectors))
+    assert links(matrix) == links(rebuilt)
+    assert "FUNC:f5" not in matrix.by_code
+
+
+def test_saved_matrix_round_trips_and_feeds_prompts(tmp_path):
+    vectors = make_vectors(seed=2)
+    store = VectorStore(tmp_path, vectors)
+    # Matris kaydedilmeden once prompt'a ek baglam yoktur
+    assert load_traceability(store) is None
+    assert trace_context(store, "f0.py") == ""
+
+    matrix = build_traceability(store, make_graph(vectors))
+    loaded = load_traceability(store)
+    assert links(loaded) == links(matrix)
+    assert loaded.code_files == matrix.code_files
+    assert load_traceability(store) is loaded  # dosya degismedikce tekrar okunmaz
+
+    doc_block = trace_context(store, "req_0.md")
+    assert doc_block.startswith("TRACEABILITY (Code implementing this requirement):")
+    assert "text of FUNC:" in doc_block
+    assert trace_path(store.db_path, store.collection_name).endswith("traceability/trace_test.npz")
@@ -0,0 +1,128 @@
+import json
+import threading
+
+from src.utils.tracing import NOOP_SPAN, Tracer, traced
+
+
+def test_spans_nest_under_the_open_parent():
+    tracer = Tracer(enabled=True)
+    trace_id = tracer.start_run()
+    with tracer.span("analysis", files=2) as root:
+        with tracer.span("parse") as child:
+            child.set(bytes=10)
+            assert tracer.current_span() is child
+        with tracer.span("embed"):
+            pass
+    spans = {s.name: s for s in tracer.spans(trace_id)}
+    assert spans["analysis"].parent_id is None
+    assert spans["parse"].parent_id == root.span_id == spans["embed"].parent_id
+    assert spans["parse"].attributes == {"bytes": 10}
+    assert all(s.end_ns is not None for s in spans.values())
+    assert [row["stage"] for row in tracer.summary(trace_id)][0] == "analysis"
+
+
+def test_errors_are_recorded_and_reraised():
+    tracer = Tracer(enabled=True)
+    trace_id = tracer.start_run()
+    try:
+        with tracer.span("llm"):
+            raise TimeoutError("slow")
+    except TimeoutError:
+        pass
+    (span,) = tracer.spans(trace_id)
+    assert span.error == "TimeoutError: slow"
+    assert tracer.summary(trace_id)[0]["errors"] == 1
+
+
+def test_disabled_tracer_returns_noop_span_and_records_nothing():
+    tracer = Tracer(enabled=False)
+    tracer.start_run()
+    with tracer.span("parse") as span:
+        assert span is NOOP_SPAN
+        span.set(bytes=1)
+    assert tracer.current_span() is NOOP_SPAN
+    assert tracer.spans() == []
+
+
+def test_traced_decorator_uses_the_module_tracer():
+    calls = []
+
+    @traced("work")
+    def work(x):
+        calls.append(x)
+        return x * 2
+
+    assert work(2) == 4 and calls == [2]
+
+
+def test_per_run_flag_does_not_leak_to_other_threads():
+    tracer = Tracer(enabled=False)
+    seen = {}
+
+    def job(name, enabled):
+        tracer.start_run(enabled=enabled)
+        with tracer.span(name):
+            pass
+        seen[name] = tracer.enabled
+
+    threads = [threading.Thread(target=job, args=("on", True)), threading.Thread(target=job, args=("off", False))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen == {"on": True, "off": False}
+    assert [s.name for s in tracer.spans()] == ["on"]
+    # Bu thread'de hicbir sey degismedi; None surec varsayilanina doner
+    assert tracer.enabled is False
+    tracer.resume_run("abc", enabled=True)
+    assert tracer.enabled is True
+    tracer.set_enabled(None)
+    assert tracer.enabled is False
+
+
+def test_export_writes_each_span_once(tmp_path):
+    tracer = Tracer(enabled=True)
+    trace_id = tracer.start_run()
+    with tracer.span("scan", files=3):
+        with tracer.span("sniff"):
+            pass
+    path = tmp_path / "spans.jsonl"
+    assert tracer.export(str(path), trace_id=trace_id) == 2
+    assert tracer.export(str(path), trace_id=trace_id) == 0
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert {r["name"] for r in records} == {"scan", "sniff"}
+    assert all(r["trace_id"] == trace_id and r["duration_ms"] >= 0 for r in records)
+
+
+def test_otel_export_format(tmp_path):
+    tracer = Tracer(enabled=True, export_format="otel")
+    trace_id = tracer.start_run()
+    with tracer.span("llm", eval_count=12, model="qa", cached=True, share=0.5) as span:
+        span.set(error="timeout")
+    path = tmp_path / "otel.jsonl"
+    tracer.export(str(path))
+    (record,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert record["traceId"] == trace_id and record["parentSpanId"] == ""
+    values = {a["key"]: a["value"] for a in record["attributes"]}
+    assert values["eval_count"] == {"intValue": "12"}
+    assert values["cached"] == {"boolValue": True}
+    assert values["share"] == {"doubleValue": 0.5}
+    assert values["model"] == {"stringValue": "qa"}
+    assert record["status"] == {"code": 1}
+
+
+def test_jobs_trace_with_the_submitting_sessions_flag():
+    from src.jobs.tasks import _resume_trace
+    from src.utils.tracing import tracer
+
+    seen = []
+
+    def worker():
+        for params in ({"trace_id": "t1", "tracing": True}, {"tracing": False}, {}):
+            _resume_trace(params)
+            seen.append(tracer.enabled)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen == [True, False, tracer.default_enabled]
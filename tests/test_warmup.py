@@ -0,0 +1,78 @@
+import socket
+import time
+
+import pytest
+
+from benchmarks.mock_ollama import MockOllamaServer
+from src.rag import vector_store
+from src.utils import warmup
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    # Isinma durumu surec geneldir; her test bastan baslar
+    monkeypatch.setattr(warmup, "_state", {"started": False, "models": None, "models_fetched": 0.0,
+                                           "models_fetching": False, "parser_ready": False,
+                                           "embedding_ready": False, "error": None})
+
+
+@pytest.fixture
+def server():
+    server = MockOllamaServer(latency_ms=1, models=("gherkin-qa", "llama3")).start()
+    yield server
+    server.stop()
+
+
+def dead_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_warmup_runs_once_and_loads_models(server, monkeypatch):
+    loaded = []
+    monkeypatch.setattr(vector_store, "get_chroma_client", lambda path: loaded.append("chroma"))
+    monkeypatch.setattr(vector_store, "get_embedding_model", lambda: loaded.append("embedding"))
+
+    assert warmup.start_background_warmup(server.base_url)
+    assert not warmup.start_background_warmup(server.base_url)
+    assert wait_until(lambda: warmup.status()["embedding_ready"])
+    state = warmup.status()
+    assert state["parser_ready"] and state["error"] is None
+    assert loaded == ["chroma", "embedding"]
+    assert warmup.available_models(["fallback"], server.base_url) == ["gherkin-qa", "llama3"]
+
+
+def test_warmup_failure_is_reported_not_raised(server, monkeypatch):
+    def broken():
+        raise RuntimeError("model files missing")
+
+    monkeypatch.setattr(vector_store, "get_chroma_client", lambda path: None)
+    monkeypatch.setattr(vector_store, "get_embedding_model", broken)
+    warmup.start_background_warmup(server.base_url)
+    assert wait_until(lambda: warmup.status()["error"] is not None)
+    state = warmup.status()
+    assert state["error"] == "RuntimeError: model files missing"
+    assert not state["embedding_ready"]
+
+
+def test_model_list_falls_back_while_ollama_is_down(monkeypatch):
+    url = dead_url()
+    monkeypatch.setattr(warmup, "_state", dict(warmup._state, started=True))
+    # Liste hic alinmadi: arka planda yenilenir, cagri beklemeden varsayilani dondurur
+    assert warmup.available_models(["gherkin-qa"], url) == ["gherkin-qa"]
+    assert wait_until(lambda: not warmup.status()["models_fetching"])
+    assert warmup.status()["models"] is None and warmup.status()["models_fetched"] > 0
+    # Yeni denendi: yenileme araligi dolana kadar tekrar denenmez
+    assert warmup.available_models(["gherkin-qa"], url) == ["gherkin-qa"]
+    assert not warmup.status()["models_fetching"]